@@ -0,0 +1,115 @@
+"""
+Historial de asignaciones de un dispositivo o de un empleado.
+
+Usado por DeviceViewSet.history y EmployeeViewSet.history:
+
+- Filas planas construidas con values() (un solo SELECT con JOIN a empleado, dispositivo
+  y devolución), en lugar del AssignmentSerializer completo con serializers anidados.
+- Paginación por cursor (keyset) sobre ('-fecha_entrega', '-id'): ?cursor= y ?page_size=.
+- Totales (total y activas) en una sola consulta de agregación.
+- Detalle anidado solo a pedido con ?expand=empleado,dispositivo,solicitud, con una
+  consulta por relación para toda la página.
+"""
+from django.db.models import Count, F, Q
+
+from config.pagination import StandardResultsSetPagination
+
+
+# Orden del historial: más reciente primero, id como desempate único
+HISTORY_ORDERING = ('-fecha_entrega', '-id')
+HISTORY_PAGE_SIZE = 50
+
+# Columnas de cada fila (clave → lookup de values())
+HISTORY_COLUMNS = {
+    'empleado_nombre': F('empleado__nombre_completo'),
+    'empleado_rut': F('empleado__rut'),
+    'dispositivo_tipo': F('dispositivo__tipo_equipo'),
+    'dispositivo_marca': F('dispositivo__marca'),
+    'dispositivo_modelo': F('dispositivo__modelo'),
+    'dispositivo_numero_serie': F('dispositivo__numero_serie'),
+    'dispositivo_imei': F('dispositivo__imei'),
+    'devolucion_fecha': F('return__fecha_devolucion'),
+    'devolucion_estado_dispositivo': F('return__estado_dispositivo'),
+}
+HISTORY_FIELDS = (
+    'id', 'empleado', 'dispositivo', 'solicitud', 'tipo_entrega', 'fecha_entrega',
+    'fecha_devolucion', 'estado_carta', 'estado_asignacion',
+)
+
+
+class HistoryPagination(StandardResultsSetPagination):
+    """Paginación del historial: siempre por cursor y sin COUNT(*) (los totales van aparte)."""
+    page_size = HISTORY_PAGE_SIZE
+
+    def get_cursor_ordering(self, view):
+        return HISTORY_ORDERING
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.cursor_mode = True
+        self.count_mode = 'none'
+        return self.paginate_keyset(queryset, request, view)
+
+
+def _expandir(filas, expand):
+    """Agrega <relación>_detail a las filas para cada relación pedida en `expand`."""
+    from apps.devices.models import Device
+    from apps.devices.serializers import DeviceSerializer
+    from apps.employees.models import Employee
+    from apps.employees.serializers import EmployeeSerializer
+    from .models import Request
+    from .serializers import RequestSerializer
+
+    relaciones = {
+        'empleado': (Employee.objects.select_related('sucursal', 'unidad_negocio', 'created_by'), EmployeeSerializer),
+        'dispositivo': (Device.objects.select_related('sucursal', 'created_by'), DeviceSerializer),
+        'solicitud': (
+            Request.objects.select_related('empleado__sucursal', 'empleado__unidad_negocio', 'sucursal', 'created_by'),
+            RequestSerializer,
+        ),
+    }
+    for relacion in expand:
+        queryset, serializer_class = relaciones[relacion]
+        objetos = queryset.in_bulk({fila[relacion] for fila in filas if fila[relacion]})
+        for fila in filas:
+            objeto = objetos.get(fila[relacion])
+            fila[f'{relacion}_detail'] = serializer_class(objeto).data if objeto else None
+
+
+def historial(request, view, queryset):
+    """
+    Retorna el cuerpo de la respuesta de historial para las asignaciones de `queryset`.
+
+    Returns:
+        dict: total_assignments, active_assignments, assignments (página actual),
+              next y previous (links con cursor)
+
+    Raises:
+        ValidationError: Si ?expand= contiene una relación desconocida
+    """
+    from rest_framework.exceptions import ValidationError
+
+    expand = [valor for valor in request.query_params.get('expand', '').split(',') if valor]
+    desconocidas = set(expand) - {'empleado', 'dispositivo', 'solicitud'}
+    if desconocidas:
+        raise ValidationError({'expand': f'Relaciones no válidas: {", ".join(sorted(desconocidas))}'})
+
+    totales = queryset.aggregate(
+        total=Count('id'),
+        activas=Count('id', filter=Q(estado_asignacion='ACTIVA')),
+    )
+
+    paginator = HistoryPagination()
+    filas = paginator.paginate_queryset(
+        queryset.values(*HISTORY_FIELDS, **HISTORY_COLUMNS), request, view
+    )
+    if expand:
+        _expandir(filas, expand)
+
+    return {
+        'total_assignments': totales['total'],
+        'active_assignments': totales['activas'],
+        'assignments': filas,
+        'next': paginator.next_link,
+        'previous': paginator.previous_link,
+    }
@@ -0,0 +1,227 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:40
+
+from django.db import migrations
+
+from config.operations import VendorRunSQL
+
+# Índices de búsqueda de config/search.py: en SQLite, una tabla FTS5 espejo mantenida
+# por triggers; en PostgreSQL, índices GIN de trigramas y tsvector sobre el documento.
+
+SQLITE = [
+    '''
+        CREATE VIRTUAL TABLE "assignments_assignment_busqueda" USING fts5(
+            "observaciones",
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    ''',
+    '''
+        INSERT INTO "assignments_assignment_busqueda" (
+            rowid, "observaciones"
+        )
+        SELECT
+            "id",
+            "observaciones"
+        FROM "assignments_assignment"
+    ''',
+    '''
+        CREATE TRIGGER "assignments_assignment_busqueda_ai" AFTER INSERT ON "assignments_assignment" BEGIN
+            INSERT INTO "assignments_assignment_busqueda" (
+                rowid, "observaciones"
+            ) VALUES (
+                NEW."id",
+                NEW."observaciones"
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "assignments_assignment_busqueda_au" AFTER UPDATE ON "assignments_assignment" BEGIN
+            DELETE FROM "assignments_assignment_busqueda" WHERE rowid = OLD."id";
+            INSERT INTO "assignments_assignment_busqueda" (
+                rowid, "observaciones"
+            ) VALUES (
+                NEW."id",
+                NEW."observaciones"
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "assignments_assignment_busqueda_ad" AFTER DELETE ON "assignments_assignment" BEGIN
+            DELETE FROM "assignments_assignment_busqueda" WHERE rowid = OLD."id";
+        END
+    ''',
+    '''
+        CREATE VIRTUAL TABLE "assignments_request_busqueda" USING fts5(
+            "jefatura_solicitante", "justificacion",
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    ''',
+    '''
+        INSERT INTO "assignments_request_busqueda" (
+            rowid, "jefatura_solicitante", "justificacion"
+        )
+        SELECT
+            "id",
+            "jefatura_solicitante",
+            "justificacion"
+        FROM "assignments_request"
+    ''',
+    '''
+        CREATE TRIGGER "assignments_request_busqueda_ai" AFTER INSERT ON "assignments_request" BEGIN
+            INSERT INTO "assignments_request_busqueda" (
+                rowid, "jefatura_solicitante", "justificacion"
+            ) VALUES (
+                NEW."id",
+                NEW."jefatura_solicitante",
+                NEW."justificacion"
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "assignments_request_busqueda_au" AFTER UPDATE ON "assignments_request" BEGIN
+            DELETE FROM "assignments_request_busqueda" WHERE rowid = OLD."id";
+            INSERT INTO "assignments_request_busqueda" (
+                rowid, "jefatura_solicitante", "justificacion"
+            ) VALUES (
+                NEW."id",
+                NEW."jefatura_solicitante",
+                NEW."justificacion"
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "assignments_request_busqueda_ad" AFTER DELETE ON "assignments_request" BEGIN
+            DELETE FROM "assignments_request_busqueda" WHERE rowid = OLD."id";
+        END
+    ''',
+    '''
+        CREATE VIRTUAL TABLE "assignments_return_busqueda" USING fts5(
+            "observaciones",
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    ''',
+    '''
+        INSERT INTO "assignments_return_busqueda" (
+            rowid, "observaciones"
+        )
+        SELECT
+            "id",
+            "observaciones"
+        FROM "assignments_return"
+    ''',
+    '''
+        CREATE TRIGGER "assignments_return_busqueda_ai" AFTER INSERT ON "assignments_return" BEGIN
+            INSERT INTO "assignments_return_busqueda" (
+                rowid, "observaciones"
+            ) VALUES (
+                NEW."id",
+                NEW."observaciones"
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "assignments_return_busqueda_au" AFTER UPDATE ON "assignments_return" BEGIN
+            DELETE FROM "assignments_return_busqueda" WHERE rowid = OLD."id";
+            INSERT INTO "assignments_return_busqueda" (
+                rowid, "observaciones"
+            ) VALUES (
+                NEW."id",
+                NEW."observaciones"
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "assignments_return_busqueda_ad" AFTER DELETE ON "assignments_return" BEGIN
+            DELETE FROM "assignments_return_busqueda" WHERE rowid = OLD."id";
+        END
+    ''',
+]
+
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS "assignments_assignment_busqueda_ai"',
+    'DROP TRIGGER IF EXISTS "assignments_assignment_busqueda_au"',
+    'DROP TRIGGER IF EXISTS "assignments_assignment_busqueda_ad"',
+    'DROP TABLE IF EXISTS "assignments_assignment_busqueda"',
+    'DROP TRIGGER IF EXISTS "assignments_request_busqueda_ai"',
+    'DROP TRIGGER IF EXISTS "assignments_request_busqueda_au"',
+    'DROP TRIGGER IF EXISTS "assignments_request_busqueda_ad"',
+    'DROP TABLE IF EXISTS "assignments_request_busqueda"',
+    'DROP TRIGGER IF EXISTS "assignments_return_busqueda_ai"',
+    'DROP TRIGGER IF EXISTS "assignments_return_busqueda_au"',
+    'DROP TRIGGER IF EXISTS "assignments_return_busqueda_ad"',
+    'DROP TABLE IF EXISTS "assignments_return_busqueda"',
+]
+
+POSTGRESQL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE EXTENSION IF NOT EXISTS unaccent',
+    '''
+        CREATE OR REPLACE FUNCTION techtrace_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+    ''',
+    '''
+        CREATE INDEX IF NOT EXISTS "assignments_assignment_busqueda_trgm" ON "assignments_assignment" USING gin (
+            (techtrace_unaccent(lower(
+                coalesce("observaciones", '')
+            ))) gin_trgm_ops
+        )
+    ''',
+    '''
+        CREATE INDEX IF NOT EXISTS "assignments_assignment_busqueda_tsv" ON "assignments_assignment" USING gin (
+            to_tsvector('simple'::regconfig, techtrace_unaccent(lower(
+                coalesce("observaciones", '')
+            )))
+        )
+    ''',
+    '''
+        CREATE INDEX IF NOT EXISTS "assignments_request_busqueda_trgm" ON "assignments_request" USING gin (
+            (techtrace_unaccent(lower(
+                coalesce("jefatura_solicitante", '') || ' ' ||
+                coalesce("justificacion", '')
+            ))) gin_trgm_ops
+        )
+    ''',
+    '''
+        CREATE INDEX IF NOT EXISTS "assignments_request_busqueda_tsv" ON "assignments_request" USING gin (
+            to_tsvector('simple'::regconfig, techtrace_unaccent(lower(
+                coalesce("jefatura_solicitante", '') || ' ' ||
+                coalesce("justificacion", '')
+            )))
+        )
+    ''',
+    '''
+        CREATE INDEX IF NOT EXISTS "assignments_return_busqueda_trgm" ON "assignments_return" USING gin (
+            (techtrace_unaccent(lower(
+                coalesce("observaciones", '')
+            ))) gin_trgm_ops
+        )
+    ''',
+    '''
+        CREATE INDEX IF NOT EXISTS "assignments_return_busqueda_tsv" ON "assignments_return" USING gin (
+            to_tsvector('simple'::regconfig, techtrace_unaccent(lower(
+                coalesce("observaciones", '')
+            )))
+        )
+    ''',
+]
+
+POSTGRESQL_REVERSE = [
+    'DROP INDEX IF EXISTS "assignments_assignment_busqueda_trgm"',
+    'DROP INDEX IF EXISTS "assignments_assignment_busqueda_tsv"',
+    'DROP INDEX IF EXISTS "assignments_request_busqueda_trgm"',
+    'DROP INDEX IF EXISTS "assignments_request_busqueda_tsv"',
+    'DROP INDEX IF EXISTS "assignments_return_busqueda_trgm"',
+    'DROP INDEX IF EXISTS "assignments_return_busqueda_tsv"',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0008_alter_assignment_dispositivo'),
+    ]
+
+    operations = [
+        VendorRunSQL('sqlite', SQLITE, SQLITE_REVERSE),
+        VendorRunSQL('postgresql', POSTGRESQL, POSTGRESQL_REVERSE),
+    ]
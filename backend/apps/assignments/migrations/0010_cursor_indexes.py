@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0009_search_index'),
+        ('branches', '0002_remove_branch_ciudad_remove_branch_direccion'),
+        ('devices', '0013_search_index'),
+        ('employees', '0011_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['fecha_entrega', 'id'], name='assignment_entrega_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['fecha_solicitud', 'id'], name='request_solicitud_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='return',
+            index=models.Index(fields=['fecha_devolucion', 'id'], name='return_devolucion_id_idx'),
+        ),
+    ]
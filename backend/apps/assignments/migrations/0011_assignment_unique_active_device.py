@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def finalize_duplicate_active(apps, schema_editor):
+    """
+    Deja a lo sumo una asignación ACTIVA por dispositivo antes de crear el índice único:
+    conserva la más reciente (la que apunta Device.asignacion_actual) y finaliza el resto.
+    """
+    Assignment = apps.get_model('assignments', 'Assignment')
+
+    mas_reciente = Assignment.objects.filter(
+        dispositivo=models.OuterRef('dispositivo'),
+        estado_asignacion='ACTIVA'
+    ).order_by('-fecha_entrega', '-id').values('id')[:1]
+
+    updated = Assignment.objects.filter(
+        estado_asignacion='ACTIVA',
+        dispositivo__isnull=False,
+    ).exclude(pk=models.Subquery(mas_reciente)).update(estado_asignacion='FINALIZADA')
+    print(f"Finalizadas {updated} asignaciones activas duplicadas")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0010_cursor_indexes'),
+        ('devices', '0014_cursor_indexes'),
+        ('employees', '0012_cursor_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(finalize_duplicate_active, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='assignment',
+            constraint=models.UniqueConstraint(condition=models.Q(('estado_asignacion', 'ACTIVA')), fields=('dispositivo',), name='assignment_unique_active_device'),
+        ),
+    ]
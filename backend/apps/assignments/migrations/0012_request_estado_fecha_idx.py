@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0011_assignment_unique_active_device'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['estado', 'fecha_solicitud'], name='request_estado_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,401 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:10
+
+from django.db import migrations
+
+from config.operations import VendorRunSQL
+
+# Recrea los índices de búsqueda de SQLite: agrega la tabla FTS5 de trigramas (subcadenas)
+# y limita el trigger de actualización a las columnas indexadas. Los índices de
+# PostgreSQL no cambian.
+
+SQLITE = [
+    'DROP TRIGGER IF EXISTS "assignments_assignment_busqueda_ai"',
+    'DROP TRIGGER IF EXISTS "assignments_assignment_busqueda_au"',
+    'DROP TRIGGER IF EXISTS "assignments_assignment_busqueda_ad"',
+    'DROP TABLE IF EXISTS "assignments_assignment_busqueda"',
+    '''
+        CREATE VIRTUAL TABLE "assignments_assignment_busqueda" USING fts5(
+            "observaciones",
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    ''',
+    '''
+        INSERT INTO "assignments_assignment_busqueda" (
+            rowid, "observaciones"
+        )
+        SELECT
+            "id",
+            "observaciones"
+        FROM "assignments_assignment"
+    ''',
+    '''
+        CREATE VIRTUAL TABLE "assignments_assignment_busqueda_trgm" USING fts5(
+            "observaciones",
+            tokenize = 'trigram'
+        )
+    ''',
+    '''
+        INSERT INTO "assignments_assignment_busqueda_trgm" (
+            rowid, "observaciones"
+        )
+        SELECT
+            "id",
+            "observaciones"
+        FROM "assignments_assignment"
+    ''',
+    '''
+        CREATE TRIGGER "assignments_assignment_busqueda_ai" AFTER INSERT ON "assignments_assignment" BEGIN
+            INSERT INTO "assignments_assignment_busqueda" (
+                rowid, "observaciones"
+            ) VALUES (
+                NEW."id",
+                NEW."observaciones"
+            );
+            INSERT INTO "assignments_assignment_busqueda_trgm" (
+                rowid, "observaciones"
+            ) VALUES (
+                NEW."id",
+                NEW."observaciones"
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "assignments_assignment_busqueda_au"
+        AFTER UPDATE OF "observaciones"
+        ON "assignments_assignment" BEGIN
+            DELETE FROM "assignments_assignment_busqueda" WHERE rowid = OLD."id";
+            DELETE FROM "assignments_assignment_busqueda_trgm" WHERE rowid = OLD."id";
+            INSERT INTO "assignments_assignment_busqueda" (
+                rowid, "observaciones"
+            ) VALUES (
+                NEW."id",
+                NEW."observaciones"
+            );
+            INSERT INTO "assignments_assignment_busqueda_trgm" (
+                rowid, "observaciones"
+            ) VALUES (
+                NEW."id",
+                NEW."observaciones"
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "assignments_assignment_busqueda_ad" AFTER DELETE ON "assignments_assignment" BEGIN
+            DELETE FROM "assignments_assignment_busqueda" WHERE rowid = OLD."id";
+            DELETE FROM "assignments_assignment_busqueda_trgm" WHERE rowid = OLD."id";
+        END
+    ''',
+    'DROP TRIGGER IF EXISTS "assignments_request_busqueda_ai"',
+    'DROP TRIGGER IF EXISTS "assignments_request_busqueda_au"',
+    'DROP TRIGGER IF EXISTS "assignments_request_busqueda_ad"',
+    'DROP TABLE IF EXISTS "assignments_request_busqueda"',
+    '''
+        CREATE VIRTUAL TABLE "assignments_request_busqueda" USING fts5(
+            "jefatura_solicitante", "justificacion",
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    ''',
+    '''
+        INSERT INTO "assignments_request_busqueda" (
+            rowid, "jefatura_solicitante", "justificacion"
+        )
+        SELECT
+            "id",
+            "jefatura_solicitante",
+            "justificacion"
+        FROM "assignments_request"
+    ''',
+    '''
+        CREATE VIRTUAL TABLE "assignments_request_busqueda_trgm" USING fts5(
+            "jefatura_solicitante", "justificacion",
+            tokenize = 'trigram'
+        )
+    ''',
+    '''
+        INSERT INTO "assignments_request_busqueda_trgm" (
+            rowid, "jefatura_solicitante", "justificacion"
+        )
+        SELECT
+            "id",
+            "jefatura_solicitante",
+            "justificacion"
+        FROM "assignments_request"
+    ''',
+    '''
+        CREATE TRIGGER "assignments_request_busqueda_ai" AFTER INSERT ON "assignments_request" BEGIN
+            INSERT INTO "assignments_request_busqueda" (
+                rowid, "jefatura_solicitante", "justificacion"
+            ) VALUES (
+                NEW."id",
+                NEW."jefatura_solicitante",
+                NEW."justificacion"
+            );
+            INSERT INTO "assignments_request_busqueda_trgm" (
+                rowid, "jefatura_solicitante", "justificacion"
+            ) VALUES (
+                NEW."id",
+                NEW."jefatura_solicitante",
+                NEW."justificacion"
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "assignments_request_busqueda_au"
+        AFTER UPDATE OF "jefatura_solicitante", "justificacion"
+        ON "assignments_request" BEGIN
+            DELETE FROM "assignments_request_busqueda" WHERE rowid = OLD."id";
+            DELETE FROM "assignments_request_busqueda_trgm" WHERE rowid = OLD."id";
+            INSERT INTO "assignments_request_busqueda" (
+                rowid, "jefatura_solicitante", "justificacion"
+            ) VALUES (
+                NEW."id",
+                NEW."jefatura_solicitante",
+                NEW."justificacion"
+            );
+            INSERT INTO "assignments_request_busqueda_trgm" (
+                rowid, "jefatura_solicitante", "justificacion"
+            ) VALUES (
+                NEW."id",
+                NEW."jefatura_solicitante",
+                NEW."justificacion"
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "assignments_request_busqueda_ad" AFTER DELETE ON "assignments_request" BEGIN
+            DELETE FROM "assignments_request_busqueda" WHERE rowid = OLD."id";
+            DELETE FROM "assignments_request_busqueda_trgm" WHERE rowid = OLD."id";
+        END
+    ''',
+    'DROP TRIGGER IF EXISTS "assignments_return_busqueda_ai"',
+    'DROP TRIGGER IF EXISTS "assignments_return_busqueda_au"',
+    'DROP TRIGGER IF EXISTS "assignments_return_busqueda_ad"',
+    'DROP TABLE IF EXISTS "assignments_return_busqueda"',
+    '''
+        CREATE VIRTUAL TABLE "assignments_return_busqueda" USING fts5(
+            "observaciones",
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    ''',
+    '''
+        INSERT INTO "assignments_return_busqueda" (
+            rowid, "observaciones"
+        )
+        SELECT
+            "id",
+            "observaciones"
+        FROM "assignments_return"
+    ''',
+    '''
+        CREATE VIRTUAL TABLE "assignments_return_busqueda_trgm" USING fts5(
+            "observaciones",
+            tokenize = 'trigram'
+        )
+    ''',
+    '''
+        INSERT INTO "assignments_return_busqueda_trgm" (
+            rowid, "observaciones"
+        )
+        SELECT
+            "id",
+            "observaciones"
+        FROM "assignments_return"
+    ''',
+    '''
+        CREATE TRIGGER "assignments_return_busqueda_ai" AFTER INSERT ON "assignments_return" BEGIN
+            INSERT INTO "assignments_return_busqueda" (
+                rowid, "observaciones"
+            ) VALUES (
+                NEW."id",
+                NEW."observaciones"
+            );
+            INSERT INTO "assignments_return_busqueda_trgm" (
+                rowid, "observaciones"
+            ) VALUES (
+                NEW."id",
+                NEW."observaciones"
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "assignments_return_busqueda_au"
+        AFTER UPDATE OF "observaciones"
+        ON "assignments_return" BEGIN
+            DELETE FROM "assignments_return_busqueda" WHERE rowid = OLD."id";
+            DELETE FROM "assignments_return_busqueda_trgm" WHERE rowid = OLD."id";
+            INSERT INTO "assignments_return_busqueda" (
+                rowid, "observaciones"
+            ) VALUES (
+                NEW."id",
+                NEW."observaciones"
+            );
+            INSERT INTO "assignments_return_busqueda_trgm" (
+                rowid, "observaciones"
+            ) VALUES (
+                NEW."id",
+                NEW."observaciones"
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "assignments_return_busqueda_ad" AFTER DELETE ON "assignments_return" BEGIN
+            DELETE FROM "assignments_return_busqueda" WHERE rowid = OLD."id";
+            DELETE FROM "assignments_return_busqueda_trgm" WHERE rowid = OLD."id";
+        END
+    ''',
+]
+
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS "assignments_assignment_busqueda_ai"',
+    'DROP TRIGGER IF EXISTS "assignments_assignment_busqueda_au"',
+    'DROP TRIGGER IF EXISTS "assignments_assignment_busqueda_ad"',
+    'DROP TABLE IF EXISTS "assignments_assignment_busqueda"',
+    'DROP TABLE IF EXISTS "assignments_assignment_busqueda_trgm"',
+    '''
+        CREATE VIRTUAL TABLE "assignments_assignment_busqueda" USING fts5(
+            "observaciones",
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    ''',
+    '''
+        INSERT INTO "assignments_assignment_busqueda" (
+            rowid, "observaciones"
+        )
+        SELECT
+            "id",
+            "observaciones"
+        FROM "assignments_assignment"
+    ''',
+    '''
+        CREATE TRIGGER "assignments_assignment_busqueda_ai" AFTER INSERT ON "assignments_assignment" BEGIN
+            INSERT INTO "assignments_assignment_busqueda" (
+                rowid, "observaciones"
+            ) VALUES (
+                NEW."id",
+                NEW."observaciones"
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "assignments_assignment_busqueda_au" AFTER UPDATE ON "assignments_assignment" BEGIN
+            DELETE FROM "assignments_assignment_busqueda" WHERE rowid = OLD."id";
+            INSERT INTO "assignments_assignment_busqueda" (
+                rowid, "observaciones"
+            ) VALUES (
+                NEW."id",
+                NEW."observaciones"
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "assignments_assignment_busqueda_ad" AFTER DELETE ON "assignments_assignment" BEGIN
+            DELETE FROM "assignments_assignment_busqueda" WHERE rowid = OLD."id";
+        END
+    ''',
+    'DROP TRIGGER IF EXISTS "assignments_request_busqueda_ai"',
+    'DROP TRIGGER IF EXISTS "assignments_request_busqueda_au"',
+    'DROP TRIGGER IF EXISTS "assignments_request_busqueda_ad"',
+    'DROP TABLE IF EXISTS "assignments_request_busqueda"',
+    'DROP TABLE IF EXISTS "assignments_request_busqueda_trgm"',
+    '''
+        CREATE VIRTUAL TABLE "assignments_request_busqueda" USING fts5(
+            "jefatura_solicitante", "justificacion",
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    ''',
+    '''
+        INSERT INTO "assignments_request_busqueda" (
+            rowid, "jefatura_solicitante", "justificacion"
+        )
+        SELECT
+            "id",
+            "jefatura_solicitante",
+            "justificacion"
+        FROM "assignments_request"
+    ''',
+    '''
+        CREATE TRIGGER "assignments_request_busqueda_ai" AFTER INSERT ON "assignments_request" BEGIN
+            INSERT INTO "assignments_request_busqueda" (
+                rowid, "jefatura_solicitante", "justificacion"
+            ) VALUES (
+                NEW."id",
+                NEW."jefatura_solicitante",
+                NEW."justificacion"
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "assignments_request_busqueda_au" AFTER UPDATE ON "assignments_request" BEGIN
+            DELETE FROM "assignments_request_busqueda" WHERE rowid = OLD."id";
+            INSERT INTO "assignments_request_busqueda" (
+                rowid, "jefatura_solicitante", "justificacion"
+            ) VALUES (
+                NEW."id",
+                NEW."jefatura_solicitante",
+                NEW."justificacion"
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "assignments_request_busqueda_ad" AFTER DELETE ON "assignments_request" BEGIN
+            DELETE FROM "assignments_request_busqueda" WHERE rowid = OLD."id";
+        END
+    ''',
+    'DROP TRIGGER IF EXISTS "assignments_return_busqueda_ai"',
+    'DROP TRIGGER IF EXISTS "assignments_return_busqueda_au"',
+    'DROP TRIGGER IF EXISTS "assignments_return_busqueda_ad"',
+    'DROP TABLE IF EXISTS "assignments_return_busqueda"',
+    'DROP TABLE IF EXISTS "assignments_return_busqueda_trgm"',
+    '''
+        CREATE VIRTUAL TABLE "assignments_return_busqueda" USING fts5(
+            "observaciones",
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    ''',
+    '''
+        INSERT INTO "assignments_return_busqueda" (
+            rowid, "observaciones"
+        )
+        SELECT
+            "id",
+            "observaciones"
+        FROM "assignments_return"
+    ''',
+    '''
+        CREATE TRIGGER "assignments_return_busqueda_ai" AFTER INSERT ON "assignments_return" BEGIN
+            INSERT INTO "assignments_return_busqueda" (
+                rowid, "observaciones"
+            ) VALUES (
+                NEW."id",
+                NEW."observaciones"
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "assignments_return_busqueda_au" AFTER UPDATE ON "assignments_return" BEGIN
+            DELETE FROM "assignments_return_busqueda" WHERE rowid = OLD."id";
+            INSERT INTO "assignments_return_busqueda" (
+                rowid, "observaciones"
+            ) VALUES (
+                NEW."id",
+                NEW."observaciones"
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "assignments_return_busqueda_ad" AFTER DELETE ON "assignments_return" BEGIN
+            DELETE FROM "assignments_return_busqueda" WHERE rowid = OLD."id";
+        END
+    ''',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0012_request_estado_fecha_idx'),
+    ]
+
+    operations = [
+        VendorRunSQL('sqlite', SQLITE, SQLITE_REVERSE),
+    ]
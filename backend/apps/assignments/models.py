@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from apps.users.audit import AuditTrackedMixin
 
 
 class Request(models.Model):
@@ -34,12 +35,18 @@ class Request(models.Model):
         verbose_name = 'Solicitud'
         verbose_name_plural = 'Solicitudes'
         ordering = ['-fecha_solicitud']
+        indexes = [
+            # Orden estable para paginación por cursor
+            models.Index(fields=['fecha_solicitud', 'id'], name='request_solicitud_id_idx'),
+            # Bandeja de solicitudes: ?estado=PENDIENTE ordenado por fecha
+            models.Index(fields=['estado', 'fecha_solicitud'], name='request_estado_fecha_idx'),
+        ]
 
     def __str__(self):
         return f"Solicitud #{self.id} - {self.empleado.nombre_completo} - {self.get_estado_display()}"
 
 
-class Assignment(models.Model):
+class Assignment(AuditTrackedMixin, models.Model):
     """
     Modelo para gestionar las asignaciones de dispositivos a empleados.
     """
@@ -59,6 +66,9 @@ class Assignment(models.Model):
         ('FINALIZADA', 'Finalizada'),
     ]
 
+    # Índice único parcial: a lo sumo una asignación ACTIVA por dispositivo
+    UNIQUE_ACTIVE_DEVICE = 'assignment_unique_active_device'
+
     solicitud = models.ForeignKey(Request, on_delete=models.SET_NULL, null=True, blank=True, verbose_name='Solicitud')
     empleado = models.ForeignKey('employees.Employee', on_delete=models.PROTECT, verbose_name='Empleado')
     dispositivo = models.ForeignKey('devices.Device', on_delete=models.SET_NULL, null=True, blank=True, verbose_name='Dispositivo')
@@ -92,13 +102,24 @@ class Assignment(models.Model):
         verbose_name = 'Asignación'
         verbose_name_plural = 'Asignaciones'
         ordering = ['-fecha_entrega']
+        indexes = [
+            # Orden estable para paginación por cursor
+            models.Index(fields=['fecha_entrega', 'id'], name='assignment_entrega_id_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dispositivo'],
+                condition=models.Q(estado_asignacion='ACTIVA'),
+                name='assignment_unique_active_device',
+            ),
+        ]
 
     def __str__(self):
         dispositivo_info = self.dispositivo.serial_identifier if self.dispositivo else 'Dispositivo eliminado'
         return f"Asignación #{self.id} - {self.empleado.nombre_completo} - {dispositivo_info}"
 
 
-class Return(models.Model):
+class Return(AuditTrackedMixin, models.Model):
     """
     Modelo para gestionar las devoluciones de dispositivos.
     """
@@ -119,6 +140,10 @@ class Return(models.Model):
         verbose_name = 'Devolución'
         verbose_name_plural = 'Devoluciones'
         ordering = ['-fecha_devolucion']
+        indexes = [
+            # Orden estable para paginación por cursor
+            models.Index(fields=['fecha_devolucion', 'id'], name='return_devolucion_id_idx'),
+        ]
 
     def __str__(self):
         return f"Devolución #{self.id} - Asignación #{self.asignacion.id}"
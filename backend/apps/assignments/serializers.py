@@ -2,7 +2,7 @@ from rest_framework import serializers
 from .models import Request, Assignment, Return
 from apps.employees.serializers import EmployeeSerializer
 from apps.devices.serializers import DeviceSerializer
-from apps.branches.serializers import BranchSerializer
+from apps.branches.serializers import BranchListSerializer
 
 
 class AssignmentListSerializer(serializers.ModelSerializer):
@@ -78,6 +78,12 @@ class AssignmentListSerializer(serializers.ModelSerializer):
             'rut': obj.empleado.rut,
         }
 
+    def _get_valor_depreciado_calculado(self, obj):
+        """Usa la anotación SQL del queryset de listado si existe; si no, calcula en Python"""
+        if hasattr(obj, 'dispositivo_valor_depreciado_calculado'):
+            return obj.dispositivo_valor_depreciado_calculado
+        return obj.dispositivo.get_valor_depreciado()
+
     def get_dispositivo_detail(self, obj):
         """Retorna información del dispositivo o del snapshot"""
         if obj.dispositivo:
@@ -89,7 +95,7 @@ class AssignmentListSerializer(serializers.ModelSerializer):
                 'numero_serie': obj.dispositivo.numero_serie,
                 'imei': obj.dispositivo.imei,
                 'valor_depreciado': obj.dispositivo.valor_depreciado,
-                'valor_depreciado_calculado': obj.dispositivo.get_valor_depreciado(),
+                'valor_depreciado_calculado': self._get_valor_depreciado_calculado(obj),
             }
 
         # Fallback: usar snapshot si existe
@@ -146,13 +152,58 @@ class AssignmentListSerializer(serializers.ModelSerializer):
         ]
 
 
+class RequestListSerializer(serializers.ModelSerializer):
+    """
+    Serializer ligero para el listado de solicitudes.
+    Todos los campos salen de un solo SELECT con JOIN a empleado, sucursal y usuario
+    (ver RequestViewSet.get_queryset), sin serializers anidados completos.
+    """
+    sucursal_detail = BranchListSerializer(source='sucursal', read_only=True)
+    created_by_username = serializers.CharField(source='created_by.username', read_only=True)
+    estado_display = serializers.CharField(source='get_estado_display', read_only=True)
+    motivo_display = serializers.CharField(source='get_motivo_display', read_only=True)
+
+    # Detalle básico del empleado para compatibilidad con frontend
+    empleado_detail = serializers.SerializerMethodField()
+
+    def get_empleado_detail(self, obj):
+        """Retorna información básica del empleado"""
+        return {
+            'id': obj.empleado.id,
+            'nombre_completo': obj.empleado.nombre_completo,
+            'rut': obj.empleado.rut,
+        }
+
+    class Meta:
+        model = Request
+        fields = [
+            'id',
+            'empleado',
+            'empleado_detail',
+            'sucursal',
+            'sucursal_detail',
+            'motivo',
+            'motivo_display',
+            'jefatura_solicitante',
+            'tipo_dispositivo',
+            'justificacion',
+            'fecha_solicitud',
+            'estado',
+            'estado_display',
+            'created_by',
+            'created_by_username',
+            'created_at',
+            'updated_at',
+        ]
+
+
 class RequestSerializer(serializers.ModelSerializer):
     """
     Serializer para el modelo Request (Solicitud de dispositivo).
     """
     # Campos de solo lectura con información anidada
     empleado_detail = EmployeeSerializer(source='empleado', read_only=True)
-    sucursal_detail = BranchSerializer(source='sucursal', read_only=True)
+    sucursal_detail = BranchListSerializer(source='sucursal', read_only=True)
     created_by_username = serializers.CharField(source='created_by.username', read_only=True)
     estado_display = serializers.CharField(source='get_estado_display', read_only=True)
     motivo_display = serializers.CharField(source='get_motivo_display', read_only=True)
@@ -267,6 +318,9 @@ class AssignmentSerializer(serializers.ModelSerializer):
             'estado_carta_display',
             'estado_asignacion_display',
         ]
+        # La unicidad de la asignación activa la garantizan validate_dispositivo() y el
+        # índice único parcial (ver apps/assignments/services.py), sin consulta adicional
+        validators = []
 
     def validate_dispositivo(self, value):
         """
@@ -299,6 +353,15 @@ class AssignmentSerializer(serializers.ModelSerializer):
 
         return value
 
+    def create(self, validated_data):
+        """
+        Crea la asignación con el servicio transaccional (bloqueo del dispositivo,
+        cambio de estado y solicitud en la misma transacción).
+        """
+        from .services import crear_asignacion
+
+        return crear_asignacion(validated_data)
+
     def validate(self, data):
         """
         Validaciones a nivel de objeto.
@@ -426,6 +489,104 @@ class ReturnSerializer(serializers.ModelSerializer):
         return data
 
 
+class ReturnListSerializer(serializers.ModelSerializer):
+    """
+    Serializer ligero para el listado de devoluciones.
+    Campos planos de la asignación, el empleado, su sucursal y el dispositivo, leídos de
+    un solo SELECT con JOIN (ver ReturnViewSet.get_queryset). El detalle anidado completo
+    (asignacion_detail) queda para el endpoint de detalle.
+    """
+    created_by_username = serializers.CharField(source='created_by.username', read_only=True)
+    estado_dispositivo_display = serializers.CharField(source='get_estado_dispositivo_display', read_only=True)
+
+    fecha_entrega = serializers.DateField(source='asignacion.fecha_entrega', read_only=True)
+    empleado = serializers.IntegerField(source='asignacion.empleado_id', read_only=True)
+    empleado_nombre = serializers.CharField(source='asignacion.empleado.nombre_completo', read_only=True)
+    empleado_rut = serializers.CharField(source='asignacion.empleado.rut', read_only=True)
+    empleado_sucursal = serializers.CharField(source='asignacion.empleado.sucursal.nombre', read_only=True)
+    dispositivo = serializers.IntegerField(source='asignacion.dispositivo_id', read_only=True, allow_null=True)
+    dispositivo_tipo = serializers.CharField(source='asignacion.dispositivo.tipo_equipo', read_only=True, allow_null=True)
+    dispositivo_marca = serializers.CharField(source='asignacion.dispositivo.marca', read_only=True, allow_null=True)
+    dispositivo_modelo = serializers.CharField(source='asignacion.dispositivo.modelo', read_only=True, allow_null=True)
+    dispositivo_serial = serializers.SerializerMethodField()
+
+    def get_dispositivo_serial(self, obj):
+        """Retorna el serial o IMEI del dispositivo"""
+        dispositivo = obj.asignacion.dispositivo
+        if dispositivo is None:
+            return 'Dispositivo eliminado'
+        return dispositivo.numero_serie or dispositivo.imei or 'N/A'
+
+    class Meta:
+        model = Return
+        fields = [
+            'id',
+            'asignacion',
+            'fecha_entrega',
+            'empleado',
+            'empleado_nombre',
+            'empleado_rut',
+            'empleado_sucursal',
+            'dispositivo',
+            'dispositivo_tipo',
+            'dispositivo_marca',
+            'dispositivo_modelo',
+            'dispositivo_serial',
+            'fecha_devolucion',
+            'estado_dispositivo',
+            'estado_dispositivo_display',
+            'observaciones',
+            'created_by',
+            'created_by_username',
+            'created_at',
+        ]
+
+
+class BulkReturnItemSerializer(serializers.Serializer):
+    """Estado de devolución de una asignación dentro de una devolución masiva."""
+    asignacion = serializers.IntegerField()
+    estado_dispositivo = serializers.ChoiceField(choices=Return.ESTADO_DISPOSITIVO_CHOICES)
+    observaciones = serializers.CharField(required=False, allow_blank=True)
+
+
+class BulkReturnSerializer(serializers.Serializer):
+    """
+    Datos de una devolución masiva (ver ReturnViewSet.bulk y services.devolucion_masiva).
+    Se indica exactamente uno de empleado, empleados o asignaciones.
+    """
+    empleado = serializers.IntegerField(required=False)
+    empleados = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    asignaciones = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    fecha_devolucion = serializers.DateField(required=False)
+    estado_dispositivo = serializers.ChoiceField(choices=Return.ESTADO_DISPOSITIVO_CHOICES, default='OPTIMO')
+    observaciones = serializers.CharField(required=False, allow_blank=True, default='')
+    items = BulkReturnItemSerializer(many=True, required=False)
+    desactivar_empleados = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        from .services import BULK_MAX_DEVOLUCIONES
+
+        alcances = [campo for campo in ('empleado', 'empleados', 'asignaciones') if campo in data]
+        if len(alcances) != 1:
+            raise serializers.ValidationError('Debe indicar exactamente uno de: empleado, empleados o asignaciones.')
+        if 'empleado' in data:
+            data['empleados'] = [data.pop('empleado')]
+
+        for campo in ('empleados', 'asignaciones'):
+            if len(data.get(campo, [])) > BULK_MAX_DEVOLUCIONES:
+                raise serializers.ValidationError({
+                    campo: f'Máximo {BULK_MAX_DEVOLUCIONES} elementos por operación.'
+                })
+
+        asignaciones_items = [item['asignacion'] for item in data.get('items', [])]
+        if len(asignaciones_items) != len(set(asignaciones_items)):
+            raise serializers.ValidationError({'items': 'Hay asignaciones repetidas.'})
+        if 'asignaciones' in data and not set(asignaciones_items) <= set(data['asignaciones']):
+            raise serializers.ValidationError({'items': 'Todas las asignaciones de items deben estar en asignaciones.'})
+
+        return data
+
+
 class ResponsibilityLetterSerializer(serializers.Serializer):
     """
     Serializer para datos de carta de responsabilidad (LAPTOP o TELÉFONO).
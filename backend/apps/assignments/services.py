@@ -0,0 +1,276 @@
+"""
+Servicios de escritura de asignaciones y devoluciones.
+
+crear_asignacion() realiza en una sola transacción todo lo que antes hacían el INSERT
+y las señales post_save (apps/assignments/signals.py y apps/users/signals.py):
+
+1. Bloquea el dispositivo con SELECT ... FOR UPDATE y vuelve a validar que esté
+   DISPONIBLE y sin asignación activa (la validación del serializer leyó sin bloqueo).
+2. Inserta la asignación. El índice único parcial assignment_unique_active_device
+   (una asignación ACTIVA por dispositivo) garantiza que dos creaciones concurrentes
+   no puedan tener éxito ambas, incluso sin bloqueo de filas (ej: SQLite).
+3. Pasa el dispositivo a ASIGNADO y fija asignacion_actual en un único UPDATE
+   compare-and-set (apps/devices/transitions.py), que también registra su auditoría,
+   actualiza InventorySummary e invalida el caché.
+4. Completa la solicitud vinculada con un UPDATE condicional.
+5. Registra la auditoría de la asignación (campos con valor, sin queries).
+
+La instancia se guarda con _skip_audit y _sincronizada para que las señales no repitan
+estas escrituras; ambas marcas se eliminan después del save(), por lo que los siguientes
+guardados de la instancia retornada se auditan y sincronizan normalmente.
+
+devolucion_masiva() registra las devoluciones de muchas asignaciones (de uno o varios
+empleados, o por ID) con sentencias masivas: bulk_create de Return, un UPDATE de las
+asignaciones, un UPDATE compare-and-set por estado de destino de los dispositivos y
+escritura por lotes de la auditoría. Opcionalmente desactiva a los empleados (offboarding).
+"""
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+
+MENSAJE_ASIGNACION_ACTIVA = 'El dispositivo ya tiene una asignación activa.'
+
+# Máximo de empleados o asignaciones por devolución masiva
+BULK_MAX_DEVOLUCIONES = 1000
+
+# Máximo de rechazados detallados en la respuesta
+MAX_RECHAZADOS_DETALLE = 100
+
+# Estado del dispositivo según el estado de devolución (igual que signals.return_post_save)
+ESTADO_TRAS_DEVOLUCION = {
+    'OPTIMO': 'DISPONIBLE',
+    'CON_DANOS': 'MANTENIMIENTO',
+    'NO_FUNCIONAL': 'MANTENIMIENTO',
+}
+
+
+def crear_asignacion(validated_data):
+    """
+    Crea una asignación ACTIVA y aplica sus efectos sobre el dispositivo y la solicitud.
+
+    Args:
+        validated_data: Datos validados de AssignmentSerializer (incluye created_by)
+
+    Returns:
+        Assignment: La asignación creada
+
+    Raises:
+        serializers.ValidationError: Si el dispositivo ya no está disponible o ya tiene
+            una asignación activa
+        ConflictoEstado: Si el estado del dispositivo cambió durante la operación
+    """
+    from apps.devices.models import Device
+    from apps.devices.transitions import cambiar_estado
+    from apps.users.signals import create_audit_log, get_model_changes
+    from .models import Assignment, Request
+
+    user = validated_data.get('created_by')
+
+    try:
+        with transaction.atomic():
+            # 1. Bloquear el dispositivo y revalidar con el estado actual
+            dispositivo = Device.objects.select_for_update().get(pk=validated_data['dispositivo'].pk)
+            if dispositivo.estado != 'DISPONIBLE':
+                raise serializers.ValidationError({'dispositivo': [
+                    f'El dispositivo no está disponible para asignación. '
+                    f'Estado actual: {dispositivo.get_estado_display()}'
+                ]})
+            if dispositivo.asignacion_actual_id:
+                raise serializers.ValidationError({'dispositivo': [MENSAJE_ASIGNACION_ACTIVA]})
+
+            # 2. Insertar la asignación (las señales no repiten los pasos siguientes)
+            asignacion = Assignment(**{**validated_data, 'dispositivo': dispositivo})
+            asignacion._skip_audit = True
+            asignacion._sincronizada = True
+            cambios_asignacion = get_model_changes(asignacion)
+            try:
+                asignacion.save()
+            finally:
+                # Solo aplican a las señales de este save(): los siguientes se auditan
+                del asignacion._skip_audit
+                del asignacion._sincronizada
+
+            # 3. Estado y puntero del dispositivo en un solo UPDATE
+            if asignacion.estado_asignacion == 'ACTIVA':
+                cambiar_estado(dispositivo, 'ASIGNADO', user=user, cambios_extra={'asignacion_actual': asignacion})
+
+            # 4. Completar la solicitud vinculada
+            solicitud = asignacion.solicitud
+            if solicitud is not None and solicitud.estado == 'PENDIENTE':
+                ahora = timezone.now()
+                Request.objects.filter(pk=solicitud.pk, estado='PENDIENTE').update(
+                    estado='COMPLETADA', updated_at=ahora
+                )
+                solicitud.estado = 'COMPLETADA'
+                solicitud.updated_at = ahora
+
+            # 5. Auditoría de la asignación
+            create_audit_log(user, 'CREATE', 'Assignment', asignacion.id, cambios_asignacion)
+    except IntegrityError as e:
+        # Otra transacción creó una asignación activa para el mismo dispositivo
+        if Assignment.UNIQUE_ACTIVE_DEVICE not in str(e):
+            raise
+        raise serializers.ValidationError({'dispositivo': [MENSAJE_ASIGNACION_ACTIVA]})
+
+    return asignacion
+
+
+def devolucion_masiva(user, empleados=None, asignaciones=None, fecha_devolucion=None,
+                      estado_dispositivo='OPTIMO', observaciones='', items=(), desactivar_empleados=False):
+    """
+    Registra la devolución de todas las asignaciones activas de `empleados`, o de las
+    asignaciones indicadas en `asignaciones`, en una transacción.
+
+    Args:
+        user: Usuario que registra las devoluciones
+        empleados: IDs de empleados (se devuelven todas sus asignaciones activas)
+        asignaciones: IDs de asignaciones (alternativa a empleados)
+        fecha_devolucion: Fecha de las devoluciones (por defecto hoy)
+        estado_dispositivo: Estado de devolución por defecto
+        observaciones: Observaciones por defecto
+        items: Dicts {asignacion, estado_dispositivo, observaciones?} que reemplazan los
+            valores por defecto para esa asignación
+        desactivar_empleados: Desactivar (soft delete) a los empleados que queden sin
+            asignaciones activas, como EmployeeViewSet.perform_destroy
+
+    Returns:
+        dict: devoluciones, por_estado_dispositivo, dispositivos (por estado de destino y
+              sin_cambio), empleados_desactivados, rechazados y rechazados_detalle
+    """
+    from collections import Counter, defaultdict
+    from apps.devices.cache import invalidar_inventario
+    from apps.devices.models import Device
+    from apps.devices.transitions import CAMPOS_LECTURA, aplicar_transicion
+    from apps.employees.models import Employee
+    from apps.users.audit import AuditLog, valor_auditable
+    from apps.users.audit_buffer import registrar_lote
+    from .models import Assignment, Return
+
+    fecha_devolucion = fecha_devolucion or timezone.localdate()
+    por_asignacion = {item['asignacion']: item for item in items}
+
+    with transaction.atomic():
+        # 1. Asignaciones activas del alcance, bloqueadas
+        queryset = Assignment.objects.filter(estado_asignacion='ACTIVA')
+        if asignaciones is not None:
+            queryset = queryset.filter(pk__in=asignaciones)
+        else:
+            queryset = queryset.filter(empleado_id__in=empleados)
+        filas = list(
+            queryset.order_by('pk').select_for_update(of=('self',))
+            .values('id', 'empleado_id', 'dispositivo_id', 'fecha_entrega')
+        )
+
+        encontradas = {fila['id'] for fila in filas}
+        rechazados = [
+            {'asignacion': pk, 'motivo': 'La asignación no existe o no está activa'}
+            for pk in dict.fromkeys([*(asignaciones or []), *por_asignacion]) if pk not in encontradas
+        ]
+        aplicables = []
+        for fila in filas:
+            if fila['fecha_entrega'] > fecha_devolucion:
+                rechazados.append({
+                    'asignacion': fila['id'],
+                    'motivo': 'La fecha de devolución no puede ser anterior a la fecha de entrega de la asignación',
+                })
+            else:
+                item = por_asignacion.get(fila['id'], {})
+                fila['estado_dispositivo'] = item.get('estado_dispositivo', estado_dispositivo)
+                fila['observaciones'] = item.get('observaciones', observaciones) or None
+                aplicables.append(fila)
+
+        resultado = {
+            'devoluciones': len(aplicables),
+            'por_estado_dispositivo': dict(Counter(fila['estado_dispositivo'] for fila in aplicables)),
+            'dispositivos': {},
+            'empleados_desactivados': 0,
+            'rechazados': len(rechazados),
+            'rechazados_detalle': rechazados[:MAX_RECHAZADOS_DETALLE],
+        }
+        if not aplicables:
+            return resultado
+
+        ahora = timezone.now()
+        ids = [fila['id'] for fila in aplicables]
+
+        # 2. Devoluciones y fin de las asignaciones
+        devoluciones = Return.objects.bulk_create([
+            Return(
+                asignacion_id=fila['id'],
+                fecha_devolucion=fecha_devolucion,
+                estado_dispositivo=fila['estado_dispositivo'],
+                observaciones=fila['observaciones'],
+                created_by=user,
+            )
+            for fila in aplicables
+        ], batch_size=500)
+        Assignment.objects.filter(pk__in=ids).update(estado_asignacion='FINALIZADA', updated_at=ahora)
+
+        # 3. Dispositivos: un UPDATE por estado de destino, que también limpia asignacion_actual.
+        # Los que están en estado final o ya en el destino solo pierden el puntero.
+        destinos = {
+            fila['dispositivo_id']: ESTADO_TRAS_DEVOLUCION[fila['estado_dispositivo']]
+            for fila in aplicables if fila['dispositivo_id']
+        }
+        grupos = defaultdict(list)
+        sin_cambio = []
+        dispositivos = Device.objects.filter(pk__in=destinos).order_by('pk').select_for_update()
+        for dispositivo in dispositivos.values(*CAMPOS_LECTURA):
+            destino = destinos[dispositivo['id']]
+            if dispositivo['estado'] in Device.FINAL_STATES or dispositivo['estado'] == destino:
+                sin_cambio.append(dispositivo['id'])
+            else:
+                grupos[destino].append(dispositivo)
+
+        if sin_cambio:
+            Device.objects.filter(pk__in=sin_cambio, asignacion_actual__in=ids).update(asignacion_actual=None)
+        for destino, filas_destino in grupos.items():
+            aplicar_transicion(
+                filas_destino, destino, user=user,
+                auditoria_extra={'bulk': [None, True]}, cambios_extra={'asignacion_actual': None}
+            )
+        resultado['dispositivos'] = {destino: len(filas_destino) for destino, filas_destino in grupos.items()}
+        resultado['dispositivos']['sin_cambio'] = len(sin_cambio)
+
+        # 4. Offboarding: desactivar empleados sin asignaciones activas restantes
+        desactivados = []
+        if desactivar_empleados:
+            candidatos = set(empleados) if empleados is not None else {fila['empleado_id'] for fila in aplicables}
+            # {pk: fecha_inactivacion anterior}, para la auditoría
+            desactivados = dict(
+                Employee.objects.filter(pk__in=candidatos, activo=True)
+                .exclude(assignment__estado_asignacion='ACTIVA')
+                .values_list('pk', 'fecha_inactivacion')
+            )
+            Employee.objects.filter(pk__in=desactivados).update(activo=False, fecha_inactivacion=ahora)
+        resultado['empleados_desactivados'] = len(desactivados)
+
+        invalidar_inventario()
+
+        # 5. Auditoría: devoluciones, asignaciones finalizadas y empleados desactivados
+        if user and user.is_authenticated:
+            registros = [
+                AuditLog(user=user, action='CREATE', entity_type='Return', entity_id=devolucion.id, changes={
+                    **devolucion.cambios_auditoria(),
+                    'bulk': [None, True],
+                })
+                for devolucion in devoluciones
+            ]
+            registros += [
+                AuditLog(user=user, action='UPDATE', entity_type='Assignment', entity_id=pk, changes={
+                    'estado_asignacion': ['ACTIVA', 'FINALIZADA'], 'bulk': [None, True],
+                })
+                for pk in ids
+            ]
+            registros += [
+                AuditLog(user=user, action='UPDATE', entity_type='Employee', entity_id=pk, changes={
+                    'activo': [True, False],
+                    'fecha_inactivacion': [valor_auditable(anterior), valor_auditable(ahora)],
+                    'bulk': [None, True],
+                })
+                for pk, anterior in desactivados.items()
+            ]
+            registrar_lote(registros)
+
+    return resultado
@@ -1,13 +1,47 @@
 """
 Señales para el módulo de asignaciones.
 
-Gestiona el cambio automático de estado de dispositivos cuando se crean o modifican asignaciones.
+Gestiona el cambio automático de estado de dispositivos cuando se crean o modifican asignaciones,
+y mantiene sincronizado el puntero desnormalizado Device.asignacion_actual.
 """
 from django.db.models.signals import post_save, pre_delete
 from django.dispatch import receiver
 from .models import Assignment, Return
 
 
+def sync_device_active_assignment(assignment):
+    """
+    Sincroniza Device.asignacion_actual con el estado de la asignación.
+
+    - Asignación ACTIVA: el dispositivo apunta a ella.
+    - Asignación FINALIZADA: si el dispositivo apuntaba a ella, se limpia el puntero.
+
+    Usa UPDATE directo (sin save()) para no disparar la auditoría del dispositivo,
+    y actualiza también la instancia en memoria si ya estaba cargada, para que un
+    save() posterior sobre el mismo objeto no reescriba un valor obsoleto.
+    """
+    if not assignment.dispositivo_id:
+        return
+
+    from apps.devices.models import Device
+
+    dispositivo = assignment.dispositivo if Assignment.dispositivo.is_cached(assignment) else None
+
+    if assignment.estado_asignacion == 'ACTIVA':
+        if dispositivo is not None and dispositivo.asignacion_actual_id == assignment.id:
+            return
+        Device.objects.filter(pk=assignment.dispositivo_id).update(asignacion_actual=assignment)
+        if dispositivo is not None:
+            dispositivo.asignacion_actual = assignment
+    else:
+        Device.objects.filter(
+            pk=assignment.dispositivo_id,
+            asignacion_actual=assignment
+        ).update(asignacion_actual=None)
+        if dispositivo is not None and dispositivo.asignacion_actual_id == assignment.id:
+            dispositivo.asignacion_actual = None
+
+
 @receiver(post_save, sender=Assignment)
 def assignment_post_save(sender, instance, created, **kwargs):
     """
@@ -16,8 +50,15 @@ def assignment_post_save(sender, instance, created, **kwargs):
     Acciones:
     - Al crear una asignación ACTIVA: cambiar dispositivo a ASIGNADO
     - Si tiene solicitud vinculada: marcar solicitud como COMPLETADA
-    - Al finalizar una asignación: no hace nada (se maneja en Return)
+    - Al finalizar una asignación: limpia Device.asignacion_actual (el estado se maneja en Return)
+
+    Las asignaciones creadas con apps/assignments/services.py ya aplicaron estos efectos.
     """
+    if getattr(instance, '_sincronizada', False):
+        return
+
+    sync_device_active_assignment(instance)
+
     # Solo ejecutar si es una asignación ACTIVA
     if instance.estado_asignacion == 'ACTIVA':
         dispositivo = instance.dispositivo
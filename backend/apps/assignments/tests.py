@@ -2,47 +2,35 @@
 Tests para el módulo de asignaciones (Fase 17.1)
 Prueba el flujo completo: empleado → dispositivo → solicitud → asignación → devolución
 """
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.contrib.auth import get_user_model
 from apps.branches.models import Branch
 from apps.employees.models import Employee
 from apps.devices.models import Device
+from apps.devices import summary
 from apps.assignments.models import Request, Assignment, Return
+from apps.users.testing import InventarioTestMixin
 from datetime import date, timedelta
 
 User = get_user_model()
 
 
-class AssignmentFlowTestCase(TestCase):
+class AssignmentTestMixin(InventarioTestMixin):
+    """Datos base compartidos por los tests de asignaciones: admin, sucursal y empleado."""
+
+    datos_empleado = {'rut': '12345678-9', 'nombre_completo': 'Juan Pérez Test', 'cargo': 'Desarrollador'}
+
+
+class AssignmentFlowTestCase(AssignmentTestMixin, TestCase):
     """
     Test del flujo completo de asignación según Paso 17.1
     """
 
     def setUp(self):
         """Configuración inicial para cada test"""
-        # Crear usuario admin
-        self.admin_user = User.objects.create_user(
-            username='admin_test',
-            password='test123',
-            role='ADMIN'
-        )
-
-        # Crear sucursal
-        self.branch = Branch.objects.create(
-            nombre='Sucursal Test',
-            codigo='TST-01',
-            is_active=True
-        )
-
-        # Crear empleado
-        self.employee = Employee.objects.create(
-            rut='12345678-9',
-            nombre_completo='Juan Pérez Test',
-            cargo='Desarrollador',
-            sucursal=self.branch,
-            estado='ACTIVO',
-            created_by=self.admin_user
-        )
+        super().setUp()
 
         # Crear dispositivo
         self.device = Device.objects.create(
@@ -374,3 +362,348 @@ class ValidationTestCase(TestCase):
 
         self.assertGreaterEqual(devolucion.fecha_devolucion, assignment.fecha_entrega)
         print("✅ Validación: Fecha de devolución posterior a entrega")
+
+
+class AssignmentServiceTestCase(AssignmentTestMixin, TestCase):
+    """Creación de asignaciones con apps/assignments/services.py."""
+
+    def test_alta_en_una_transaccion(self):
+        from apps.users.audit import AuditLog
+
+        device = self.create_device('SRV-001')
+        solicitud = Request.objects.create(
+            empleado=self.employee, jefatura_solicitante='Jefatura', tipo_dispositivo='LAPTOP',
+            created_by=self.admin_user
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/assignments/assignments/', {
+                'empleado': self.employee.id, 'dispositivo': device.id, 'solicitud': solicitud.id,
+                'tipo_entrega': 'PERMANENTE', 'fecha_entrega': date.today().isoformat(),
+            }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        sql = [q['sql'] for q in queries.captured_queries]
+        self.assertEqual(sum(q.startswith('UPDATE "devices_device"') for q in sql), 1)
+        self.assertEqual(sum(q.startswith('INSERT INTO "assignments_assignment"') for q in sql), 1)
+        self.assertEqual(sum(q.startswith('UPDATE "assignments_request"') for q in sql), 1)
+
+        device.refresh_from_db()
+        solicitud.refresh_from_db()
+        self.assertEqual(device.estado, 'ASIGNADO')
+        self.assertEqual(device.asignacion_actual_id, response.data['id'])
+        self.assertEqual(solicitud.estado, 'COMPLETADA')
+        self.assertEqual(AuditLog.objects.filter(entity_type='Assignment').count(), 1)
+        self.assertEqual(AuditLog.objects.filter(entity_type='Device', entity_id=device.id, action='UPDATE').count(), 1)
+        self.assertEqual(summary.diferencias_resumen(), [])
+
+    def test_servicio_cantidad_de_consultas(self):
+        from apps.assignments.services import crear_asignacion
+
+        device = self.create_device('SRV-005')
+        # Bloqueo, INSERT, UPDATE del dispositivo, resumen (con alta de la clave ASIGNADO),
+        # dos entradas de auditoría y los savepoints de las transacciones anidadas
+        with self.assertNumQueries(15):
+            crear_asignacion({
+                'empleado': self.employee, 'dispositivo': device, 'tipo_entrega': 'PERMANENTE',
+                'fecha_entrega': date.today(), 'created_by': self.admin_user,
+            })
+
+    def test_instancia_retornada_se_audita_al_guardar(self):
+        from apps.assignments.services import crear_asignacion
+        from apps.users.audit import AuditLog
+
+        asignacion = crear_asignacion({
+            'empleado': self.employee, 'dispositivo': self.create_device('SRV-006'),
+            'tipo_entrega': 'PERMANENTE', 'fecha_entrega': date.today(), 'created_by': self.admin_user,
+        })
+        self.assertFalse(hasattr(asignacion, '_skip_audit'))
+        self.assertFalse(hasattr(asignacion, '_sincronizada'))
+
+        asignacion.observaciones = 'Editada'
+        asignacion.save()
+        registro = AuditLog.objects.get(entity_type='Assignment', entity_id=asignacion.id, action='UPDATE')
+        self.assertEqual(registro.changes['observaciones'], [None, 'Editada'])
+
+    def test_dispositivo_con_asignacion_activa(self):
+        device = self.create_device('SRV-002')
+        self.assign(device)
+
+        response = self.client.post('/api/assignments/assignments/', {
+            'empleado': self.employee.id, 'dispositivo': device.id,
+            'tipo_entrega': 'PERMANENTE', 'fecha_entrega': date.today().isoformat(),
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('dispositivo', response.data)
+
+    def test_indice_unico_de_asignacion_activa(self):
+        from django.db import IntegrityError, transaction
+
+        device = self.create_device('SRV-003')
+        self.assign(device)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Assignment.objects.create(
+                empleado=self.employee, dispositivo=device, tipo_entrega='TEMPORAL',
+                fecha_entrega=date.today(), created_by=self.admin_user
+            )
+
+        # Las asignaciones finalizadas no cuentan
+        self.assign(self.create_device('SRV-004'), estado_asignacion='FINALIZADA')
+
+
+class AssignmentServiceConcurrencyTestCase(AssignmentTestMixin, TransactionTestCase):
+    """Muchos hilos intentan asignar el mismo dispositivo: solo uno debe lograrlo."""
+
+    HILOS = 8
+    REINTENTOS = 50  # Por hilo, mientras SQLite está bloqueado por otro
+    TIMEOUT = 30  # Segundos de espera por hilo
+
+    def test_asignacion_concurrente(self):
+        import threading
+        import time
+        from django.db import OperationalError, connection as conexion
+        from rest_framework.exceptions import ValidationError
+        from apps.assignments.services import crear_asignacion
+
+        device = self.create_device('SRV-CONC-001')
+        barrera = threading.Barrier(self.HILOS, timeout=self.TIMEOUT)
+        resultados = []
+        errores = []
+
+        def asignar():
+            try:
+                instancia = Device.objects.get(pk=device.pk)
+                barrera.wait()
+                for intento in range(self.REINTENTOS):
+                    try:
+                        crear_asignacion({
+                            'empleado': self.employee, 'dispositivo': instancia, 'tipo_entrega': 'PERMANENTE',
+                            'fecha_entrega': date.today(), 'created_by': self.admin_user,
+                        })
+                        resultados.append('ok')
+                        break
+                    except ValidationError:
+                        resultados.append('rechazada')
+                        break
+                    except OperationalError:
+                        # SQLite bloqueado por otro hilo: reintentar hasta REINTENTOS veces
+                        if intento == self.REINTENTOS - 1:
+                            raise
+                        time.sleep(0.05)
+            except Exception as exc:
+                errores.append(exc)
+            finally:
+                conexion.close()
+
+        hilos = [threading.Thread(target=asignar) for _ in range(self.HILOS)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join(self.TIMEOUT)
+        self.assertFalse([hilo for hilo in hilos if hilo.is_alive()], 'Hilos sin terminar')
+        self.assertEqual(errores, [])
+
+        self.assertEqual(resultados.count('ok'), 1)
+        self.assertEqual(resultados.count('rechazada'), self.HILOS - 1)
+        self.assertEqual(Assignment.objects.filter(dispositivo=device, estado_asignacion='ACTIVA').count(), 1)
+        device.refresh_from_db()
+        self.assertEqual(device.estado, 'ASIGNADO')
+        self.assertEqual(summary.diferencias_resumen(), [])
+
+
+class BulkReturnTestCase(AssignmentTestMixin, TestCase):
+    """Devolución masiva y offboarding de empleados (POST /api/assignments/returns/bulk/)."""
+
+    URL = '/api/assignments/returns/bulk/'
+
+    def test_offboarding_de_empleado(self):
+        from apps.users.audit import AuditLog
+
+        devices = [self.create_device(f'BR-{i:03d}') for i in range(3)]
+        assignments = [self.assign(device) for device in devices]
+        auditoria = AuditLog.objects.count()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.URL, {
+                'empleado': self.employee.id,
+                'items': [{'asignacion': assignments[1].id, 'estado_dispositivo': 'CON_DANOS', 'observaciones': 'Pantalla rota'}],
+                'desactivar_empleados': True,
+            }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['devoluciones'], 3)
+        self.assertEqual(response.data['por_estado_dispositivo'], {'OPTIMO': 2, 'CON_DANOS': 1})
+        self.assertEqual(response.data['dispositivos'], {'DISPONIBLE': 2, 'MANTENIMIENTO': 1, 'sin_cambio': 0})
+        self.assertEqual(response.data['empleados_desactivados'], 1)
+        self.assertEqual(response.data['rechazados'], 0)
+
+        # Sentencias masivas: la cantidad no depende del número de asignaciones
+        sql = [q['sql'] for q in queries.captured_queries]
+        self.assertEqual(sum(q.startswith('INSERT INTO "assignments_return"') for q in sql), 1)
+        self.assertEqual(sum(q.startswith('UPDATE "assignments_assignment"') for q in sql), 1)
+        self.assertEqual(sum(q.startswith('UPDATE "devices_device"') for q in sql), 2)
+
+        for device in devices:
+            device.refresh_from_db()
+            self.assertIsNone(device.asignacion_actual_id)
+        self.assertEqual([device.estado for device in devices], ['DISPONIBLE', 'MANTENIMIENTO', 'DISPONIBLE'])
+        self.assertFalse(Assignment.objects.filter(estado_asignacion='ACTIVA').exists())
+        self.assertEqual(Return.objects.get(asignacion=assignments[1]).observaciones, 'Pantalla rota')
+        self.employee.refresh_from_db()
+        self.assertFalse(self.employee.activo)
+        self.assertIsNotNone(self.employee.fecha_inactivacion)
+        # 3 devoluciones + 3 asignaciones + 3 dispositivos + 1 empleado
+        self.assertEqual(AuditLog.objects.count(), auditoria + 10)
+        # Mismos campos que la desactivación individual (EmployeeViewSet.perform_destroy)
+        registro = AuditLog.objects.get(entity_type='Employee', entity_id=self.employee.id, action='UPDATE')
+        self.assertEqual(registro.changes['activo'], [True, False])
+        self.assertEqual(registro.changes['fecha_inactivacion'], [None, self.employee.fecha_inactivacion.isoformat()])
+        self.assertEqual(summary.diferencias_resumen(), [])
+
+    def test_rechazados_por_asignacion(self):
+        device = self.create_device('BR-010')
+        futura = self.assign(self.create_device('BR-011'), fecha_entrega=date.today() + timedelta(days=5))
+        activa = self.assign(device)
+
+        response = self.client.post(self.URL, {
+            'asignaciones': [activa.id, futura.id, 999999],
+            'estado_dispositivo': 'NO_FUNCIONAL',
+            'desactivar_empleados': True,
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['devoluciones'], 1)
+        self.assertEqual(response.data['rechazados'], 2)
+        self.assertEqual(
+            {rechazado['asignacion'] for rechazado in response.data['rechazados_detalle']}, {futura.id, 999999}
+        )
+        # El empleado conserva una asignación activa: no se desactiva
+        self.assertEqual(response.data['empleados_desactivados'], 0)
+        device.refresh_from_db()
+        self.assertEqual(device.estado, 'MANTENIMIENTO')
+
+    def test_alcance_obligatorio(self):
+        response = self.client.post(self.URL, {'estado_dispositivo': 'OPTIMO'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(self.URL, {'empleados': [self.employee.id]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['devoluciones'], 0)
+
+
+class AssignmentHistoryTestCase(AssignmentTestMixin, TestCase):
+    """Historial de asignaciones plano, paginado por cursor y con ?expand= a pedido."""
+
+    def setUp(self):
+        super().setUp()
+        self.device = self.create_device('HIS-001')
+        for dias in (30, 20, 10):
+            asignacion = self.assign(self.device, fecha_entrega=date.today() - timedelta(days=dias))
+            Return.objects.create(
+                asignacion=asignacion, fecha_devolucion=date.today() - timedelta(days=dias - 5),
+                estado_dispositivo='OPTIMO', created_by=self.admin_user
+            )
+        self.activa = self.assign(self.device)
+
+    def test_historial_plano_con_cursor(self):
+        url = f'/api/devices/{self.device.id}/history/?page_size=3'
+        # get_object + totales + página
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_assignments'], 4)
+        self.assertEqual(response.data['active_assignments'], 1)
+        filas = response.data['assignments']
+        self.assertEqual(len(filas), 3)
+        self.assertEqual(filas[0]['id'], self.activa.id)
+        self.assertEqual(filas[0]['empleado_nombre'], 'Juan Pérez Test')
+        self.assertEqual(filas[1]['devolucion_estado_dispositivo'], 'OPTIMO')
+        self.assertNotIn('empleado_detail', filas[0])
+        self.assertIsNone(response.data['previous'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['assignments']), 1)
+        self.assertIsNone(response.data['next'])
+
+    def test_historial_de_empleado_con_expand(self):
+        url = f'/api/employees/{self.employee.id}/history/?expand=dispositivo,solicitud'
+        # get_object + totales + página + dispositivos (sin solicitudes no se consulta)
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_assignments'], 4)
+        fila = response.data['assignments'][0]
+        self.assertEqual(fila['dispositivo_detail']['numero_serie'], 'HIS-001')
+        self.assertIsNone(fila['solicitud_detail'])
+
+        response = self.client.get(f'/api/employees/{self.employee.id}/history/?expand=todo')
+        self.assertEqual(response.status_code, 400)
+
+
+class RequestListQueriesTestCase(AssignmentTestMixin, TestCase):
+    """Listado de solicitudes con cantidad de consultas fija."""
+
+    def setUp(self):
+        super().setUp()
+        for i in range(6):
+            empleado = Employee.objects.create(
+                rut=f'1111111{i}-{i}', nombre_completo=f'Empleado {i}', cargo='Analista',
+                sucursal=Branch.objects.create(nombre=f'Sucursal R{i}', codigo=f'RQ-{i}'),
+                created_by=self.admin_user
+            )
+            Request.objects.create(
+                empleado=empleado, sucursal=empleado.sucursal, jefatura_solicitante='Jefatura',
+                tipo_dispositivo='LAPTOP', estado='PENDIENTE' if i % 2 else 'COMPLETADA',
+                created_by=self.admin_user
+            )
+
+    def test_consultas_fijas_por_pagina(self):
+        # COUNT(*) de la paginación + un SELECT con todos los datos relacionados
+        for page_size in (1, 3, 6):
+            with self.assertNumQueries(2):
+                response = self.client.get(f'/api/assignments/requests/?page_size={page_size}')
+            self.assertEqual(len(response.data['results']), page_size)
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/assignments/requests/?estado=PENDIENTE')
+        self.assertEqual(response.data['count'], 3)
+        fila = response.data['results'][0]
+        self.assertEqual(set(fila['empleado_detail']), {'id', 'nombre_completo', 'rut'})
+        self.assertTrue(fila['sucursal_detail']['nombre'].startswith('Sucursal R'))
+        self.assertEqual(fila['created_by_username'], 'admin_test')
+
+
+class ReturnListQueriesTestCase(AssignmentTestMixin, TestCase):
+    """Listado de devoluciones en un solo SELECT; el detalle mantiene la asignación anidada."""
+
+    def setUp(self):
+        super().setUp()
+        self.returns = []
+        for i in range(5):
+            asignacion = self.assign(self.create_device(f'RET-{i:03d}'))
+            self.returns.append(Return.objects.create(
+                asignacion=asignacion, fecha_devolucion=date.today(),
+                estado_dispositivo='OPTIMO', created_by=self.admin_user
+            ))
+
+    def test_consultas_fijas_por_pagina(self):
+        for page_size in (1, 5):
+            with self.assertNumQueries(2):
+                response = self.client.get(f'/api/assignments/returns/?page_size={page_size}')
+            self.assertEqual(len(response.data['results']), page_size)
+
+        fila = response.data['results'][0]
+        self.assertEqual(fila['empleado_nombre'], 'Juan Pérez Test')
+        self.assertEqual(fila['empleado_sucursal'], 'Sucursal Test')
+        self.assertTrue(fila['dispositivo_serial'].startswith('RET-'))
+        self.assertNotIn('asignacion_detail', fila)
+
+    def test_detalle_con_asignacion_anidada(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/assignments/returns/{self.returns[0].id}/')
+        self.assertEqual(response.status_code, 200)
+        detalle = response.data['asignacion_detail']
+        self.assertEqual(detalle['empleado_detail']['nombre_completo'], 'Juan Pérez Test')
+        self.assertEqual(detalle['dispositivo_detail']['numero_serie'], 'RET-000')
@@ -3,12 +3,18 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.http import HttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
+from config.exports import EXPORT_FORMATS, EXPORT_RENDERERS, stream_export
+from config.search import FullTextSearchFilter
+from apps.devices.transitions import ConflictoEstado
 from .models import Request, Assignment, Return
 from .serializers import (
     RequestSerializer,
+    RequestListSerializer,
     AssignmentSerializer,
     AssignmentListSerializer,
     ReturnSerializer,
+    ReturnListSerializer,
+    BulkReturnSerializer,
     ResponsibilityLetterSerializer,
     DiscountLetterSerializer
 )
@@ -20,13 +26,44 @@ class RequestViewSet(viewsets.ModelViewSet):
     ViewSet para gestionar las solicitudes de dispositivos.
     Proporciona operaciones CRUD completas con filtros y búsqueda.
     """
-    queryset = Request.objects.select_related('empleado', 'created_by').all()
     serializer_class = RequestSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['estado', 'empleado', 'tipo_dispositivo']
     search_fields = ['jefatura_solicitante', 'justificacion', 'empleado__nombre_completo', 'empleado__rut']
     ordering_fields = ['fecha_solicitud', 'estado', 'created_at']
     ordering = ['-fecha_solicitud']
+    cursor_ordering = ('-fecha_solicitud', '-id')  # Paginación ?cursor= (ver config/pagination.py)
+
+    def get_queryset(self):
+        """
+        Queryset optimizado según la acción.
+        Listado: un solo SELECT con JOIN a empleado, sucursal y usuario, solo con las
+        columnas de RequestListSerializer. ?estado= usa el índice (estado, fecha_solicitud).
+        """
+        if self.action == 'list':
+            return Request.objects.select_related('empleado', 'sucursal', 'created_by').only(
+                'id', 'empleado', 'sucursal', 'motivo', 'jefatura_solicitante', 'tipo_dispositivo',
+                'justificacion', 'fecha_solicitud', 'estado', 'created_by', 'created_at', 'updated_at',
+                'empleado__nombre_completo', 'empleado__rut',
+                'sucursal__nombre', 'sucursal__codigo', 'sucursal__is_active',
+                'created_by__username',
+            )
+        return Request.objects.select_related(
+            'empleado',
+            'empleado__sucursal',
+            'empleado__unidad_negocio',
+            'empleado__created_by',
+            'sucursal',
+            'created_by'
+        )
+
+    def get_serializer_class(self):
+        """
+        Usa serializer ligero para listados, completo para detalle.
+        """
+        if self.action == 'list':
+            return RequestListSerializer
+        return RequestSerializer
 
     def perform_create(self, serializer):
         """
@@ -57,7 +94,7 @@ class AssignmentViewSet(viewsets.ModelViewSet):
     OPTIMIZADO: Usa AssignmentListSerializer para listados y AssignmentSerializer para detalle.
     """
     serializer_class = AssignmentSerializer  # Por defecto (detail, create, update)
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['estado_asignacion', 'empleado', 'dispositivo', 'tipo_entrega', 'estado_carta']
     search_fields = [
         'empleado__nombre_completo',
@@ -70,6 +107,7 @@ class AssignmentViewSet(viewsets.ModelViewSet):
     ]
     ordering_fields = ['fecha_entrega', 'fecha_devolucion', 'estado_asignacion', 'created_at']
     ordering = ['-fecha_entrega']
+    cursor_ordering = ('-fecha_entrega', '-id')  # Paginación ?cursor= (ver config/pagination.py)
 
     def get_queryset(self):
         """
@@ -77,18 +115,22 @@ class AssignmentViewSet(viewsets.ModelViewSet):
         Para listados usa select_related optimizado, para detalle incluye todo.
         """
         if self.action == 'list':
-            # Listado: solo campos necesarios para la tabla
+            # Listado: solo campos necesarios para la tabla.
+            # El valor depreciado se calcula en SQL para no cargar campos diferidos por fila.
+            from apps.devices.depreciation import anotaciones_depreciacion
+
             return Assignment.objects.select_related(
                 'empleado',
                 'empleado__sucursal',
                 'dispositivo'
             ).only(
                 # Solo campos necesarios
-                'id', 'tipo_entrega', 'fecha_entrega', 'estado_asignacion', 'created_at',
-                'empleado__nombre_completo', 'empleado__sucursal__nombre',
+                'id', 'tipo_entrega', 'fecha_entrega', 'estado_asignacion', 'estado_carta',
+                'discount_data', 'created_at',
+                'empleado__nombre_completo', 'empleado__rut', 'empleado__sucursal__nombre',
                 'dispositivo__tipo_equipo', 'dispositivo__marca', 'dispositivo__modelo',
-                'dispositivo__numero_serie', 'dispositivo__imei'
-            )
+                'dispositivo__numero_serie', 'dispositivo__imei', 'dispositivo__valor_depreciado'
+            ).annotate(**anotaciones_depreciacion(prefix='dispositivo__'))
         # Detalle: todo completo
         return Assignment.objects.select_related(
             'empleado',
@@ -255,53 +297,60 @@ class AssignmentViewSet(viewsets.ModelViewSet):
             pdf_buffer = generator.generate_discount_letter(assignment, discount_data)
             filename = f'carta_descuento_{assignment.id}.pdf'
 
-            # Cambiar estado del dispositivo a ROBO
-            assignment.dispositivo.change_status('ROBO', user=request.user)
-
-            # Finalizar la asignación
-            assignment.estado_asignacion = 'FINALIZADA'
-
-            # Agregar observación automática
-            from django.utils import timezone
-            fecha_reporte = timezone.now().strftime('%d/%m/%Y')
-            observacion_automatica = f"Dispositivo reportado como robado/perdido el {fecha_reporte}. Carta de descuento generada."
-
-            # Si ya hay observaciones, agregar al final; si no, crear nueva
-            if assignment.observaciones:
-                assignment.observaciones += f"\n\n{observacion_automatica}"
-            else:
-                assignment.observaciones = observacion_automatica
-
-            # Guardar datos de descuento en formato estructurado con snapshot del dispositivo
-            assignment.discount_data = {
-                'monto_total': str(discount_data['monto_total']),
-                'numero_cuotas': discount_data['numero_cuotas'],
-                'mes_primera_cuota': discount_data['mes_primera_cuota'],
-                'fecha_generacion': timezone.now().isoformat(),
-                # Snapshot del dispositivo para preservar datos históricos incluso si se elimina
-                'dispositivo_snapshot': {
-                    'id': assignment.dispositivo.id,
-                    'tipo_equipo': assignment.dispositivo.tipo_equipo,
-                    'tipo_equipo_display': assignment.dispositivo.get_tipo_equipo_display(),
-                    'marca': assignment.dispositivo.marca,
-                    'modelo': assignment.dispositivo.modelo,
-                    'numero_serie': assignment.dispositivo.numero_serie,
-                    'imei': assignment.dispositivo.imei,
-                    'numero_telefono': assignment.dispositivo.numero_telefono,
-                    'estado': 'ROBO',
-                    'sucursal_id': assignment.dispositivo.sucursal_id,
-                    'sucursal_nombre': assignment.dispositivo.sucursal.nombre if assignment.dispositivo.sucursal else None,
+            from django.db import transaction
+
+            with transaction.atomic():
+                # Cambiar estado del dispositivo a ROBO (compare-and-set: si otra solicitud ya lo
+                # cambió, lanza ConflictoEstado y no se finaliza la asignación)
+                assignment.dispositivo.change_status('ROBO', user=request.user)
+
+                # Finalizar la asignación
+                assignment.estado_asignacion = 'FINALIZADA'
+
+                # Agregar observación automática
+                from django.utils import timezone
+                fecha_reporte = timezone.now().strftime('%d/%m/%Y')
+                observacion_automatica = f"Dispositivo reportado como robado/perdido el {fecha_reporte}. Carta de descuento generada."
+
+                # Si ya hay observaciones, agregar al final; si no, crear nueva
+                if assignment.observaciones:
+                    assignment.observaciones += f"\n\n{observacion_automatica}"
+                else:
+                    assignment.observaciones = observacion_automatica
+
+                # Guardar datos de descuento en formato estructurado con snapshot del dispositivo
+                assignment.discount_data = {
+                    'monto_total': str(discount_data['monto_total']),
+                    'numero_cuotas': discount_data['numero_cuotas'],
+                    'mes_primera_cuota': discount_data['mes_primera_cuota'],
+                    'fecha_generacion': timezone.now().isoformat(),
+                    # Snapshot del dispositivo para preservar datos históricos incluso si se elimina
+                    'dispositivo_snapshot': {
+                        'id': assignment.dispositivo.id,
+                        'tipo_equipo': assignment.dispositivo.tipo_equipo,
+                        'tipo_equipo_display': assignment.dispositivo.get_tipo_equipo_display(),
+                        'marca': assignment.dispositivo.marca,
+                        'modelo': assignment.dispositivo.modelo,
+                        'numero_serie': assignment.dispositivo.numero_serie,
+                        'imei': assignment.dispositivo.imei,
+                        'numero_telefono': assignment.dispositivo.numero_telefono,
+                        'estado': 'ROBO',
+                        'sucursal_id': assignment.dispositivo.sucursal_id,
+                        'sucursal_nombre': assignment.dispositivo.sucursal.nombre if assignment.dispositivo.sucursal else None,
+                    }
                 }
-            }
 
-            # Guardar cambios en la asignación
-            assignment.save(update_fields=['estado_asignacion', 'observaciones', 'discount_data', 'updated_at'])
+                # Guardar cambios en la asignación
+                assignment.save(update_fields=['estado_asignacion', 'observaciones', 'discount_data', 'updated_at'])
 
             # Retornar PDF
             response = HttpResponse(pdf_buffer.read(), content_type='application/pdf')
             response['Content-Disposition'] = f'attachment; filename="{filename}"'
             return response
 
+        except ConflictoEstado as e:
+            return Response({'error': str(e.detail)}, status=status.HTTP_409_CONFLICT)
+
         except Exception as e:
             return Response(
                 {'error': f'Error al generar la carta: {str(e)}'},
@@ -352,7 +401,7 @@ class AssignmentViewSet(viewsets.ModelViewSet):
             'assignment': serializer.data
         }, status=status.HTTP_200_OK)
 
-    @action(detail=False, methods=['get'], url_path='discount-reports')
+    @action(detail=False, methods=['get'], url_path='discount-reports', renderer_classes=EXPORT_RENDERERS)
     def discount_reports(self, request):
         """
         Endpoint especializado para reportes de descuentos por robo/pérdida.
@@ -367,6 +416,7 @@ class AssignmentViewSet(viewsets.ModelViewSet):
           - tipo_dispositivo: LAPTOP, TELEFONO, DESKTOP, TABLET, TV, SIMCARD
           - page: número de página (default 1)
           - page_size: tamaño de página (default 20, max 1000 para exportación)
+          - format: csv | ndjson para descargar el reporte completo en streaming (sin paginar)
 
         Returns:
           - Lista paginada de asignaciones finalizadas con dispositivos en estado ROBO
@@ -419,6 +469,45 @@ class AssignmentViewSet(viewsets.ModelViewSet):
                 Q(dispositivo__isnull=True, discount_data__dispositivo_snapshot__tipo_equipo=tipo_dispositivo)
             )
 
+        # Exportación completa en streaming
+        if request.accepted_renderer.format in EXPORT_FORMATS:
+            from apps.devices.models import Device
+            tipos = dict(Device.TIPO_CHOICES)
+
+            def dispositivo(campo):
+                # Dispositivos eliminados: datos desde el snapshot guardado en discount_data
+                def valor(fila):
+                    if fila['dispositivo_id']:
+                        return fila[f'dispositivo__{campo}']
+                    return ((fila['discount_data'] or {}).get('dispositivo_snapshot') or {}).get(campo)
+                return valor
+
+            def descuento(campo):
+                return lambda fila: (fila['discount_data'] or {}).get(campo)
+
+            return stream_export(
+                queryset.select_related(None),
+                [
+                    ('empleado_nombre', 'Empleado', 'empleado__nombre_completo'),
+                    ('empleado_rut', 'RUT', 'empleado__rut'),
+                    ('sucursal', 'Sucursal', 'empleado__sucursal__nombre'),
+                    ('tipo_dispositivo', 'Tipo Dispositivo', lambda fila: tipos.get(dispositivo('tipo_equipo')(fila))),
+                    ('marca', 'Marca', dispositivo('marca')),
+                    ('modelo', 'Modelo', dispositivo('modelo')),
+                    ('numero_serie', 'Número de Serie', lambda fila: dispositivo('numero_serie')(fila) or dispositivo('imei')(fila)),
+                    ('fecha_reporte', 'Fecha Reporte', 'updated_at'),
+                    ('monto_total', 'Monto Total', descuento('monto_total')),
+                    ('numero_cuotas', 'Número Cuotas', descuento('numero_cuotas')),
+                    ('mes_primera_cuota', 'Mes Primera Cuota', descuento('mes_primera_cuota')),
+                ],
+                request.accepted_renderer.format,
+                'reporte_descuentos_robo_perdida',
+                campos=[
+                    'dispositivo_id', 'discount_data', 'dispositivo__tipo_equipo', 'dispositivo__marca',
+                    'dispositivo__modelo', 'dispositivo__numero_serie', 'dispositivo__imei',
+                ],
+            )
+
         # Paginación
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -428,7 +517,7 @@ class AssignmentViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
-    @action(detail=False, methods=['get'], url_path='active-assignments-report')
+    @action(detail=False, methods=['get'], url_path='active-assignments-report', renderer_classes=EXPORT_RENDERERS)
     def active_assignments_report(self, request):
         """
         Endpoint especializado para reportes de dispositivos asignados activos.
@@ -442,6 +531,7 @@ class AssignmentViewSet(viewsets.ModelViewSet):
           - tipo_dispositivo: LAPTOP, TELEFONO, DESKTOP, TABLET, TV, SIM, ACCESORIO
           - page: número de página (default 1)
           - page_size: tamaño de página (default 20, max 1000 para exportación)
+          - format: csv | ndjson para descargar el reporte completo en streaming (sin paginar)
 
         Returns:
           - Lista paginada de asignaciones activas
@@ -485,6 +575,34 @@ class AssignmentViewSet(viewsets.ModelViewSet):
         if tipo_dispositivo:
             queryset = queryset.filter(dispositivo__tipo_equipo=tipo_dispositivo)
 
+        # Exportación completa en streaming
+        if request.accepted_renderer.format in EXPORT_FORMATS:
+            from apps.devices.models import Device
+            tipos = dict(Device.TIPO_CHOICES)
+            tipos_entrega = dict(Assignment.TIPO_ENTREGA_CHOICES)
+            estados_carta = dict(Assignment.ESTADO_CARTA_CHOICES)
+            return stream_export(
+                queryset.select_related(None),
+                [
+                    ('empleado_nombre', 'Empleado', 'empleado__nombre_completo'),
+                    ('empleado_rut', 'RUT', 'empleado__rut'),
+                    ('cargo', 'Cargo', 'empleado__cargo'),
+                    ('sucursal', 'Sucursal', 'empleado__sucursal__nombre'),
+                    ('tipo_dispositivo', 'Tipo Dispositivo', lambda fila: tipos.get(fila['dispositivo__tipo_equipo'])),
+                    ('marca', 'Marca', 'dispositivo__marca'),
+                    ('modelo', 'Modelo', 'dispositivo__modelo'),
+                    ('numero_serie', 'Número de Serie', 'dispositivo__numero_serie'),
+                    ('imei', 'IMEI', 'dispositivo__imei'),
+                    ('fecha_entrega', 'Fecha Entrega', 'fecha_entrega'),
+                    ('tipo_entrega', 'Tipo Entrega', lambda fila: tipos_entrega.get(fila['tipo_entrega'])),
+                    ('estado_carta', 'Estado Carta', lambda fila: estados_carta.get(fila['estado_carta'])),
+                    ('fecha_firma', 'Fecha Firma', 'fecha_firma'),
+                ],
+                request.accepted_renderer.format,
+                'reporte_dispositivos_asignados',
+                campos=['dispositivo__tipo_equipo', 'tipo_entrega', 'estado_carta'],
+            )
+
         # Paginación
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -500,9 +618,8 @@ class ReturnViewSet(viewsets.ModelViewSet):
     ViewSet para gestionar las devoluciones de dispositivos.
     Proporciona operaciones CRUD completas con filtros y búsqueda.
     """
-    queryset = Return.objects.select_related('asignacion', 'created_by').all()
     serializer_class = ReturnSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['estado_dispositivo', 'asignacion']
     search_fields = [
         'asignacion__empleado__nombre_completo',
@@ -512,6 +629,54 @@ class ReturnViewSet(viewsets.ModelViewSet):
     ]
     ordering_fields = ['fecha_devolucion', 'created_at']
     ordering = ['-fecha_devolucion']
+    cursor_ordering = ('-fecha_devolucion', '-id')  # Paginación ?cursor= (ver config/pagination.py)
+
+    def get_queryset(self):
+        """
+        Queryset optimizado según la acción.
+        Listado: un solo SELECT con JOIN a asignación, empleado, sucursal y dispositivo,
+        solo con las columnas de ReturnListSerializer.
+        Detalle: todas las relaciones que anida ReturnSerializer (asignacion_detail).
+        """
+        if self.action == 'list':
+            return Return.objects.select_related(
+                'asignacion__empleado__sucursal',
+                'asignacion__dispositivo',
+                'created_by'
+            ).only(
+                'id', 'asignacion', 'fecha_devolucion', 'estado_dispositivo', 'observaciones',
+                'created_by', 'created_at',
+                'asignacion__fecha_entrega', 'asignacion__empleado', 'asignacion__dispositivo',
+                'asignacion__empleado__nombre_completo', 'asignacion__empleado__rut',
+                'asignacion__empleado__sucursal__nombre',
+                'asignacion__dispositivo__tipo_equipo', 'asignacion__dispositivo__marca',
+                'asignacion__dispositivo__modelo', 'asignacion__dispositivo__numero_serie',
+                'asignacion__dispositivo__imei',
+                'created_by__username',
+            )
+        return Return.objects.select_related(
+            'asignacion__empleado__sucursal',
+            'asignacion__empleado__unidad_negocio',
+            'asignacion__empleado__created_by',
+            'asignacion__dispositivo__sucursal',
+            'asignacion__dispositivo__created_by',
+            'asignacion__solicitud__empleado__sucursal',
+            'asignacion__solicitud__empleado__unidad_negocio',
+            'asignacion__solicitud__empleado__created_by',
+            'asignacion__solicitud__sucursal',
+            'asignacion__solicitud__created_by',
+            'asignacion__created_by',
+            'asignacion__firmado_por',
+            'created_by'
+        )
+
+    def get_serializer_class(self):
+        """
+        Usa serializer ligero para listados, completo para detalle.
+        """
+        if self.action == 'list':
+            return ReturnListSerializer
+        return ReturnSerializer
 
     def perform_create(self, serializer):
         """
@@ -529,3 +694,34 @@ class ReturnViewSet(viewsets.ModelViewSet):
             'detail': 'No se pueden eliminar devoluciones. Las devoluciones son registros '
                      'inmutables de auditoría y trazabilidad.'
         })
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Registra en una transacción las devoluciones de muchas asignaciones activas
+        (ej: egreso de un empleado o cierre de una sucursal).
+
+        POST /api/assignments/returns/bulk/
+        Body: {
+            empleado?: int,              # Todas las asignaciones activas de un empleado
+            empleados?: [int],           # ... de varios empleados
+            asignaciones?: [int],        # O asignaciones por ID
+            fecha_devolucion?: date,     # Por defecto hoy
+            estado_dispositivo?: OPTIMO | CON_DANOS | NO_FUNCIONAL,  # Por defecto OPTIMO
+            observaciones?: string,
+            items?: [{asignacion, estado_dispositivo, observaciones?}],  # Estado por asignación
+            desactivar_empleados?: bool  # Desactivar a los empleados (soft delete)
+        }
+
+        Mismo efecto que registrar cada devolución con POST /returns/ (ver
+        services.devolucion_masiva). Las asignaciones que no aplican se informan en
+        rechazados_detalle; el resto se devuelve.
+        """
+        from .services import devolucion_masiva
+
+        serializer = BulkReturnSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        resultado = devolucion_masiva(request.user, **serializer.validated_data)
+        codigo = status.HTTP_201_CREATED if resultado['devoluciones'] else status.HTTP_400_BAD_REQUEST
+        return Response(resultado, status=codigo)
@@ -1,6 +1,41 @@
 from django.db import models
 
 
+class BranchQuerySet(models.QuerySet):
+    """QuerySet de sucursales con estadísticas calculadas en base de datos."""
+
+    def con_estadisticas(self):
+        """
+        Anota total_dispositivos, total_empleados y dispositivos_<tipo> (uno por tipo de
+        equipo, ej: dispositivos_laptop) en una sola consulta, sin cargar dispositivos:
+
+        - Los conteos de dispositivos son agregaciones condicionales sobre el resumen de
+          inventario (InventorySummary), cuyo tamaño no depende de la cantidad de dispositivos.
+          Excluyen estados finales (ROBO, BAJA).
+        - total_empleados es una subconsulta, para no multiplicar las filas del JOIN anterior.
+        """
+        from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum
+        from django.db.models.functions import Coalesce
+        from apps.devices.models import Device
+        from apps.employees.models import Employee
+
+        vigentes = ~Q(inventario__estado__in=Device.FINAL_STATES)
+        empleados = Employee.objects.filter(
+            sucursal=OuterRef('pk')
+        ).order_by().values('sucursal').annotate(total=Count('id')).values('total')
+
+        return self.annotate(
+            total_dispositivos=Coalesce(Sum('inventario__total', filter=vigentes), 0),
+            total_empleados=Coalesce(Subquery(empleados, output_field=IntegerField()), 0),
+            **{
+                f'dispositivos_{tipo.lower()}': Coalesce(
+                    Sum('inventario__total', filter=vigentes & Q(inventario__tipo_equipo=tipo)), 0
+                )
+                for tipo, _ in Device.TIPO_CHOICES
+            }
+        )
+
+
 class Branch(models.Model):
     """
     Modelo para gestionar las sucursales de la empresa.
@@ -13,6 +48,8 @@ class Branch(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Última actualización')
 
+    objects = BranchQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Sucursal'
         verbose_name_plural = 'Sucursales'
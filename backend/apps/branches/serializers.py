@@ -17,6 +17,8 @@ class BranchSerializer(serializers.ModelSerializer):
     Serializer para el modelo Branch (Sucursal).
     Incluye estadísticas de dispositivos y empleados asociados.
     Las estadísticas se calculan con annotate() en el queryset del ViewSet.
+    Solo para los endpoints de sucursales: anidado en otros serializers se usa
+    BranchListSerializer, sin estadísticas.
     """
     # OPTIMIZADO: Ahora usa IntegerField en lugar de SerializerMethodField
     # Las estadísticas se pre-calculan en el queryset con annotate()
@@ -44,33 +46,64 @@ class BranchSerializer(serializers.ModelSerializer):
         Retorna la cantidad de dispositivos agrupados por tipo.
         IMPORTANTE: Excluye dispositivos con estados finales (ROBO, BAJA).
         """
-        # Si ya está en cache (pre-calculado), usarlo
-        if hasattr(obj, '_dispositivos_por_tipo_cache'):
-            return obj._dispositivos_por_tipo_cache
-
-        # Fallback optimizado (solo si es necesario)
-        from django.db.models import Count
         from apps.devices.models import Device
 
-        dispositivos = obj.device_set.exclude(
-            estado__in=Device.FINAL_STATES
-        ).values('tipo_equipo').annotate(
-            cantidad=Count('id')
-        )
-
-        # Crear diccionario con todos los tipos inicializados en 0
-        tipos = {
-            'LAPTOP': 0,
-            'DESKTOP': 0,
-            'TELEFONO': 0,
-            'TABLET': 0,
-            'TV': 0,
-            'SIM': 0,
-            'ACCESORIO': 0,
+        # Anotado por BranchQuerySet.con_estadisticas() (listado, detalle y edición). Sin
+        # anotaciones (respuesta de create) la sucursal es nueva: 0 por tipo, como los totales
+        return {
+            tipo: getattr(obj, f'dispositivos_{tipo.lower()}', 0)
+            for tipo, _ in Device.TIPO_CHOICES
         }
 
-        # Actualizar con los valores reales
-        for item in dispositivos:
-            tipos[item['tipo_equipo']] = item['cantidad']
 
-        return tipos
+class BranchTransferSerializer(serializers.Serializer):
+    """
+    Datos de un traspaso entre sucursales (ver BranchViewSet.transfer y services.transferir).
+
+    Requiere la sucursal de origen en el contexto ('origen'). validated_data queda listo
+    para transferir(): destino, dry_run y los querysets dispositivos/empleados
+    seleccionados por ID o por filtros.
+    """
+    destino = serializers.PrimaryKeyRelatedField(queryset=Branch.objects.filter(is_active=True))
+    dispositivos = serializers.ListField(child=serializers.IntegerField(), required=False)
+    filtros_dispositivos = serializers.DictField(required=False)
+    empleados = serializers.ListField(child=serializers.IntegerField(), required=False)
+    filtros_empleados = serializers.DictField(required=False)
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate_destino(self, destino):
+        if destino.pk == self.context['origen'].pk:
+            raise serializers.ValidationError('La sucursal de destino debe ser distinta de la de origen.')
+        return destino
+
+    def _seleccion(self, campo, data, modelo, queryset, filterset_class):
+        """Queryset de `modelo` seleccionado por IDs o por filtros, o None si no se indicó."""
+        ids = data.pop(campo, None)
+        filtros = data.pop(f'filtros_{campo}', None)
+        if ids is not None:
+            return modelo.objects.filter(pk__in=ids)
+        if filtros is None:
+            return None
+        filterset = filterset_class(data=filtros, queryset=queryset, request=self.context.get('request'))
+        if not filterset.is_valid():
+            raise serializers.ValidationError({f'filtros_{campo}': filterset.errors})
+        return modelo.objects.filter(pk__in=filterset.qs.values('pk'))
+
+    def validate(self, data):
+        from django_filters.filterset import filterset_factory
+        from apps.devices.filters import DeviceFilter
+        from apps.devices.models import Device
+        from apps.employees.models import Employee
+
+        data['dispositivos'] = self._seleccion(
+            'dispositivos', data, Device, Device.objects.con_depreciacion(), DeviceFilter
+        )
+        data['empleados'] = self._seleccion(
+            'empleados', data, Employee, Employee.objects.all(),
+            filterset_factory(Employee, fields=['estado', 'unidad_negocio', 'activo']),
+        )
+        if data['dispositivos'] is None and data['empleados'] is None:
+            raise serializers.ValidationError(
+                'Debe indicar dispositivos, empleados o filtros para seleccionar qué traspasar.'
+            )
+        return data
@@ -0,0 +1,102 @@
+"""
+Traspaso masivo de dispositivos y empleados entre sucursales.
+
+transferir() mueve los dispositivos y empleados seleccionados de la sucursal de origen a
+la de destino con un UPDATE por modelo, en lugar de un PATCH por entidad con el
+serializer completo y las señales de auditoría de cada save():
+
+- Lee las filas seleccionadas bloqueadas (SELECT ... FOR UPDATE) solo con las columnas
+  necesarias para el resumen de inventario y la auditoría.
+- Aplica a InventorySummary los deltas del cambio de sucursal (los UPDATE no disparan
+  las señales de Device) e invalida el caché de inventario.
+- Registra una entrada de auditoría compacta por entidad, escrita por lotes.
+
+Con dry_run solo retorna los conteos, sin modificar nada.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+
+def transferir(origen, destino, user, dispositivos=None, empleados=None, dry_run=False):
+    """
+    Traspasa dispositivos y empleados de `origen` a `destino`.
+
+    Args:
+        origen: Sucursal de origen
+        destino: Sucursal de destino
+        user: Usuario que realiza el traspaso (auditoría)
+        dispositivos: Queryset de dispositivos a mover (se restringe a los de origen) o None
+        empleados: Queryset de empleados a mover (se restringe a los de origen) o None
+        dry_run: Solo calcular la vista previa
+
+    Returns:
+        dict: origen, destino, dispositivos, dispositivos_por_estado,
+              dispositivos_con_asignacion, empleados y dry_run
+    """
+    from apps.devices.cache import invalidar_inventario
+    from apps.devices.models import Device
+    from apps.devices import summary
+    from apps.employees.models import Employee
+    from apps.users.audit import AuditLog
+    from apps.users.audit_buffer import registrar_lote
+
+    with transaction.atomic():
+        filas_dispositivos = []
+        if dispositivos is not None:
+            seleccion = dispositivos.filter(sucursal=origen).order_by('pk')
+            if not dry_run:
+                seleccion = seleccion.select_for_update(of=('self',))
+            filas_dispositivos = list(seleccion.values('id', 'asignacion_actual_id', *summary.CAMPOS_CLAVE))
+
+        ids_empleados = []
+        if empleados is not None:
+            seleccion = empleados.filter(sucursal=origen).order_by('pk')
+            if not dry_run:
+                seleccion = seleccion.select_for_update(of=('self',))
+            ids_empleados = list(seleccion.values_list('id', flat=True))
+
+        resultado = {
+            'origen': origen.id,
+            'destino': destino.id,
+            'dispositivos': len(filas_dispositivos),
+            'dispositivos_por_estado': dict(Counter(fila['estado'] for fila in filas_dispositivos)),
+            'dispositivos_con_asignacion': sum(1 for fila in filas_dispositivos if fila['asignacion_actual_id']),
+            'empleados': len(ids_empleados),
+            'dry_run': dry_run,
+        }
+        if dry_run or not (filas_dispositivos or ids_empleados):
+            return resultado
+
+        ahora = timezone.now()
+        ids_dispositivos = [fila['id'] for fila in filas_dispositivos]
+
+        # 1. Un UPDATE por modelo
+        if ids_dispositivos:
+            Device.objects.filter(pk__in=ids_dispositivos).update(sucursal=destino, updated_at=ahora)
+        if ids_empleados:
+            Employee.objects.filter(pk__in=ids_empleados).update(sucursal=destino, updated_at=ahora)
+
+        # 2. Resumen de inventario y caché
+        deltas = Counter()
+        for fila in filas_dispositivos:
+            anterior = tuple(fila[campo] for campo in summary.CAMPOS_CLAVE)
+            deltas.update(summary.deltas_cambio(anterior, (destino.id, *anterior[1:])))
+        summary.aplicar_deltas(deltas)
+        invalidar_inventario()
+
+        # 3. Auditoría: una entrada compacta por entidad
+        if user and user.is_authenticated:
+            cambio = {'sucursal': [origen.id, destino.id], 'transfer': [None, True]}
+            registros = [
+                AuditLog(user=user, action='UPDATE', entity_type='Device', entity_id=pk, changes=cambio)
+                for pk in ids_dispositivos
+            ]
+            registros += [
+                AuditLog(user=user, action='UPDATE', entity_type='Employee', entity_id=pk, changes=cambio)
+                for pk in ids_empleados
+            ]
+            registrar_lote(registros)
+
+    return resultado
@@ -1,3 +1,190 @@
+"""
+Tests para el módulo de sucursales.
+"""
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.branches.models import Branch
+from apps.devices.models import Device
+from apps.devices import summary
+from apps.assignments.models import Request, Return
+from apps.users.testing import InventarioTestMixin
+
+User = get_user_model()
+
+
+class BranchTestMixin(InventarioTestMixin):
+    """Datos base compartidos por los tests de sucursales."""
+
+    codigo_sucursal = 'BR-01'
+
+
+class BranchTransferTestCase(BranchTestMixin, TestCase):
+    """Traspaso masivo entre sucursales (POST /api/branches/{id}/transfer/)."""
+
+    def setUp(self):
+        super().setUp()
+        self.destino = Branch.objects.create(nombre='Sucursal Destino', codigo='BR-02')
+        self.url = f'/api/branches/{self.branch.id}/transfer/'
+
+    def test_vista_previa_y_traspaso_por_filtros(self):
+        from apps.users.audit import AuditLog
+
+        laptops = [self.create_device(f'TR-{i:03d}') for i in range(3)]
+        self.assign(laptops[0])
+        telefono = self.create_device('TR-100', tipo_equipo='TELEFONO')
+        body = {'destino': self.destino.id, 'filtros_dispositivos': {'tipo_equipo': 'LAPTOP'}, 'filtros_empleados': {}}
+
+        response = self.client.post(self.url, {**body, 'dry_run': True}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['dispositivos'], 3)
+        self.assertEqual(response.data['dispositivos_por_estado'], {'ASIGNADO': 1, 'DISPONIBLE': 2})
+        self.assertEqual(response.data['dispositivos_con_asignacion'], 1)
+        self.assertEqual(response.data['empleados'], 1)
+        self.assertFalse(Device.objects.filter(sucursal=self.destino).exists())
+
+        auditoria = AuditLog.objects.count()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, body, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        sql = [q['sql'] for q in queries.captured_queries]
+        self.assertEqual(sum(q.startswith('UPDATE "devices_device"') for q in sql), 1)
+        self.assertEqual(sum(q.startswith('UPDATE "employees_employee"') for q in sql), 1)
+        self.assertEqual(Device.objects.filter(sucursal=self.destino).count(), 3)
+        telefono.refresh_from_db()
+        self.assertEqual(telefono.sucursal_id, self.branch.id)
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.sucursal_id, self.destino.id)
+        self.assertEqual(AuditLog.objects.count(), auditoria + 4)
+        self.assertEqual(summary.diferencias_resumen(), [])
+
+    def test_traspaso_por_ids_solo_de_origen(self):
+        device = self.create_device('TR-200')
+        ajeno = self.create_device('TR-201', sucursal=self.destino)
+
+        response = self.client.post(self.url, {
+            'destino': str(self.destino.id), 'dispositivos': [device.id, str(ajeno.id)]
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['dispositivos'], 1)
+        self.assertEqual(response.data['empleados'], 0)
+
+    def test_validaciones(self):
+        response = self.client.post(self.url, {'destino': self.branch.id, 'filtros_dispositivos': {}}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('destino', response.data)
+        response = self.client.post(self.url, {'destino': self.destino.id}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(self.url, {'destino': True, 'filtros_dispositivos': {}}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(self.url, {'destino': self.destino.id, 'dispositivos': ['x']}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('dispositivos', response.data)
+        response = self.client.post(
+            self.url, {'destino': self.destino.id, 'filtros_dispositivos': {'estado': 'NO_EXISTE'}}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+        self.destino.is_active = False
+        self.destino.save()
+        response = self.client.post(self.url, {'destino': self.destino.id, 'filtros_dispositivos': {}}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        operador = User.objects.create_user(username='operador_tr', password='test123', role='OPERADOR')
+        self.client.force_authenticate(operador)
+        response = self.client.post(self.url, {'destino': self.destino.id, 'filtros_dispositivos': {}}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class NestedBranchQueriesTestCase(BranchTestMixin, TestCase):
+    """La sucursal anidada no consulta estadísticas; el listado de sucursales las calcula por página."""
+
+    def setUp(self):
+        super().setUp()
+        self.device = self.create_device('NB-001')
+        self.assignment = self.assign(self.device)
+        Request.objects.create(
+            empleado=self.employee, sucursal=self.branch, jefatura_solicitante='Jefatura',
+            tipo_dispositivo='LAPTOP', created_by=self.admin_user
+        )
+        Return.objects.create(
+            asignacion=self.assignment, fecha_devolucion=date.today(),
+            estado_dispositivo='OPTIMO', created_by=self.admin_user
+        )
+
+    def consultas_resumen(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return sum('devices_inventorysummary' in q['sql'] for q in queries.captured_queries)
+
+    def test_endpoints_con_sucursal_anidada(self):
+        for url in (
+            '/api/employees/',
+            f'/api/employees/{self.employee.id}/',
+            f'/api/devices/{self.device.id}/',
+            '/api/assignments/requests/',
+            f'/api/assignments/assignments/{self.assignment.id}/',
+            '/api/assignments/returns/',
+        ):
+            self.assertEqual(self.consultas_resumen(url), 0, url)
+
+    def test_listado_y_alta_de_sucursales_sin_consultas_por_tipo(self):
+        for i in range(4):
+            sucursal = Branch.objects.create(nombre=f'Sucursal {i}', codigo=f'NB-{i}')
+            self.create_device(f'NB-1{i}', sucursal=sucursal, tipo_equipo='TELEFONO')
+
+        # Los conteos por tipo vienen anotados en el SELECT del listado (con_estadisticas),
+        # sin consultas propias al resumen de inventario
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/branches/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('FROM "devices_inventorysummary"' in q['sql'] for q in queries.captured_queries))
+        self.assertEqual(response.data['results'][1]['dispositivos_por_tipo']['TELEFONO'], 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/branches/', {'nombre': 'Nueva', 'codigo': 'NB-9'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(any('devices_inventorysummary' in q['sql'] for q in queries.captured_queries))
+        self.assertEqual(set(response.data['dispositivos_por_tipo'].values()), {0})
+
+
+class BranchStatsQueryTestCase(BranchTestMixin, TestCase):
+    """Listado y detalle de sucursales con estadísticas en una sola consulta."""
+
+    def crear_sucursal(self, codigo, dispositivos):
+        sucursal = Branch.objects.create(nombre=f'Sucursal {codigo}', codigo=codigo)
+        for i, tipo in enumerate(dispositivos):
+            self.create_device(f'{codigo}-{i}', sucursal=sucursal, tipo_equipo=tipo)
+        return sucursal
+
+    def test_consultas_constantes(self):
+        sucursal = self.crear_sucursal('BS-1', ['LAPTOP', 'TELEFONO', 'TELEFONO'])
+        self.create_device('BS-BAJA', sucursal=sucursal, estado='BAJA')
+
+        # Conteo de la paginación + un SELECT con todas las estadísticas
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/branches/')
+        self.assertEqual(response.status_code, 200)
+
+        for i in range(2, 6):
+            self.crear_sucursal(f'BS-{i}', ['TABLET'] * i)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/branches/')
+
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/branches/{sucursal.id}/')
+        self.assertEqual(response.data['total_dispositivos'], 3)
+        self.assertEqual(response.data['total_empleados'], 0)
+        self.assertEqual(response.data['dispositivos_por_tipo'], {
+            'LAPTOP': 1, 'DESKTOP': 0, 'TELEFONO': 2, 'TABLET': 0, 'TV': 0, 'SIM': 0, 'ACCESORIO': 0,
+        })
 
-# Create your tests here.
+        response = self.client.get(f'/api/branches/{self.branch.id}/')
+        self.assertEqual(response.data['total_empleados'], 1)
+        self.assertEqual(response.data['total_dispositivos'], 0)
@@ -1,9 +1,11 @@
-from rest_framework import viewsets, filters
+from rest_framework import viewsets, filters, status
+from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Count, Prefetch
 from .models import Branch
 from .serializers import BranchSerializer
+from apps.users.permissions import IsAdmin
 
 
 class BranchPagination(PageNumberPagination):
@@ -29,21 +31,12 @@ class BranchViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """
-        Queryset optimizado con estadísticas pre-calculadas usando annotate().
-        Esto evita N+1 queries al serializar las sucursales.
+        Queryset optimizado con estadísticas pre-calculadas en una sola consulta:
+        total_dispositivos, total_empleados y la cantidad por tipo (ver
+        BranchQuerySet.con_estadisticas). Su costo no depende de la cantidad de dispositivos.
         IMPORTANTE: Excluye dispositivos con estados finales (ROBO, BAJA) del conteo.
         """
-        from django.db.models import Q
-        from apps.devices.models import Device
-
-        return Branch.objects.annotate(
-            total_dispositivos=Count(
-                'device',
-                distinct=True,
-                filter=~Q(device__estado__in=Device.FINAL_STATES)
-            ),
-            total_empleados=Count('employee', distinct=True)
-        ).prefetch_related('device_set')
+        return Branch.objects.con_estadisticas()
 
     def perform_destroy(self, instance):
         """
@@ -71,3 +64,31 @@ class BranchViewSet(viewsets.ModelViewSet):
                 'devices': device_count,
                 'employees': employee_count
             })
+
+    @action(detail=True, methods=['post'], url_path='transfer', permission_classes=[IsAdmin])
+    def transfer(self, request, pk=None):
+        """
+        Traspasa dispositivos y empleados de esta sucursal a otra (solo administradores).
+
+        POST /api/branches/{id}/transfer/
+        Body: {
+            destino: int,                   # Sucursal de destino (activa)
+            dispositivos?: [int],           # Dispositivos por ID
+            filtros_dispositivos?: {...},   # O los filtros del listado de dispositivos ({} = todos)
+            empleados?: [int],              # Empleados por ID
+            filtros_empleados?: {...},      # O filtros de empleados: estado, unidad_negocio, activo ({} = todos)
+            dry_run?: bool                  # Solo vista previa (conteos), sin modificar
+        }
+
+        Solo se mueven las entidades que pertenecen a esta sucursal. Un UPDATE por modelo,
+        con auditoría por entidad y resumen de inventario actualizado (ver services.py).
+        """
+        from .serializers import BranchTransferSerializer
+        from .services import transferir
+
+        origen = self.get_object()
+        serializer = BranchTransferSerializer(data=request.data, context={'request': request, 'origen': origen})
+        serializer.is_valid(raise_exception=True)
+
+        resultado = transferir(origen, user=request.user, **serializer.validated_data)
+        return Response(resultado, status=status.HTTP_200_OK)
@@ -4,10 +4,10 @@ from .models import Device
 
 @admin.register(Device)
 class DeviceAdmin(admin.ModelAdmin):
-    list_display = ('get_identificador', 'tipo_equipo', 'marca', 'modelo', 'estado', 'sucursal', 'fecha_ingreso', 'edad_dispositivo', 'get_valor_depreciado_display')
-    list_filter = ('tipo_equipo', 'estado', 'sucursal', 'marca')
+    list_display = ('get_identificador', 'tipo_equipo', 'marca', 'modelo', 'estado', 'sucursal', 'fecha_ingreso', 'edad_dispositivo', 'get_valor_depreciado_display', 'get_asignacion_activa')
+    list_filter = ('tipo_equipo', 'estado', 'sucursal', 'marca', ('asignacion_actual', admin.EmptyFieldListFilter))
     search_fields = ('numero_serie', 'imei', 'marca', 'modelo', 'numero_telefono', 'numero_factura')
-    readonly_fields = ('created_at', 'updated_at', 'created_by', 'edad_dispositivo', 'get_valor_depreciado_display')
+    readonly_fields = ('created_at', 'updated_at', 'created_by', 'edad_dispositivo', 'get_valor_depreciado_display', 'asignacion_actual')
     autocomplete_fields = ['sucursal']
 
     def get_identificador(self, obj):
@@ -25,6 +25,12 @@ class DeviceAdmin(admin.ModelAdmin):
         return "-"
     get_valor_depreciado_display.short_description = 'Valor Depreciado'
 
+    def get_asignacion_activa(self, obj):
+        """Indica si tiene asignación activa (lee asignacion_actual, sin query)"""
+        return obj.has_active_assignment()
+    get_asignacion_activa.short_description = 'Asignación activa'
+    get_asignacion_activa.boolean = True
+
     def save_model(self, request, obj, form, change):
         if not change:  # Si es un nuevo objeto
             obj.created_by = request.user
@@ -5,3 +5,9 @@ class DevicesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.devices'
     verbose_name = 'Dispositivos'
+
+    def ready(self):
+        """
+        Importar señales cuando la aplicación esté lista.
+        """
+        import apps.devices.signals
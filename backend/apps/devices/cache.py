@@ -0,0 +1,153 @@
+"""
+Caché de estadísticas de inventario.
+
+Las estadísticas de inventario y el dashboard se guardan en el caché de Django bajo una
+clave que incluye la versión del inventario. Cualquier cambio en Device, Assignment,
+Return, Employee o Branch incrementa la versión (ver apps/devices/signals.py), por lo
+que las entradas anteriores dejan de leerse sin necesidad de borrarlas.
+
+Funciona con cualquier backend de caché:
+- Memoria local: cada worker de gunicorn tiene su propia versión y sus propias entradas.
+  Un cambio solo invalida el caché del worker que lo procesó; el resto lo ve al expirar
+  INVENTORY_CACHE_TIMEOUT.
+- Caché compartido (base de datos, Redis): la versión es única para todos los workers,
+  por lo que un cambio invalida el caché de todos de inmediato.
+
+Se llevan contadores de aciertos/fallos por proceso y compartidos en el caché. Los
+compartidos no se actualizan en cada lectura: cada proceso acumula sus incrementos y los
+suma al caché cada CONTADOR_FLUSH_CADA registros o CONTADOR_FLUSH_SEGUNDOS segundos (y
+siempre al consultar get_cache_stats()).
+"""
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+VERSION_KEY = 'inventory:version'
+
+# Entradas cacheadas (nombre usado en claves y contadores)
+ENTRADAS = ('inventory_stats', 'dashboard')
+
+# Contadores del proceso actual: {nombre: {'hits': n, 'misses': n}}
+_contadores_proceso = defaultdict(lambda: {'hits': 0, 'misses': 0})
+
+# Incrementos del proceso aún no sumados a los contadores compartidos: {(nombre, tipo): n}
+_pendientes = defaultdict(int)
+_pendientes_lock = threading.Lock()
+_ultimo_flush = time.monotonic()
+
+# Registros o segundos entre cada suma de los incrementos pendientes al caché
+CONTADOR_FLUSH_CADA = 100
+CONTADOR_FLUSH_SEGUNDOS = 30
+
+
+def _version_inicial():
+    # Basada en el reloj para no reutilizar versiones si el caché se vació
+    return int(time.time() * 1000)
+
+
+def get_inventory_version():
+    """Retorna la versión actual del inventario, inicializándola si no existe."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, _version_inicial(), timeout=None)
+        version = cache.get(VERSION_KEY, _version_inicial())
+    return version
+
+
+def bump_inventory_version():
+    """Incrementa la versión del inventario, invalidando todas las entradas cacheadas."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, _version_inicial(), timeout=None)
+
+
+def invalidar_inventario():
+    """
+    Programa el incremento de versión para cuando se confirme la transacción actual
+    (inmediato si no hay transacción), evitando que una lectura concurrente guarde en
+    la nueva versión datos anteriores al commit.
+    """
+    transaction.on_commit(bump_inventory_version)
+
+
+def _contador_key(nombre, tipo):
+    return f'inventory:contador:{nombre}:{tipo}'
+
+
+def _flush_contadores():
+    """Suma los incrementos pendientes del proceso a los contadores compartidos."""
+    global _ultimo_flush
+
+    with _pendientes_lock:
+        pendientes = dict(_pendientes)
+        _pendientes.clear()
+        _ultimo_flush = time.monotonic()
+
+    for (nombre, tipo), n in pendientes.items():
+        key = _contador_key(nombre, tipo)
+        if cache.add(key, n, timeout=None):
+            continue
+        try:
+            cache.incr(key, n)
+        except ValueError:
+            cache.set(key, n, timeout=None)
+
+
+def _registrar(nombre, tipo):
+    with _pendientes_lock:
+        _contadores_proceso[nombre][tipo] += 1
+        _pendientes[(nombre, tipo)] += 1
+        vencido = (
+            sum(_pendientes.values()) >= CONTADOR_FLUSH_CADA
+            or time.monotonic() - _ultimo_flush >= CONTADOR_FLUSH_SEGUNDOS
+        )
+    if vencido:
+        _flush_contadores()
+
+
+def get_or_build(nombre, builder):
+    """
+    Retorna (datos, desde_cache) para la entrada `nombre` en la versión actual del
+    inventario. Si no está en caché, llama a builder() y guarda el resultado, que debe
+    ser serializable con pickle (dicts, listas y tipos simples).
+    """
+    key = f'inventory:{nombre}:v{get_inventory_version()}'
+
+    data = cache.get(key)
+    if data is not None:
+        _registrar(nombre, 'hits')
+        return data, True
+
+    data = builder()
+    cache.set(key, data, timeout=settings.INVENTORY_CACHE_TIMEOUT)
+    _registrar(nombre, 'misses')
+    return data, False
+
+
+def get_cache_stats():
+    """Retorna la versión actual y los contadores de aciertos/fallos por entrada."""
+    _flush_contadores()
+    claves = [_contador_key(nombre, tipo) for nombre in ENTRADAS for tipo in ('hits', 'misses')]
+    compartidos = cache.get_many(claves)
+
+    return {
+        'backend': settings.CACHES['default']['BACKEND'],
+        'timeout': settings.INVENTORY_CACHE_TIMEOUT,
+        'version': get_inventory_version(),
+        'entradas': {
+            nombre: {
+                'proceso': dict(_contadores_proceso[nombre]),
+                'compartido': {
+                    tipo: compartidos.get(_contador_key(nombre, tipo), 0)
+                    for tipo in ('hits', 'misses')
+                },
+            }
+            for nombre in ENTRADAS
+        },
+    }
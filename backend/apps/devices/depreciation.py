@@ -0,0 +1,255 @@
+"""
+Cálculo de depreciación y edad de dispositivos.
+
+Contiene las reglas de negocio como funciones puras (compartidas por el modelo Device)
+y el motor de recálculo masivo de los campos almacenados edad_dispositivo y
+valor_depreciado para toda la flota.
+
+Reglas:
+- Primeros 6 meses: 0% depreciación
+- Cada 6 meses adicionales: -10% del valor original
+- Máximo: 100% de depreciación (valor = 0) a los 60 meses
+- Edad en años completos (365 días); sobre 5 años se muestra "5+" y se almacena 5
+"""
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import (
+    Case, When, Value, F, Q, IntegerField, DecimalField, ExpressionWrapper
+)
+from django.db.models.functions import Round
+
+
+DIAS_POR_MES = 30.44
+MESES_POR_PERIODO = 6
+PORCENTAJE_POR_PERIODO = 10
+PERIODOS_MAXIMOS = 10
+EDAD_MAXIMA = 5
+
+# Tipos de dispositivo que tienen edad y valor depreciado
+TIPOS_CON_DEPRECIACION = ['LAPTOP', 'DESKTOP', 'TELEFONO', 'TABLET']
+
+# Fecha de próximo recálculo para dispositivos cuyos valores ya no cambiarán
+FECHA_SIN_CAMBIOS = date.max
+
+# Buckets de edad expuestos por la API (edad_anios = 6 representa "5+")
+EDAD_BUCKETS = ['0', '1', '2', '3', '4', '5', '5+']
+
+
+def periodos_depreciacion(dias):
+    """Retorna la cantidad de períodos de 6 meses completos en `dias` días."""
+    meses_transcurridos = dias / DIAS_POR_MES
+    return int(meses_transcurridos / MESES_POR_PERIODO)
+
+
+def edad_en_anios(dias):
+    """Retorna la edad en años completos para `dias` días."""
+    return dias // 365
+
+
+def edad_almacenada(dias):
+    """Retorna la edad tal como se guarda en edad_dispositivo (máximo 5 para "5+")."""
+    return min(edad_en_anios(dias), EDAD_MAXIMA)
+
+
+def porcentaje_depreciacion(periodos):
+    """Retorna el porcentaje de depreciación (0-100) para una cantidad de períodos."""
+    return min(max(periodos, 0) * PORCENTAJE_POR_PERIODO, 100)
+
+
+def valor_depreciado(valor_inicial, periodos):
+    """Retorna el valor depreciado de `valor_inicial` tras `periodos` períodos."""
+    if periodos >= PERIODOS_MAXIMOS:
+        return 0
+
+    porcentaje = porcentaje_depreciacion(periodos)
+    valor = valor_inicial * (Decimal('1') - Decimal(str(porcentaje)) / Decimal('100'))
+    return round(valor, 2)
+
+
+def dias_para_periodo(periodo):
+    """
+    Retorna el mínimo de días para alcanzar `periodo` períodos.
+    Se calcula con la misma aritmética flotante que periodos_depreciacion()
+    para que los umbrales coincidan exactamente con el cálculo por objeto.
+    """
+    dias = max(int(periodo * MESES_POR_PERIODO * DIAS_POR_MES) - 1, 0)
+    while periodos_depreciacion(dias) < periodo:
+        dias += 1
+    return dias
+
+
+# Umbral en días para cada período (índice = período)
+UMBRALES_PERIODO = [dias_para_periodo(p) for p in range(PERIODOS_MAXIMOS + 1)]
+
+
+def proxima_fecha_cambio(fecha_ingreso, hoy):
+    """
+    Retorna la próxima fecha en que cambia la edad almacenada o el período de depreciación.
+    Retorna FECHA_SIN_CAMBIOS si el dispositivo ya alcanzó la edad y depreciación máximas.
+    """
+    dias = (hoy - fecha_ingreso).days
+    candidatos = []
+
+    periodos = periodos_depreciacion(dias)
+    if periodos < PERIODOS_MAXIMOS:
+        candidatos.append(UMBRALES_PERIODO[max(periodos, 0) + 1])
+
+    edad = edad_en_anios(dias)
+    if edad < EDAD_MAXIMA:
+        candidatos.append((edad + 1) * 365)
+
+    if not candidatos:
+        return FECHA_SIN_CAMBIOS
+
+    return fecha_ingreso + timedelta(days=min(candidatos))
+
+
+def expresion_edad_anios(hoy=None, prefix=''):
+    """
+    Expresión SQL con la edad en años completos, con tope EDAD_MAXIMA + 1 ("5+").
+
+    Compara fecha_ingreso contra fechas de corte precalculadas en Python, por lo que
+    funciona igual en SQLite y PostgreSQL sin aritmética de fechas en la base de datos.
+    `prefix` permite usarla desde modelos relacionados (ej: 'dispositivo__').
+    """
+    hoy = hoy or date.today()
+    campo = f'{prefix}fecha_ingreso__lte'
+    return Case(
+        *[
+            When(**{campo: hoy - timedelta(days=365 * anios)}, then=Value(anios))
+            for anios in range(EDAD_MAXIMA + 1, 0, -1)
+        ],
+        default=Value(0),
+        output_field=IntegerField()
+    )
+
+
+def expresion_valor_depreciado(hoy=None, prefix=''):
+    """
+    Expresión SQL equivalente a Device.get_valor_depreciado():
+    - Tipos sin valor: NULL
+    - es_valor_manual con valor almacenado: valor_depreciado
+    - Resto: valor_inicial * (1 - 10% por período), redondeado a 2 decimales
+
+    Los períodos se resuelven con las mismas fechas de corte que expresion_edad_anios().
+    """
+    hoy = hoy or date.today()
+    campo = f'{prefix}fecha_ingreso__lte'
+    factor = Case(
+        *[
+            When(
+                **{campo: hoy - timedelta(days=UMBRALES_PERIODO[p])},
+                then=Value(Decimal(100 - porcentaje_depreciacion(p)) / Decimal('100'))
+            )
+            for p in range(PERIODOS_MAXIMOS, 0, -1)
+        ],
+        default=Value(Decimal('1')),
+        output_field=DecimalField(max_digits=3, decimal_places=2)
+    )
+    valor = DecimalField(max_digits=10, decimal_places=2)
+
+    return Case(
+        When(~Q(**{f'{prefix}tipo_equipo__in': TIPOS_CON_DEPRECIACION}), then=Value(None)),
+        When(
+            **{f'{prefix}es_valor_manual': True, f'{prefix}valor_depreciado__isnull': False},
+            then=F(f'{prefix}valor_depreciado')
+        ),
+        When(
+            Q(**{f'{prefix}valor_inicial__isnull': True}) | Q(**{f'{prefix}valor_inicial': 0}),
+            then=Value(None)
+        ),
+        default=Round(ExpressionWrapper(F(f'{prefix}valor_inicial') * factor, output_field=valor), 2),
+        output_field=valor
+    )
+
+
+def anotaciones_depreciacion(hoy=None, prefix=''):
+    """
+    Retorna las anotaciones valor_depreciado_calculado y edad_anios, listas para annotate().
+    Con prefix, los nombres se anteponen (ej: dispositivo_valor_depreciado_calculado).
+    """
+    nombre = prefix.replace('__', '_')
+    return {
+        f'{nombre}valor_depreciado_calculado': expresion_valor_depreciado(hoy, prefix),
+        f'{nombre}edad_anios': expresion_edad_anios(hoy, prefix),
+    }
+
+
+def recalcular_flota(hoy=None, forzar=False, batch_size=1000):
+    """
+    Recalcula edad_dispositivo, valor_depreciado y fecha_proximo_recalculo de los
+    dispositivos activos en una pasada por lotes.
+
+    - Solo procesa dispositivos cuya fecha_proximo_recalculo ya pasó (o nunca se calculó),
+      salvo que forzar=True.
+    - No modifica valor_depreciado de dispositivos con es_valor_manual=True
+      (su edad sí se actualiza).
+    - Escribe con bulk_update, por lo que no dispara señales ni auditoría por objeto.
+
+    Args:
+        hoy: Fecha de referencia (por defecto date.today())
+        forzar: Recalcular todos los dispositivos activos, no solo los vencidos
+        batch_size: Tamaño de lote para bulk_update
+
+    Returns:
+        dict: procesados, actualizados, segundos y filas_por_segundo
+    """
+    from .models import Device
+
+    hoy = hoy or date.today()
+    start_time = time.perf_counter()
+
+    queryset = Device.objects.filter(
+        activo=True,
+        tipo_equipo__in=TIPOS_CON_DEPRECIACION,
+        fecha_ingreso__isnull=False
+    )
+    if not forzar:
+        queryset = queryset.filter(
+            Q(fecha_proximo_recalculo__isnull=True) | Q(fecha_proximo_recalculo__lte=hoy)
+        )
+
+    rows = list(queryset.values_list(
+        'id', 'fecha_ingreso', 'valor_inicial', 'es_valor_manual',
+        'edad_dispositivo', 'valor_depreciado'
+    ))
+
+    pendientes = []
+    actualizados = 0
+
+    for device_id, fecha_ingreso, valor_inicial, es_manual, edad_actual, valor_actual in rows:
+        dias = (hoy - fecha_ingreso).days
+
+        edad = edad_almacenada(dias)
+        if es_manual or valor_inicial is None:
+            valor = valor_actual
+        else:
+            valor = valor_depreciado(valor_inicial, periodos_depreciacion(dias))
+
+        if edad != edad_actual or valor != valor_actual:
+            actualizados += 1
+
+        pendientes.append(Device(
+            id=device_id,
+            edad_dispositivo=edad,
+            valor_depreciado=valor,
+            fecha_proximo_recalculo=proxima_fecha_cambio(fecha_ingreso, hoy),
+        ))
+
+    with transaction.atomic():
+        Device.objects.bulk_update(
+            pendientes,
+            ['edad_dispositivo', 'valor_depreciado', 'fecha_proximo_recalculo'],
+            batch_size=batch_size
+        )
+
+    segundos = time.perf_counter() - start_time
+    return {
+        'procesados': len(rows),
+        'actualizados': actualizados,
+        'segundos': segundos,
+        'filas_por_segundo': len(rows) / segundos if segundos > 0 else 0,
+    }
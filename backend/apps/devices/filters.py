@@ -0,0 +1,38 @@
+"""
+Filtros para el módulo de dispositivos.
+"""
+import django_filters
+from .models import Device
+from .depreciation import EDAD_BUCKETS
+
+
+class DeviceFilter(django_filters.FilterSet):
+    """
+    FilterSet de dispositivos.
+
+    - asignacion_activa: ?asignacion_activa=true|false
+      Lee la columna desnormalizada asignacion_actual (sin subqueries ni joins).
+    - valor_min / valor_max: rango sobre valor_depreciado_calculado
+    - edad_bucket: 0, 1, 2, 3, 4, 5 o 5+ (sobre edad_anios)
+
+    Los filtros de valor y edad requieren un queryset anotado con Device.objects.con_depreciacion().
+    """
+    asignacion_activa = django_filters.BooleanFilter(
+        field_name='asignacion_actual',
+        lookup_expr='isnull',
+        exclude=True
+    )
+    valor_min = django_filters.NumberFilter(field_name='valor_depreciado_calculado', lookup_expr='gte')
+    valor_max = django_filters.NumberFilter(field_name='valor_depreciado_calculado', lookup_expr='lte')
+    edad_bucket = django_filters.ChoiceFilter(
+        choices=[(bucket, bucket) for bucket in EDAD_BUCKETS],
+        method='filter_edad_bucket'
+    )
+
+    class Meta:
+        model = Device
+        fields = ['tipo_equipo', 'estado', 'sucursal', 'marca', 'asignacion_activa']
+
+    def filter_edad_bucket(self, queryset, name, value):
+        """Filtra por bucket de edad; '5+' corresponde a edad_anios = 6"""
+        return queryset.filter(edad_anios=EDAD_BUCKETS.index(value))
@@ -0,0 +1,137 @@
+"""
+Comando Django para comparar la búsqueda estándar con la búsqueda de texto completo.
+
+Genera dispositivos sintéticos dentro de una transacción, ejecuta las mismas búsquedas
+con rest_framework.filters.SearchFilter (OR de icontains) y con
+config.search.FullTextSearchFilter, y reporta el tiempo promedio de cada una
+(COUNT + primera página, como el listado paginado). Al terminar revierte la
+transacción, por lo que no deja datos.
+
+Uso:
+    python manage.py benchmark_search                          # 100.000 dispositivos
+    python manage.py benchmark_search --devices 20000 --repeat 3
+    python manage.py benchmark_search --search "lenovo t14" --search SN0004
+"""
+
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework import filters
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.branches.models import Branch
+from apps.devices.models import Device
+from apps.devices.views import DeviceViewSet
+from apps.users.models import User
+from config.search import FullTextSearchFilter
+
+
+MARCAS = {
+    'Lenovo': ['ThinkPad T14', 'ThinkPad X1 Carbon', 'IdeaPad 5'],
+    'HP': ['ProBook 450', 'EliteBook 840', 'Elite Mini 800'],
+    'Dell': ['Latitude 5440', 'OptiPlex 7010', 'Vostro 3520'],
+    'Apple': ['MacBook Air', 'iPhone 14', 'iPad Air'],
+    'Samsung': ['Galaxy A54', 'Galaxy Tab S9', 'Galaxy S23'],
+    'Motorola': ['Moto G84', 'Edge 40'],
+}
+
+BUSQUEDAS = ['lenovo', 'thinkpad t14', 'galaxy', 'BENCH-SN-00012', 'SN-00004', '356', 'FAC-10', 'inexistente']
+
+
+class Command(BaseCommand):
+    help = 'Compara SearchFilter con FullTextSearchFilter sobre dispositivos sintéticos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--devices',
+            type=int,
+            default=100000,
+            help='Cantidad de dispositivos sintéticos a generar'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Repeticiones de cada búsqueda'
+        )
+        parser.add_argument(
+            '--search',
+            action='append',
+            help='Término a buscar (se puede repetir). Por defecto un conjunto representativo'
+        )
+
+    def handle(self, *args, **options):
+        busquedas = options['search'] or BUSQUEDAS
+
+        with transaction.atomic():
+            self.generar_dispositivos(options['devices'])
+
+            self.stdout.write('')
+            self.stdout.write(f'{"Búsqueda":<20} {"Resultados":>10} {"icontains":>12} {"texto completo":>15} {"mejora":>8}')
+            for termino in busquedas:
+                total, estandar = self.medir(filters.SearchFilter(), termino, options['repeat'])
+                total_fts, texto_completo = self.medir(FullTextSearchFilter(), termino, options['repeat'])
+                mejora = estandar / texto_completo if texto_completo else 0
+                self.stdout.write(
+                    f'{termino:<20} {f"{total}/{total_fts}":>10} {estandar * 1000:>10.1f}ms '
+                    f'{texto_completo * 1000:>13.1f}ms {mejora:>7.1f}x'
+                )
+
+            transaction.set_rollback(True)
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('✓ Benchmark completado (datos sintéticos revertidos)'))
+
+    def generar_dispositivos(self, cantidad):
+        """Crea `cantidad` dispositivos con bulk_create (sin señales)."""
+        start_time = time.time()
+        rng = random.Random(42)
+
+        user = User.objects.filter(is_superuser=True).first() or User.objects.create_user(
+            username='benchmark_search', password=None, role='ADMIN'
+        )
+        sucursales = list(Branch.objects.all()[:10]) or [
+            Branch.objects.create(nombre='Benchmark', codigo='BENCH-01')
+        ]
+
+        lote = []
+        for i in range(cantidad):
+            marca = rng.choice(list(MARCAS))
+            lote.append(Device(
+                tipo_equipo=rng.choice(['LAPTOP', 'DESKTOP', 'TELEFONO', 'TABLET']),
+                marca=marca,
+                modelo=rng.choice(MARCAS[marca]),
+                numero_serie=f'BENCH-SN-{i:07d}',
+                imei=f'356{rng.randrange(10 ** 11):011d}{i:07d}',
+                numero_telefono=f'+569{rng.randrange(10 ** 8):08d}',
+                numero_factura=f'FAC-{rng.randrange(10 ** 5)}',
+                sucursal=rng.choice(sucursales),
+                fecha_ingreso=date.today() - timedelta(days=rng.randrange(2000)),
+                created_by=user,
+            ))
+            if len(lote) == 5000:
+                Device.objects.bulk_create(lote)
+                lote = []
+        Device.objects.bulk_create(lote)
+
+        self.stdout.write(f'Generados {cantidad} dispositivos en {time.time() - start_time:.1f}s')
+
+    def medir(self, backend, termino, repeticiones):
+        """Retorna (resultados, segundos promedio) de COUNT + primera página con `backend`."""
+        request = Request(APIRequestFactory().get('/api/devices/', {'search': termino}))
+        view = DeviceViewSet(request=request, action='list', format_kwarg=None)
+
+        tiempos = []
+        total = 0
+        for _ in range(repeticiones):
+            start_time = time.perf_counter()
+            queryset = backend.filter_queryset(request, Device.objects.all(), view)
+            total = queryset.count()
+            list(queryset.values_list('id', flat=True)[:20])
+            tiempos.append(time.perf_counter() - start_time)
+
+        return total, sum(tiempos) / len(tiempos)
@@ -30,6 +30,7 @@ from apps.employees.models import Employee, BusinessUnit
 from apps.employees.validators import validate_rut, format_rut
 from apps.devices.models import Device
 from apps.assignments.models import Request, Assignment
+from apps.users.audit_buffer import buffer_auditoria
 
 
 User = get_user_model()
@@ -472,9 +473,12 @@ class Command(BaseCommand):
         self.stdout.write(f'   • Advertencias: {len(self.stats["warnings"])}')
 
     def import_data(self, consolidated_data: Dict, unassigned_devices: Dict):
-        """Importa todos los datos en una transacción atómica."""
+        """
+        Importa todos los datos en una transacción atómica.
+        La auditoría se escribe por lotes (MAX_BATCH entradas o FLUSH_INTERVAL segundos).
+        """
         try:
-            with transaction.atomic():
+            with buffer_auditoria(), transaction.atomic():
                 # Obtener usuario
                 user = self.get_or_create_import_user()
 
@@ -0,0 +1,57 @@
+"""
+Comando Django para reconstruir el resumen de inventario.
+
+Recalcula InventorySummary (dispositivos por sucursal, tipo, estado y activo) desde la
+tabla de dispositivos. Normalmente lo mantienen las señales de Device por deltas; este
+comando sirve para verificar su consistencia y repararlo (p. ej. tras ediciones directas
+en la base de datos o actualizaciones masivas con queryset.update()).
+
+Uso:
+    python manage.py rebuild_inventory_summary             # Reconstruir
+    python manage.py rebuild_inventory_summary --check     # Solo reportar diferencias
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.devices.summary import diferencias_resumen, reconstruir_resumen
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el resumen de inventario desde los dispositivos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Solo reportar diferencias, sin modificar datos'
+        )
+
+    def handle(self, *args, **options):
+        start_time = time.time()
+
+        diferencias = diferencias_resumen()
+
+        self.stdout.write(f'Combinaciones con diferencias: {len(diferencias)}')
+        for (sucursal_id, tipo, estado, activo), esperado, almacenado in diferencias[:20]:
+            self.stdout.write(
+                f'   • Sucursal {sucursal_id} / {tipo} / {estado} / activo={activo}: '
+                f'esperado={esperado} almacenado={almacenado}'
+            )
+        if len(diferencias) > 20:
+            self.stdout.write(f'   ... y {len(diferencias) - 20} más')
+
+        if options['check']:
+            if diferencias:
+                self.stdout.write(self.style.WARNING('⚠ El resumen de inventario no es consistente'))
+            else:
+                self.stdout.write(self.style.SUCCESS('✓ El resumen de inventario es consistente'))
+            return
+
+        filas = reconstruir_resumen()
+
+        elapsed_time = time.time() - start_time
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Resumen de inventario reconstruido ({filas} combinaciones) en {elapsed_time:.2f}s'
+        ))
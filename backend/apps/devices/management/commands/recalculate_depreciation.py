@@ -0,0 +1,60 @@
+"""
+Comando Django para recalcular edad y valor depreciado de la flota.
+
+Actualiza los campos almacenados edad_dispositivo y valor_depreciado de todos los
+dispositivos activos que cruzaron un límite de período (6 meses) o de año desde la
+última ejecución. Pensado para ejecutarse a diario (cron).
+
+Uso:
+    python manage.py recalculate_depreciation                   # Solo dispositivos vencidos
+    python manage.py recalculate_depreciation --force           # Todos los activos
+    python manage.py recalculate_depreciation --date 2026-01-31 # Fecha de referencia
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.devices.depreciation import recalcular_flota
+
+
+class Command(BaseCommand):
+    help = 'Recalcula edad y valor depreciado de los dispositivos activos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Recalcular todos los dispositivos activos, no solo los que cruzaron un período'
+        )
+        parser.add_argument(
+            '--date',
+            type=str,
+            help='Fecha de referencia YYYY-MM-DD (por defecto hoy)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Tamaño de lote para las actualizaciones'
+        )
+
+    def handle(self, *args, **options):
+        hoy = None
+        if options['date']:
+            try:
+                hoy = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f'Fecha inválida: {options["date"]}')
+
+        result = recalcular_flota(
+            hoy=hoy,
+            forzar=options['force'],
+            batch_size=options['batch_size']
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {result["procesados"]} dispositivos procesados '
+            f'({result["actualizados"]} con cambios) en {result["segundos"]:.2f}s '
+            f'— {result["filas_por_segundo"]:.0f} filas/s'
+        ))
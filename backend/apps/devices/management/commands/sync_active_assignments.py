@@ -0,0 +1,82 @@
+"""
+Comando Django para sincronizar Device.asignacion_actual.
+
+Recalcula el puntero desnormalizado a la asignación ACTIVA de cada dispositivo.
+Normalmente lo mantienen las señales de asignaciones/devoluciones; este comando
+sirve como backfill inicial y para reparar desalineaciones (p. ej. tras cargas
+masivas con queryset.update() o ediciones directas en la base de datos).
+
+Uso:
+    python manage.py sync_active_assignments             # Reparar
+    python manage.py sync_active_assignments --check     # Solo reportar diferencias
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+
+from apps.devices.models import Device
+from apps.assignments.models import Assignment
+
+
+class Command(BaseCommand):
+    help = 'Sincroniza Device.asignacion_actual con las asignaciones ACTIVAS'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Solo reportar dispositivos desalineados, sin modificar datos'
+        )
+
+    def handle(self, *args, **options):
+        start_time = time.time()
+        check_only = options['check']
+
+        activa = Assignment.objects.filter(
+            dispositivo=OuterRef('pk'),
+            estado_asignacion='ACTIVA'
+        ).order_by('-fecha_entrega', '-id').values('id')[:1]
+
+        # Detectar desalineaciones en una sola pasada
+        rows = Device.objects.annotate(
+            esperada=Subquery(activa)
+        ).values_list('id', 'asignacion_actual_id', 'esperada')
+
+        desalineados = [
+            (device_id, actual, esperada)
+            for device_id, actual, esperada in rows.iterator(chunk_size=2000)
+            if actual != esperada
+        ]
+
+        # Anomalía de datos: más de una asignación ACTIVA por dispositivo
+        duplicados = Assignment.objects.filter(
+            estado_asignacion='ACTIVA',
+            dispositivo__isnull=False
+        ).values('dispositivo').annotate(total=Count('id')).filter(total__gt=1)
+
+        for item in duplicados:
+            self.stdout.write(self.style.WARNING(
+                f'   ⚠ Dispositivo {item["dispositivo"]} tiene {item["total"]} asignaciones ACTIVAS'
+            ))
+
+        self.stdout.write(f'Dispositivos desalineados: {len(desalineados)}')
+        for device_id, actual, esperada in desalineados[:20]:
+            self.stdout.write(f'   • Dispositivo {device_id}: actual={actual} esperada={esperada}')
+        if len(desalineados) > 20:
+            self.stdout.write(f'   ... y {len(desalineados) - 20} más')
+
+        if check_only or not desalineados:
+            return
+
+        with transaction.atomic():
+            Device.objects.filter(
+                pk__in=[device_id for device_id, _, _ in desalineados]
+            ).update(asignacion_actual=Subquery(activa))
+
+        elapsed_time = time.time() - start_time
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {len(desalineados)} dispositivos sincronizados en {elapsed_time:.2f}s'
+        ))
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_asignacion_actual(apps, schema_editor):
+    """Rellena asignacion_actual con la asignación ACTIVA más reciente de cada dispositivo."""
+    Device = apps.get_model('devices', 'Device')
+    Assignment = apps.get_model('assignments', 'Assignment')
+
+    activa = Assignment.objects.filter(
+        dispositivo=models.OuterRef('pk'),
+        estado_asignacion='ACTIVA'
+    ).order_by('-fecha_entrega', '-id').values('id')[:1]
+
+    updated = Device.objects.update(asignacion_actual=models.Subquery(activa))
+    print(f"Sincronizada asignacion_actual en {updated} dispositivos")
+
+
+def reverse_populate(apps, schema_editor):
+    """Revierte la migración."""
+    Device = apps.get_model('devices', 'Device')
+    Device.objects.update(asignacion_actual=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0008_alter_assignment_dispositivo'),
+        ('devices', '0009_populate_inactive_devices'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='device',
+            name='asignacion_actual',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Asignación ACTIVA vigente. Mantenido por las señales de asignaciones y devoluciones.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='assignments.assignment', verbose_name='Asignación actual'),
+        ),
+        migrations.RunPython(
+            populate_asignacion_actual,
+            reverse_populate
+        ),
+    ]
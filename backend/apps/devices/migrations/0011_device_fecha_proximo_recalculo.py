@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0010_device_asignacion_actual'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='device',
+            name='fecha_proximo_recalculo',
+            field=models.DateField(blank=True, db_index=True, editable=False, help_text='Fecha en que cambia la edad o el período de depreciación. Vacío = pendiente de cálculo', null=True, verbose_name='Próximo recálculo'),
+        ),
+    ]
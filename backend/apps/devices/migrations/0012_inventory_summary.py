@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_inventory_summary(apps, schema_editor):
+    """Calcula el resumen de inventario inicial desde los dispositivos existentes."""
+    Device = apps.get_model('devices', 'Device')
+    InventorySummary = apps.get_model('devices', 'InventorySummary')
+
+    rows = Device.objects.order_by().values(
+        'sucursal_id', 'tipo_equipo', 'estado', 'activo'
+    ).annotate(total=models.Count('id'))
+
+    InventorySummary.objects.bulk_create([InventorySummary(**row) for row in rows])
+    print(f"Resumen de inventario creado con {len(rows)} combinaciones")
+
+
+def reverse_populate(apps, schema_editor):
+    """Revierte la migración."""
+    InventorySummary = apps.get_model('devices', 'InventorySummary')
+    InventorySummary.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('branches', '0002_remove_branch_ciudad_remove_branch_direccion'),
+        ('devices', '0011_device_fecha_proximo_recalculo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventorySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo_equipo', models.CharField(choices=[('LAPTOP', 'Laptop'), ('DESKTOP', 'Desktop'), ('TELEFONO', 'Teléfono Móvil'), ('TABLET', 'Tablet'), ('TV', 'TV'), ('SIM', 'SIM Card'), ('ACCESORIO', 'Accesorio')], max_length=20, verbose_name='Tipo de equipo')),
+                ('estado', models.CharField(choices=[('DISPONIBLE', 'Disponible'), ('ASIGNADO', 'Asignado'), ('MANTENIMIENTO', 'En Mantenimiento'), ('BAJA', 'Dado de Baja'), ('ROBO', 'Robo/Perdida')], max_length=20, verbose_name='Estado')),
+                ('activo', models.BooleanField(verbose_name='Activo')),
+                ('total', models.IntegerField(default=0, verbose_name='Total')),
+                ('sucursal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventario', to='branches.branch', verbose_name='Sucursal')),
+            ],
+            options={
+                'verbose_name': 'Resumen de inventario',
+                'verbose_name_plural': 'Resumen de inventario',
+                'constraints': [models.UniqueConstraint(fields=('sucursal', 'tipo_equipo', 'estado', 'activo'), name='inventory_summary_unique_key')],
+            },
+        ),
+        migrations.RunPython(
+            populate_inventory_summary,
+            reverse_populate
+        ),
+    ]
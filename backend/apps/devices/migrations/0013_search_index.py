@@ -0,0 +1,148 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:40
+
+from django.db import migrations
+
+from config.operations import VendorRunSQL
+
+# Índices de búsqueda de config/search.py: en SQLite, una tabla FTS5 espejo mantenida
+# por triggers; en PostgreSQL, índices GIN de trigramas y tsvector sobre el documento.
+
+SQLITE = [
+    '''
+        CREATE VIRTUAL TABLE "devices_device_busqueda" USING fts5(
+            "numero_serie", "imei", "marca", "modelo", "numero_telefono",
+            "numero_factura", "numero_serie_compacto", "imei_compacto",
+            "numero_telefono_compacto",
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    ''',
+    '''
+        INSERT INTO "devices_device_busqueda" (
+            rowid, "numero_serie", "imei", "marca", "modelo", "numero_telefono",
+            "numero_factura", "numero_serie_compacto", "imei_compacto",
+            "numero_telefono_compacto"
+        )
+        SELECT
+            "id",
+            "numero_serie",
+            "imei",
+            "marca",
+            "modelo",
+            "numero_telefono",
+            "numero_factura",
+            replace(replace(replace(replace("numero_serie", '.', ''), '-', ''), ' ', ''), '/', ''),
+            replace(replace(replace(replace("imei", '.', ''), '-', ''), ' ', ''), '/', ''),
+            replace(replace(replace(replace("numero_telefono", '.', ''), '-', ''), ' ', ''), '/', '')
+        FROM "devices_device"
+    ''',
+    '''
+        CREATE TRIGGER "devices_device_busqueda_ai" AFTER INSERT ON "devices_device" BEGIN
+            INSERT INTO "devices_device_busqueda" (
+                rowid, "numero_serie", "imei", "marca", "modelo", "numero_telefono",
+                "numero_factura", "numero_serie_compacto", "imei_compacto",
+                "numero_telefono_compacto"
+            ) VALUES (
+                NEW."id",
+                NEW."numero_serie",
+                NEW."imei",
+                NEW."marca",
+                NEW."modelo",
+                NEW."numero_telefono",
+                NEW."numero_factura",
+                replace(replace(replace(replace(NEW."numero_serie", '.', ''), '-', ''), ' ', ''), '/', ''),
+                replace(replace(replace(replace(NEW."imei", '.', ''), '-', ''), ' ', ''), '/', ''),
+                replace(replace(replace(replace(NEW."numero_telefono", '.', ''), '-', ''), ' ', ''), '/', '')
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "devices_device_busqueda_au" AFTER UPDATE ON "devices_device" BEGIN
+            DELETE FROM "devices_device_busqueda" WHERE rowid = OLD."id";
+            INSERT INTO "devices_device_busqueda" (
+                rowid, "numero_serie", "imei", "marca", "modelo", "numero_telefono",
+                "numero_factura", "numero_serie_compacto", "imei_compacto",
+                "numero_telefono_compacto"
+            ) VALUES (
+                NEW."id",
+                NEW."numero_serie",
+                NEW."imei",
+                NEW."marca",
+                NEW."modelo",
+                NEW."numero_telefono",
+                NEW."numero_factura",
+                replace(replace(replace(replace(NEW."numero_serie", '.', ''), '-', ''), ' ', ''), '/', ''),
+                replace(replace(replace(replace(NEW."imei", '.', ''), '-', ''), ' ', ''), '/', ''),
+                replace(replace(replace(replace(NEW."numero_telefono", '.', ''), '-', ''), ' ', ''), '/', '')
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "devices_device_busqueda_ad" AFTER DELETE ON "devices_device" BEGIN
+            DELETE FROM "devices_device_busqueda" WHERE rowid = OLD."id";
+        END
+    ''',
+]
+
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS "devices_device_busqueda_ai"',
+    'DROP TRIGGER IF EXISTS "devices_device_busqueda_au"',
+    'DROP TRIGGER IF EXISTS "devices_device_busqueda_ad"',
+    'DROP TABLE IF EXISTS "devices_device_busqueda"',
+]
+
+POSTGRESQL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE EXTENSION IF NOT EXISTS unaccent',
+    '''
+        CREATE OR REPLACE FUNCTION techtrace_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+    ''',
+    '''
+        CREATE INDEX IF NOT EXISTS "devices_device_busqueda_trgm" ON "devices_device" USING gin (
+            (techtrace_unaccent(lower(
+                coalesce("numero_serie", '') || ' ' ||
+                coalesce("imei", '') || ' ' ||
+                coalesce("marca", '') || ' ' ||
+                coalesce("modelo", '') || ' ' ||
+                coalesce("numero_telefono", '') || ' ' ||
+                coalesce("numero_factura", '') || ' ' ||
+                regexp_replace(coalesce("numero_serie", ''), '[^[:alnum:]]', '', 'g') || ' ' ||
+                regexp_replace(coalesce("imei", ''), '[^[:alnum:]]', '', 'g') || ' ' ||
+                regexp_replace(coalesce("numero_telefono", ''), '[^[:alnum:]]', '', 'g')
+            ))) gin_trgm_ops
+        )
+    ''',
+    '''
+        CREATE INDEX IF NOT EXISTS "devices_device_busqueda_tsv" ON "devices_device" USING gin (
+            to_tsvector('simple'::regconfig, techtrace_unaccent(lower(
+                coalesce("numero_serie", '') || ' ' ||
+                coalesce("imei", '') || ' ' ||
+                coalesce("marca", '') || ' ' ||
+                coalesce("modelo", '') || ' ' ||
+                coalesce("numero_telefono", '') || ' ' ||
+                coalesce("numero_factura", '') || ' ' ||
+                regexp_replace(coalesce("numero_serie", ''), '[^[:alnum:]]', '', 'g') || ' ' ||
+                regexp_replace(coalesce("imei", ''), '[^[:alnum:]]', '', 'g') || ' ' ||
+                regexp_replace(coalesce("numero_telefono", ''), '[^[:alnum:]]', '', 'g')
+            )))
+        )
+    ''',
+]
+
+POSTGRESQL_REVERSE = [
+    'DROP INDEX IF EXISTS "devices_device_busqueda_trgm"',
+    'DROP INDEX IF EXISTS "devices_device_busqueda_tsv"',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0012_inventory_summary'),
+    ]
+
+    operations = [
+        VendorRunSQL('sqlite', SQLITE, SQLITE_REVERSE),
+        VendorRunSQL('postgresql', POSTGRESQL, POSTGRESQL_REVERSE),
+    ]
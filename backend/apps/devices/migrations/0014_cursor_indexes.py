@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0010_cursor_indexes'),
+        ('branches', '0002_remove_branch_ciudad_remove_branch_direccion'),
+        ('devices', '0013_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(fields=['fecha_ingreso', 'id'], name='device_ingreso_id_idx'),
+        ),
+    ]
@@ -0,0 +1,244 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:10
+
+from django.db import migrations
+
+from config.operations import VendorRunSQL
+
+# Recrea los índices de búsqueda de SQLite: agrega la tabla FTS5 de trigramas (subcadenas)
+# y limita el trigger de actualización a las columnas indexadas. Los índices de
+# PostgreSQL no cambian.
+
+SQLITE = [
+    'DROP TRIGGER IF EXISTS "devices_device_busqueda_ai"',
+    'DROP TRIGGER IF EXISTS "devices_device_busqueda_au"',
+    'DROP TRIGGER IF EXISTS "devices_device_busqueda_ad"',
+    'DROP TABLE IF EXISTS "devices_device_busqueda"',
+    '''
+        CREATE VIRTUAL TABLE "devices_device_busqueda" USING fts5(
+            "numero_serie", "imei", "marca", "modelo", "numero_telefono",
+            "numero_factura", "numero_serie_compacto", "imei_compacto",
+            "numero_telefono_compacto",
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    ''',
+    '''
+        INSERT INTO "devices_device_busqueda" (
+            rowid, "numero_serie", "imei", "marca", "modelo", "numero_telefono",
+            "numero_factura", "numero_serie_compacto", "imei_compacto",
+            "numero_telefono_compacto"
+        )
+        SELECT
+            "id",
+            "numero_serie",
+            "imei",
+            "marca",
+            "modelo",
+            "numero_telefono",
+            "numero_factura",
+            replace(replace(replace(replace("numero_serie", '.', ''), '-', ''), ' ', ''), '/', ''),
+            replace(replace(replace(replace("imei", '.', ''), '-', ''), ' ', ''), '/', ''),
+            replace(replace(replace(replace("numero_telefono", '.', ''), '-', ''), ' ', ''), '/', '')
+        FROM "devices_device"
+    ''',
+    '''
+        CREATE VIRTUAL TABLE "devices_device_busqueda_trgm" USING fts5(
+            "numero_serie", "imei", "marca", "modelo", "numero_telefono",
+            "numero_factura", "numero_serie_compacto", "imei_compacto",
+            "numero_telefono_compacto",
+            tokenize = 'trigram'
+        )
+    ''',
+    '''
+        INSERT INTO "devices_device_busqueda_trgm" (
+            rowid, "numero_serie", "imei", "marca", "modelo", "numero_telefono",
+            "numero_factura", "numero_serie_compacto", "imei_compacto",
+            "numero_telefono_compacto"
+        )
+        SELECT
+            "id",
+            "numero_serie",
+            "imei",
+            "marca",
+            "modelo",
+            "numero_telefono",
+            "numero_factura",
+            replace(replace(replace(replace("numero_serie", '.', ''), '-', ''), ' ', ''), '/', ''),
+            replace(replace(replace(replace("imei", '.', ''), '-', ''), ' ', ''), '/', ''),
+            replace(replace(replace(replace("numero_telefono", '.', ''), '-', ''), ' ', ''), '/', '')
+        FROM "devices_device"
+    ''',
+    '''
+        CREATE TRIGGER "devices_device_busqueda_ai" AFTER INSERT ON "devices_device" BEGIN
+            INSERT INTO "devices_device_busqueda" (
+                rowid, "numero_serie", "imei", "marca", "modelo", "numero_telefono",
+                "numero_factura", "numero_serie_compacto", "imei_compacto",
+                "numero_telefono_compacto"
+            ) VALUES (
+                NEW."id",
+                NEW."numero_serie",
+                NEW."imei",
+                NEW."marca",
+                NEW."modelo",
+                NEW."numero_telefono",
+                NEW."numero_factura",
+                replace(replace(replace(replace(NEW."numero_serie", '.', ''), '-', ''), ' ', ''), '/', ''),
+                replace(replace(replace(replace(NEW."imei", '.', ''), '-', ''), ' ', ''), '/', ''),
+                replace(replace(replace(replace(NEW."numero_telefono", '.', ''), '-', ''), ' ', ''), '/', '')
+            );
+            INSERT INTO "devices_device_busqueda_trgm" (
+                rowid, "numero_serie", "imei", "marca", "modelo", "numero_telefono",
+                "numero_factura", "numero_serie_compacto", "imei_compacto",
+                "numero_telefono_compacto"
+            ) VALUES (
+                NEW."id",
+                NEW."numero_serie",
+                NEW."imei",
+                NEW."marca",
+                NEW."modelo",
+                NEW."numero_telefono",
+                NEW."numero_factura",
+                replace(replace(replace(replace(NEW."numero_serie", '.', ''), '-', ''), ' ', ''), '/', ''),
+                replace(replace(replace(replace(NEW."imei", '.', ''), '-', ''), ' ', ''), '/', ''),
+                replace(replace(replace(replace(NEW."numero_telefono", '.', ''), '-', ''), ' ', ''), '/', '')
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "devices_device_busqueda_au"
+        AFTER UPDATE OF "numero_serie", "imei", "marca", "modelo", "numero_telefono", "numero_factura"
+        ON "devices_device" BEGIN
+            DELETE FROM "devices_device_busqueda" WHERE rowid = OLD."id";
+            DELETE FROM "devices_device_busqueda_trgm" WHERE rowid = OLD."id";
+            INSERT INTO "devices_device_busqueda" (
+                rowid, "numero_serie", "imei", "marca", "modelo", "numero_telefono",
+                "numero_factura", "numero_serie_compacto", "imei_compacto",
+                "numero_telefono_compacto"
+            ) VALUES (
+                NEW."id",
+                NEW."numero_serie",
+                NEW."imei",
+                NEW."marca",
+                NEW."modelo",
+                NEW."numero_telefono",
+                NEW."numero_factura",
+                replace(replace(replace(replace(NEW."numero_serie", '.', ''), '-', ''), ' ', ''), '/', ''),
+                replace(replace(replace(replace(NEW."imei", '.', ''), '-', ''), ' ', ''), '/', ''),
+                replace(replace(replace(replace(NEW."numero_telefono", '.', ''), '-', ''), ' ', ''), '/', '')
+            );
+            INSERT INTO "devices_device_busqueda_trgm" (
+                rowid, "numero_serie", "imei", "marca", "modelo", "numero_telefono",
+                "numero_factura", "numero_serie_compacto", "imei_compacto",
+                "numero_telefono_compacto"
+            ) VALUES (
+                NEW."id",
+                NEW."numero_serie",
+                NEW."imei",
+                NEW."marca",
+                NEW."modelo",
+                NEW."numero_telefono",
+                NEW."numero_factura",
+                replace(replace(replace(replace(NEW."numero_serie", '.', ''), '-', ''), ' ', ''), '/', ''),
+                replace(replace(replace(replace(NEW."imei", '.', ''), '-', ''), ' ', ''), '/', ''),
+                replace(replace(replace(replace(NEW."numero_telefono", '.', ''), '-', ''), ' ', ''), '/', '')
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "devices_device_busqueda_ad" AFTER DELETE ON "devices_device" BEGIN
+            DELETE FROM "devices_device_busqueda" WHERE rowid = OLD."id";
+            DELETE FROM "devices_device_busqueda_trgm" WHERE rowid = OLD."id";
+        END
+    ''',
+]
+
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS "devices_device_busqueda_ai"',
+    'DROP TRIGGER IF EXISTS "devices_device_busqueda_au"',
+    'DROP TRIGGER IF EXISTS "devices_device_busqueda_ad"',
+    'DROP TABLE IF EXISTS "devices_device_busqueda"',
+    'DROP TABLE IF EXISTS "devices_device_busqueda_trgm"',
+    '''
+        CREATE VIRTUAL TABLE "devices_device_busqueda" USING fts5(
+            "numero_serie", "imei", "marca", "modelo", "numero_telefono",
+            "numero_factura", "numero_serie_compacto", "imei_compacto",
+            "numero_telefono_compacto",
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    ''',
+    '''
+        INSERT INTO "devices_device_busqueda" (
+            rowid, "numero_serie", "imei", "marca", "modelo", "numero_telefono",
+            "numero_factura", "numero_serie_compacto", "imei_compacto",
+            "numero_telefono_compacto"
+        )
+        SELECT
+            "id",
+            "numero_serie",
+            "imei",
+            "marca",
+            "modelo",
+            "numero_telefono",
+            "numero_factura",
+            replace(replace(replace(replace("numero_serie", '.', ''), '-', ''), ' ', ''), '/', ''),
+            replace(replace(replace(replace("imei", '.', ''), '-', ''), ' ', ''), '/', ''),
+            replace(replace(replace(replace("numero_telefono", '.', ''), '-', ''), ' ', ''), '/', '')
+        FROM "devices_device"
+    ''',
+    '''
+        CREATE TRIGGER "devices_device_busqueda_ai" AFTER INSERT ON "devices_device" BEGIN
+            INSERT INTO "devices_device_busqueda" (
+                rowid, "numero_serie", "imei", "marca", "modelo", "numero_telefono",
+                "numero_factura", "numero_serie_compacto", "imei_compacto",
+                "numero_telefono_compacto"
+            ) VALUES (
+                NEW."id",
+                NEW."numero_serie",
+                NEW."imei",
+                NEW."marca",
+                NEW."modelo",
+                NEW."numero_telefono",
+                NEW."numero_factura",
+                replace(replace(replace(replace(NEW."numero_serie", '.', ''), '-', ''), ' ', ''), '/', ''),
+                replace(replace(replace(replace(NEW."imei", '.', ''), '-', ''), ' ', ''), '/', ''),
+                replace(replace(replace(replace(NEW."numero_telefono", '.', ''), '-', ''), ' ', ''), '/', '')
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "devices_device_busqueda_au" AFTER UPDATE ON "devices_device" BEGIN
+            DELETE FROM "devices_device_busqueda" WHERE rowid = OLD."id";
+            INSERT INTO "devices_device_busqueda" (
+                rowid, "numero_serie", "imei", "marca", "modelo", "numero_telefono",
+                "numero_factura", "numero_serie_compacto", "imei_compacto",
+                "numero_telefono_compacto"
+            ) VALUES (
+                NEW."id",
+                NEW."numero_serie",
+                NEW."imei",
+                NEW."marca",
+                NEW."modelo",
+                NEW."numero_telefono",
+                NEW."numero_factura",
+                replace(replace(replace(replace(NEW."numero_serie", '.', ''), '-', ''), ' ', ''), '/', ''),
+                replace(replace(replace(replace(NEW."imei", '.', ''), '-', ''), ' ', ''), '/', ''),
+                replace(replace(replace(replace(NEW."numero_telefono", '.', ''), '-', ''), ' ', ''), '/', '')
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "devices_device_busqueda_ad" AFTER DELETE ON "devices_device" BEGIN
+            DELETE FROM "devices_device_busqueda" WHERE rowid = OLD."id";
+        END
+    ''',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('devices', '0014_cursor_indexes'),
+    ]
+
+    operations = [
+        VendorRunSQL('sqlite', SQLITE, SQLITE_REVERSE),
+    ]
@@ -1,9 +1,23 @@
 from django.db import models
 from django.conf import settings
+from apps.users.audit import AuditTrackedMixin
 import json
 
+from . import depreciation, summary, transitions
 
-class Device(models.Model):
+
+class DeviceQuerySet(models.QuerySet):
+    """QuerySet de dispositivos con cálculos de depreciación en base de datos."""
+
+    def con_depreciacion(self, hoy=None):
+        """
+        Anota valor_depreciado_calculado y edad_anios como expresiones SQL.
+        Permite ordenar, filtrar y agregar por ellos sin cargar los objetos en Python.
+        """
+        return self.annotate(**depreciation.anotaciones_depreciacion(hoy))
+
+
+class Device(AuditTrackedMixin, models.Model):
     """
     Modelo para gestionar los dispositivos móviles de la empresa.
     """
@@ -57,16 +71,51 @@ class Device(models.Model):
         verbose_name='Fecha de inactivación',
         help_text='Fecha en que el dispositivo fue marcado como inactivo'
     )
+    asignacion_actual = models.ForeignKey(
+        'assignments.Assignment',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        editable=False,
+        related_name='+',
+        verbose_name='Asignación actual',
+        help_text='Asignación ACTIVA vigente. Mantenido por las señales de asignaciones y devoluciones.'
+    )
+    fecha_proximo_recalculo = models.DateField(
+        blank=True,
+        null=True,
+        editable=False,
+        db_index=True,
+        verbose_name='Próximo recálculo',
+        help_text='Fecha en que cambia la edad o el período de depreciación. Vacío = pendiente de cálculo'
+    )
+
+    objects = DeviceQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Dispositivo'
         verbose_name_plural = 'Dispositivos'
         ordering = ['-fecha_ingreso']
+        indexes = [
+            # Orden estable para paginación por cursor
+            models.Index(fields=['fecha_ingreso', 'id'], name='device_ingreso_id_idx'),
+        ]
 
     def __str__(self):
         identificador = self.numero_serie or self.imei or 'S/N'
         return f"{self.get_tipo_equipo_display()} - {self.marca} {self.modelo} ({identificador})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Guarda la clave de inventario leída, usada para actualizar InventorySummary por delta."""
+        instance = super().from_db(db, field_names, values)
+        summary.guardar_clave_original(instance)
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        summary.guardar_clave_original(self)
+
     @property
     def serial_identifier(self):
         """Retorna numero_serie o imei como identificador del dispositivo"""
@@ -79,16 +128,14 @@ class Device(models.Model):
             return None
 
         from datetime import date
-        today = date.today()
-        delta = today - self.fecha_ingreso
-        years = delta.days // 365
+        years = depreciation.edad_en_anios((date.today() - self.fecha_ingreso).days)
 
         # Si es mayor a 5 años, retornar "5+"
-        if years > 5:
+        if years > depreciation.EDAD_MAXIMA:
             return "5+"
         return years
 
-    def calcular_depreciacion(self):
+    def calcular_depreciacion(self, hoy=None):
         """
         Calcula el valor depreciado según la fórmula:
         - Primeros 6 meses: 0% depreciación
@@ -99,27 +146,10 @@ class Device(models.Model):
             return None
 
         from datetime import date
-        today = date.today()
-        delta = today - self.fecha_ingreso
-
-        # Calcular meses transcurridos (usando 30.44 días promedio por mes)
-        meses_transcurridos = delta.days / 30.44
-
-        # Calcular períodos de 6 meses
-        periodos_6_meses = int(meses_transcurridos / 6)
-
-        # Si han pasado 10 o más períodos (60+ meses), valor = 0
-        if periodos_6_meses >= 10:
-            return 0
+        hoy = hoy or date.today()
+        periodos = depreciation.periodos_depreciacion((hoy - self.fecha_ingreso).days)
 
-        # Calcular porcentaje de depreciación (10% por cada período)
-        porcentaje_depreciacion = min(periodos_6_meses * 10, 100)
-
-        # Calcular valor depreciado
-        from decimal import Decimal
-        valor_depreciado = self.valor_inicial * (Decimal('1') - Decimal(str(porcentaje_depreciacion)) / Decimal('100'))
-
-        return round(valor_depreciado, 2)
+        return depreciation.valor_depreciado(self.valor_inicial, periodos)
 
     def get_valor_depreciado(self):
         """
@@ -134,66 +164,65 @@ class Device(models.Model):
 
     def debe_calcular_edad(self):
         """Retorna True si el tipo de dispositivo debe tener edad"""
-        return self.tipo_equipo in ['LAPTOP', 'DESKTOP', 'TELEFONO', 'TABLET']
+        return self.tipo_equipo in depreciation.TIPOS_CON_DEPRECIACION
 
     def debe_calcular_valor(self):
         """Retorna True si el tipo de dispositivo debe tener valor"""
-        return self.tipo_equipo in ['LAPTOP', 'DESKTOP', 'TELEFONO', 'TABLET']
+        return self.tipo_equipo in depreciation.TIPOS_CON_DEPRECIACION
+
+    def actualizar_campos_derivados(self):
+        """
+        Calcula edad_dispositivo y valor_depreciado en memoria, antes de guardar,
+        para que el alta y la edición escriban el dispositivo en un solo INSERT/UPDATE.
+        valor_depreciado solo se recalcula si no fue ingresado manualmente.
+        """
+        if self.debe_calcular_edad() and self.fecha_ingreso:
+            from datetime import date
+            self.edad_dispositivo = depreciation.edad_almacenada((date.today() - self.fecha_ingreso).days)
+
+        if self.debe_calcular_valor() and self.valor_inicial and not self.es_valor_manual:
+            self.valor_depreciado = self.calcular_depreciacion()
 
     def change_status(self, new_status, user=None):
         """
         Cambia el estado del dispositivo y registra en auditoría.
         Marca automáticamente como inactivo si se cambia a estado final.
+
+        Escribe solo las columnas de estado con un UPDATE condicional sobre el estado
+        actual de la instancia (ver apps/devices/transitions.py): si otro proceso cambió
+        el estado desde que se leyó, lanza ConflictoEstado (HTTP 409) sin modificar nada.
+        Las transiciones no permitidas (ej: desde BAJA o ROBO) lanzan ValidationError.
         """
-        from apps.users.audit import AuditLog
-        from django.core.exceptions import ValidationError
-        from django.utils import timezone
+        return transitions.cambiar_estado(self, new_status, user=user)
 
-        old_status = self.estado
+    def has_active_assignment(self):
+        """
+        Retorna True si el dispositivo tiene una asignación activa.
+        Lee la columna desnormalizada asignacion_actual, por lo que no ejecuta queries.
+        """
+        return self.asignacion_actual_id is not None
 
-        if old_status == new_status:
-            return False  # No hay cambio
 
-        # VALIDACIÓN: Estados finales no pueden cambiar
-        if old_status in self.FINAL_STATES:
-            raise ValidationError(
-                f'No se puede cambiar el estado de un dispositivo en {old_status}. '
-                f'Este es un estado final y no puede ser modificado.'
-            )
+class InventorySummary(models.Model):
+    """
+    Cantidad de dispositivos por sucursal, tipo, estado y activo.
+    Mantenido por deltas desde las señales de Device (ver apps/devices/summary.py).
+    """
+    sucursal = models.ForeignKey('branches.Branch', on_delete=models.CASCADE, related_name='inventario', verbose_name='Sucursal')
+    tipo_equipo = models.CharField(max_length=20, choices=Device.TIPO_CHOICES, verbose_name='Tipo de equipo')
+    estado = models.CharField(max_length=20, choices=Device.ESTADO_CHOICES, verbose_name='Estado')
+    activo = models.BooleanField(verbose_name='Activo')
+    total = models.IntegerField(default=0, verbose_name='Total')
 
-        self.estado = new_status
-
-        # LÓGICA DE INACTIVACIÓN: Si el nuevo estado es final, marcar como inactivo
-        if new_status in self.FINAL_STATES:
-            self.activo = False
-            if not self.fecha_inactivacion:
-                self.fecha_inactivacion = timezone.now()
-
-        self.save()
-
-        # Registrar en auditoría
-        if user:
-            changes = {
-                'field': 'estado',
-                'old_value': old_status,
-                'new_value': new_status,
-                'device': str(self)
-            }
-
-            if new_status in self.FINAL_STATES:
-                changes['activo_changed'] = True
-                changes['fecha_inactivacion'] = self.fecha_inactivacion.isoformat()
-
-            AuditLog.objects.create(
-                user=user,
-                action='UPDATE',
-                entity_type='Device',
-                entity_id=self.id,
-                changes=changes
+    class Meta:
+        verbose_name = 'Resumen de inventario'
+        verbose_name_plural = 'Resumen de inventario'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['sucursal', 'tipo_equipo', 'estado', 'activo'],
+                name='inventory_summary_unique_key'
             )
+        ]
 
-        return True
-
-    def has_active_assignment(self):
-        """Retorna True si el dispositivo tiene una asignación activa"""
-        return self.assignment_set.filter(estado_asignacion='ACTIVA').exists()
+    def __str__(self):
+        return f"{self.sucursal_id} {self.tipo_equipo} {self.estado} activo={self.activo}: {self.total}"
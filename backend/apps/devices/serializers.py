@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from .models import Device
-from apps.branches.serializers import BranchSerializer, BranchListSerializer
+from apps.branches.serializers import BranchListSerializer
 
 
 class DeviceListSerializer(serializers.ModelSerializer):
@@ -49,7 +49,7 @@ class DeviceListSerializer(serializers.ModelSerializer):
         ]
 
     def get_asignacion_activa(self, obj):
-        """Retorna True si el dispositivo tiene asignación activa"""
+        """Retorna True si el dispositivo tiene asignación activa (columna desnormalizada, sin query)"""
         return obj.has_active_assignment()
 
 
@@ -59,7 +59,7 @@ class DeviceSerializer(serializers.ModelSerializer):
     Los campos numero_serie e imei solo pueden ser modificados por usuarios ADMIN.
     """
     # Campos de solo lectura con información anidada
-    sucursal_detail = BranchSerializer(source='sucursal', read_only=True)
+    sucursal_detail = BranchListSerializer(source='sucursal', read_only=True)
     created_by_username = serializers.CharField(source='created_by.username', read_only=True)
     tipo_equipo_display = serializers.CharField(source='get_tipo_equipo_display', read_only=True)
     estado_display = serializers.CharField(source='get_estado_display', read_only=True)
@@ -304,43 +304,279 @@ class DeviceSerializer(serializers.ModelSerializer):
         return obj.debe_calcular_valor()
 
     def get_asignacion_activa(self, obj):
-        """Retorna True si el dispositivo tiene asignación activa"""
+        """Retorna True si el dispositivo tiene asignación activa (columna desnormalizada, sin query)"""
         return obj.has_active_assignment()
 
     def create(self, validated_data):
-        """Crear dispositivo y calcular edad si aplica"""
-        device = super().create(validated_data)
-
-        # Actualizar edad si aplica
-        if device.debe_calcular_edad():
-            edad = device.edad_calculada
-            device.edad_dispositivo = 5 if edad == "5+" else edad
-            device.save(update_fields=['edad_dispositivo'])
-
-        # Si tiene valor_inicial pero no valor_depreciado, calcularlo
-        if device.debe_calcular_valor() and device.valor_inicial and not device.es_valor_manual:
-            device.valor_depreciado = device.calcular_depreciacion()
-            device.save(update_fields=['valor_depreciado'])
-
+        """Crear dispositivo con edad y valor depreciado ya calculados (un solo INSERT)"""
+        device = Device(**validated_data)
+        device.actualizar_campos_derivados()
+        device.save()
         return device
 
     def update(self, instance, validated_data):
-        """Actualizar dispositivo y recalcular edad/valor si aplica"""
+        """Actualizar dispositivo recalculando edad/valor antes de guardar (un solo UPDATE)"""
         # Si se modificó valor_depreciado manualmente, marcar es_valor_manual
         if 'valor_depreciado' in validated_data and validated_data['valor_depreciado'] != instance.valor_depreciado:
             validated_data['es_valor_manual'] = True
 
-        device = super().update(instance, validated_data)
+        # Si cambió la fecha de ingreso, el recálculo masivo debe volver a evaluar el dispositivo
+        if 'fecha_ingreso' in validated_data and validated_data['fecha_ingreso'] != instance.fecha_ingreso:
+            validated_data['fecha_proximo_recalculo'] = None
 
-        # Actualizar edad si aplica
-        if device.debe_calcular_edad():
-            edad = device.edad_calculada
-            device.edad_dispositivo = 5 if edad == "5+" else edad
-            device.save(update_fields=['edad_dispositivo'])
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.actualizar_campos_derivados()
+        instance.save()
 
-        # Recalcular valor si no es manual
-        if device.debe_calcular_valor() and device.valor_inicial and not device.es_valor_manual:
-            device.valor_depreciado = device.calcular_depreciacion()
-            device.save(update_fields=['valor_depreciado'])
+        return instance
 
-        return device
+
+# Máximo de dispositivos por solicitud en /api/devices/bulk/
+BULK_MAX_DISPOSITIVOS = 1000
+
+# Campos únicos verificados por lote: campo -> mensaje (igual que DeviceSerializer)
+CAMPOS_UNICOS = {
+    'numero_serie': 'Ya existe un dispositivo con este número de serie',
+    'imei': 'Ya existe un dispositivo con este IMEI',
+}
+
+
+class SucursalPrecargadaField(serializers.PrimaryKeyRelatedField):
+    """Resuelve la sucursal desde las precargadas por DeviceBulkListSerializer (sin query por fila)."""
+
+    def to_internal_value(self, data):
+        sucursales = getattr(self.root, 'sucursales', None)
+        if sucursales is None:
+            return super().to_internal_value(data)
+
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return sucursales[int(data)]
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+
+
+def resumen_lote(devices, campos):
+    """
+    Entidad y cambios de la entrada de auditoría de una operación masiva: una fila
+    DeviceBatch identificada por el primer dispositivo del lote, con los IDs afectados y
+    los campos escritos como pares {campo: [None, valor]}.
+    """
+    return {
+        'entity_type': 'DeviceBatch',
+        'entity_id': devices[0].pk,
+        'changes': {
+            'ids': [None, [device.pk for device in devices]],
+            'campos': [None, sorted(campos)],
+        },
+    }
+
+
+class DeviceBulkListSerializer(serializers.ListSerializer):
+    """
+    Creación y actualización masiva de dispositivos (POST/PATCH /api/devices/bulk/).
+
+    - Precarga las sucursales y, al actualizar, los dispositivos del lote (una query cada uno).
+    - Verifica la unicidad de numero_serie e imei contra la base de datos y dentro del
+      lote con una query por campo, en lugar de una por fila.
+    - Retorna los errores por índice de fila; si alguna fila falla no se guarda ninguna.
+    - Guarda con bulk_create/bulk_update en una transacción, actualiza InventorySummary,
+      invalida el caché de inventario y registra una sola entrada de auditoría
+      (BULK_CREATE/BULK_UPDATE, ver resumen_lote()).
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list) or not data or len(data) > (self.max_length or len(data)):
+            return super().to_internal_value(data)  # Lanza el error correspondiente
+
+        self.precargar(data)
+
+        ret = []
+        errors = {}
+        for index, item in enumerate(data):
+            row_errors = {}
+            try:
+                ret.append(self.run_child_validation(item))
+            except serializers.ValidationError as exc:
+                row_errors.update(exc.detail)
+            row_errors.update(self.conflictos.get(index, {}))
+            if row_errors:
+                errors[index] = row_errors
+
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        return ret
+
+    def precargar(self, data):
+        """Carga sucursales, dispositivos a actualizar y conflictos de unicidad del lote."""
+        from apps.branches.models import Branch
+
+        filas = [item if isinstance(item, dict) else {} for item in data]
+
+        sucursal_ids = {self._entero(item.get('sucursal')) for item in filas} - {None}
+        self.sucursales = Branch.objects.in_bulk(sucursal_ids) if sucursal_ids else {}
+
+        self.instancias = {}
+        self.validados = []  # Dispositivo de cada fila validada (en orden), al actualizar
+        if self.instance is not None:
+            ids = {self._entero(item.get('id')) for item in filas} - {None}
+            self.instancias = self.instance.in_bulk(ids) if ids else {}
+
+        self.conflictos = {}
+        for campo, mensaje in CAMPOS_UNICOS.items():
+            if self.child.fields[campo].read_only:
+                continue
+
+            valores = {}
+            for index, item in enumerate(filas):
+                valor = item.get(campo)
+                valor = valor.strip() if isinstance(valor, str) else valor
+                instancia = self.instancias.get(self._entero(item.get('id')))
+                if valor and not (instancia and getattr(instancia, campo) == valor):
+                    valores.setdefault(str(valor), []).append(index)
+            if not valores:
+                continue
+
+            existentes = dict(Device.objects.filter(**{f'{campo}__in': valores}).values_list(campo, 'pk'))
+            for valor, indices in valores.items():
+                for index in indices:
+                    if len(indices) > 1:
+                        error = 'Valor repetido en otra fila del lote'
+                    elif valor in existentes and existentes[valor] != self._entero(filas[index].get('id')):
+                        error = mensaje
+                    else:
+                        continue
+                    self.conflictos.setdefault(index, {})[campo] = [error]
+
+    def run_child_validation(self, data):
+        if self.instance is not None:
+            instancia = self.instancias.get(self._entero(data.get('id')) if isinstance(data, dict) else None)
+            if instancia is None:
+                raise serializers.ValidationError({'id': ['Dispositivo no encontrado']})
+            self.child.instance = instancia
+            self.child.initial_data = data
+            attrs = super().run_child_validation(data)
+            self.validados.append(instancia)
+            return attrs
+        return super().run_child_validation(data)
+
+    @staticmethod
+    def _entero(valor):
+        try:
+            return int(valor)
+        except (TypeError, ValueError):
+            return None
+
+    def create(self, validated_data):
+        from collections import Counter
+        from django.db import transaction
+        from apps.users.audit import AuditLog
+        from apps.users.audit_buffer import registrar
+        from . import summary
+        from .cache import invalidar_inventario
+
+        devices = []
+        for attrs in validated_data:
+            device = Device(**attrs)
+            device.actualizar_campos_derivados()
+            devices.append(device)
+
+        with transaction.atomic():
+            Device.objects.bulk_create(devices)
+            summary.aplicar_deltas(Counter(summary.clave_inventario(device) for device in devices))
+            invalidar_inventario()
+
+            campos = set()
+            for device in devices:
+                campos.update(device.cambios_auditoria())
+                device.guardar_valores_originales()
+            if devices and devices[0].created_by_id:
+                registrar(AuditLog(
+                    user_id=devices[0].created_by_id, action='BULK_CREATE',
+                    **resumen_lote(devices, campos),
+                ))
+
+        return devices
+
+    def update(self, instance, validated_data):
+        from collections import Counter
+        from django.db import transaction
+        from django.utils import timezone
+        from apps.users.audit import AuditLog
+        from apps.users.audit_buffer import registrar
+        from . import summary
+        from .cache import invalidar_inventario
+
+        request = self.context.get('request')
+        ahora = timezone.now()
+        campos = {'edad_dispositivo', 'valor_depreciado', 'updated_at'}
+        deltas = Counter()
+        devices = []
+
+        for device, attrs in zip(self.validados, validated_data):
+            anterior = summary.clave_inventario(device)
+
+            if 'valor_depreciado' in attrs and attrs['valor_depreciado'] != device.valor_depreciado:
+                attrs['es_valor_manual'] = True
+            if 'fecha_ingreso' in attrs and attrs['fecha_ingreso'] != device.fecha_ingreso:
+                attrs['fecha_proximo_recalculo'] = None
+
+            for campo, valor in attrs.items():
+                setattr(device, campo, valor)
+            campos.update(attrs)
+            device.updated_at = ahora
+            device.actualizar_campos_derivados()
+
+            deltas.update(summary.deltas_cambio(anterior, summary.clave_inventario(device)))
+            devices.append(device)
+
+        with transaction.atomic():
+            Device.objects.bulk_update(devices, sorted(campos), batch_size=500)
+            summary.aplicar_deltas(deltas)
+            invalidar_inventario()
+
+            modificados = []
+            campos_modificados = set()
+            for device in devices:
+                cambios = device.cambios_auditoria()
+                if cambios:
+                    modificados.append(device)
+                    campos_modificados.update(cambios)
+                device.guardar_valores_originales()
+            user = request.user if request else None
+            if modificados and user and user.is_authenticated:
+                registrar(AuditLog(
+                    user=user, action='BULK_UPDATE', **resumen_lote(modificados, campos_modificados),
+                ))
+
+        return devices
+
+
+class DeviceBulkSerializer(DeviceSerializer):
+    """
+    Fila de /api/devices/bulk/. Igual que DeviceSerializer, pero sin las consultas por fila:
+    la unicidad y la sucursal las resuelve DeviceBulkListSerializer para todo el lote.
+    """
+
+    class Meta(DeviceSerializer.Meta):
+        list_serializer_class = DeviceBulkListSerializer
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        from rest_framework.validators import UniqueValidator
+
+        for campo in CAMPOS_UNICOS:
+            field = self.fields[campo]
+            field.validators = [v for v in field.validators if not isinstance(v, UniqueValidator)]
+        self.fields['sucursal'] = SucursalPrecargadaField(queryset=self.fields['sucursal'].queryset)
+
+    def validate_numero_serie(self, value):
+        return value or None
+
+    def validate_imei(self, value):
+        return value or None
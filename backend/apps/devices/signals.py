@@ -0,0 +1,75 @@
+"""
+Señales para el módulo de dispositivos.
+
+- Mantiene InventorySummary por deltas cuando se guarda o elimina un dispositivo.
+- Invalida el caché de estadísticas de inventario (apps/devices/cache.py) cuando cambian
+  los modelos de los que dependen inventory-stats y el dashboard.
+"""
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import invalidar_inventario
+from .models import Device
+from . import summary
+
+
+MODELOS_INVENTARIO = (
+    'devices.Device',
+    'assignments.Assignment',
+    'assignments.Return',
+    'employees.Employee',
+    'branches.Branch',
+)
+
+
+@receiver(pre_save, sender=Device)
+def device_pre_save_summary(sender, instance, **kwargs):
+    """
+    Determina la clave de inventario que tenía el dispositivo antes de guardarse.
+    Usa la clave leída en from_db(); solo consulta la base de datos si la instancia
+    no fue cargada desde ella (ej: Device(pk=...) construido a mano, que Django guarda
+    con UPDATE si la fila existe).
+    """
+    if instance.pk is None:
+        instance._inventario_anterior = None
+        return
+
+    anterior = getattr(instance, '_inventario_original', None)
+    if anterior is None:
+        anterior = Device.objects.filter(pk=instance.pk).values_list(*summary.CAMPOS_CLAVE).first()
+    instance._inventario_anterior = anterior
+
+
+@receiver(post_save, sender=Device)
+def device_post_save_summary(sender, instance, created, update_fields=None, **kwargs):
+    """Aplica el delta (+1/-1) del cambio de clave de inventario del dispositivo."""
+    anterior = None if created else getattr(instance, '_inventario_anterior', None)
+    nueva = summary.clave_inventario(instance)
+
+    # Con update_fields solo se escribieron esos campos; el resto sigue como estaba
+    if anterior is not None and update_fields is not None:
+        guardados = {Device._meta.get_field(name).attname for name in update_fields}
+        nueva = tuple(
+            valor if campo in guardados else valor_anterior
+            for campo, valor, valor_anterior in zip(summary.CAMPOS_CLAVE, nueva, anterior)
+        )
+
+    summary.aplicar_deltas(summary.deltas_cambio(anterior, nueva))
+    instance._inventario_original = nueva
+
+
+@receiver(post_delete, sender=Device)
+def device_post_delete_summary(sender, instance, **kwargs):
+    """Descuenta el dispositivo eliminado del resumen de inventario."""
+    clave = getattr(instance, '_inventario_original', None) or summary.clave_inventario(instance)
+    summary.aplicar_deltas(summary.deltas_cambio(clave, None))
+
+
+def inventario_modificado(sender, **kwargs):
+    """Incrementa la versión del inventario al confirmarse la transacción."""
+    invalidar_inventario()
+
+
+for modelo in MODELOS_INVENTARIO:
+    post_save.connect(inventario_modificado, sender=modelo, dispatch_uid=f'inventario_save_{modelo}')
+    post_delete.connect(inventario_modificado, sender=modelo, dispatch_uid=f'inventario_delete_{modelo}')
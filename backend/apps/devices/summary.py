@@ -0,0 +1,114 @@
+"""
+Resumen de inventario mantenido por deltas.
+
+La tabla InventorySummary guarda la cantidad de dispositivos por combinación
+(sucursal, tipo_equipo, estado, activo). Se actualiza con +1/-1 cada vez que un
+dispositivo se crea, cambia de estado, de sucursal o de tipo, se inactiva o se elimina
+(ver apps/devices/signals.py), por lo que las estadísticas leen una tabla cuyo tamaño
+depende de la cantidad de sucursales y no de la flota.
+
+Las operaciones masivas que no pasan por save() (queryset.update(), bulk_create)
+deben llamar a aplicar_deltas() con los cambios que realizan. Para reparar
+desalineaciones existe el comando rebuild_inventory_summary.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+
+
+# Campos de Device que forman la clave del resumen (attname)
+CAMPOS_CLAVE = ('sucursal_id', 'tipo_equipo', 'estado', 'activo')
+
+
+def clave_inventario(device):
+    """Retorna la clave (sucursal_id, tipo_equipo, estado, activo) de un dispositivo."""
+    return tuple(getattr(device, campo) for campo in CAMPOS_CLAVE)
+
+
+def guardar_clave_original(device):
+    """
+    Guarda en la instancia la clave con la que fue leída de la base de datos, para
+    calcular el delta al guardarla sin volver a consultarla. Se omite si alguno de
+    los campos de la clave fue diferido (only()/defer()).
+    """
+    if device.get_deferred_fields().intersection(CAMPOS_CLAVE):
+        device._inventario_original = None
+    else:
+        device._inventario_original = clave_inventario(device)
+
+
+def deltas_cambio(anterior, nueva):
+    """Retorna los deltas para un dispositivo que pasa de la clave `anterior` a `nueva`."""
+    deltas = Counter()
+    if anterior != nueva:
+        if anterior is not None:
+            deltas[anterior] -= 1
+        if nueva is not None:
+            deltas[nueva] += 1
+    return deltas
+
+
+def aplicar_deltas(deltas):
+    """
+    Aplica un diccionario {clave: delta} sobre InventorySummary.
+
+    Cada delta es un UPDATE atómico total = total + delta; la fila se crea si aún no
+    existe para esa combinación.
+    """
+    from .models import InventorySummary
+
+    for clave, delta in deltas.items():
+        if not delta:
+            continue
+
+        filtro = dict(zip(CAMPOS_CLAVE, clave))
+        if InventorySummary.objects.filter(**filtro).update(total=F('total') + delta):
+            continue
+
+        _, created = InventorySummary.objects.get_or_create(**filtro, defaults={'total': delta})
+        if not created:
+            InventorySummary.objects.filter(**filtro).update(total=F('total') + delta)
+
+
+def calcular_resumen():
+    """Calcula el resumen desde la tabla de dispositivos. Retorna {clave: total}."""
+    from .models import Device
+
+    rows = Device.objects.order_by().values_list(*CAMPOS_CLAVE).annotate(total=Count('id'))
+    return {tuple(row[:-1]): row[-1] for row in rows}
+
+
+def diferencias_resumen():
+    """
+    Compara InventorySummary con el cálculo desde Device.
+    Retorna una lista de (clave, esperado, almacenado) para las combinaciones que difieren.
+    """
+    from .models import InventorySummary
+
+    esperado = calcular_resumen()
+    almacenado = {
+        tuple(row[:-1]): row[-1]
+        for row in InventorySummary.objects.values_list(*CAMPOS_CLAVE, 'total')
+    }
+
+    return [
+        (clave, esperado.get(clave, 0), almacenado.get(clave, 0))
+        for clave in sorted(set(esperado) | set(almacenado), key=str)
+        if esperado.get(clave, 0) != almacenado.get(clave, 0)
+    ]
+
+
+def reconstruir_resumen():
+    """Recalcula InventorySummary completo desde Device. Retorna la cantidad de filas."""
+    from .models import InventorySummary
+
+    with transaction.atomic():
+        resumen = calcular_resumen()
+        InventorySummary.objects.all().delete()
+        InventorySummary.objects.bulk_create([
+            InventorySummary(total=total, **dict(zip(CAMPOS_CLAVE, clave)))
+            for clave, total in resumen.items()
+        ])
+
+    return len(resumen)
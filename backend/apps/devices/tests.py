@@ -1,3 +1,896 @@
-from django.test import TestCase
+"""
+Tests para el módulo de dispositivos.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.branches.models import Branch
+from apps.devices.models import Device, InventorySummary
+from apps.devices import cache as inventory_cache, depreciation, summary
+from apps.assignments.models import Assignment, Return
+from apps.users.testing import InventarioTestMixin
+
+User = get_user_model()
+
+
+class DeviceTestMixin(InventarioTestMixin):
+    """Datos base compartidos por los tests de dispositivos."""
+
+    codigo_sucursal = 'DEV-01'
+
+
+class ActiveAssignmentPointerTestCase(DeviceTestMixin, TestCase):
+    """Tests del puntero desnormalizado Device.asignacion_actual."""
+
+    def test_asignacion_y_devolucion_sincronizan_puntero(self):
+        device = self.create_device('PTR-001')
+        assignment = self.assign(device)
+
+        device.refresh_from_db()
+        self.assertEqual(device.asignacion_actual_id, assignment.id)
+        self.assertEqual(device.estado, 'ASIGNADO')
+
+        Return.objects.create(
+            asignacion=assignment,
+            fecha_devolucion=date.today() + timedelta(days=1),
+            estado_dispositivo='OPTIMO',
+            created_by=self.admin_user
+        )
+
+        device.refresh_from_db()
+        self.assertIsNone(device.asignacion_actual_id)
+        self.assertEqual(device.estado, 'DISPONIBLE')
+
+    def test_filtro_asignacion_activa(self):
+        asignado = self.create_device('PTR-002')
+        self.create_device('PTR-003')
+        self.assign(asignado)
+
+        response = self.client.get('/api/devices/', {'asignacion_activa': 'true'})
+        ids = [item['id'] for item in response.data['results']]
+        self.assertEqual(ids, [asignado.id])
+        self.assertTrue(response.data['results'][0]['asignacion_activa'])
+
+        response = self.client.get('/api/devices/', {'asignacion_activa': 'false'})
+        self.assertNotIn(asignado.id, [item['id'] for item in response.data['results']])
+
+    def test_listado_con_queries_constantes(self):
+        """El costo en queries del listado no depende del tamaño de página."""
+        for i in range(15):
+            device = self.create_device(f'PTR-1{i:02d}')
+            if i % 2 == 0:
+                self.assign(device)
+
+        with self.assertNumQueries(2):  # COUNT + SELECT
+            self.client.get('/api/devices/', {'page_size': 5})
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/devices/', {'page_size': 15})
+        self.assertEqual(len(response.data['results']), 15)
+
+
+class FleetDepreciationTestCase(DeviceTestMixin, TestCase):
+    """Tests del recálculo masivo de edad y depreciación."""
+
+    def test_umbrales_coinciden_con_calculo_por_objeto(self):
+        for dias in range(0, 2000):
+            esperado = depreciation.periodos_depreciacion(dias)
+            por_umbral = sum(1 for umbral in depreciation.UMBRALES_PERIODO[1:] if dias >= umbral)
+            self.assertEqual(esperado, por_umbral, f'dias={dias}')
+
+    def test_recalculo_masivo(self):
+        hoy = date(2026, 6, 30)
+        devices = [
+            self.create_device(f'DEP-{i:03d}', fecha_ingreso=hoy - timedelta(days=dias), valor_inicial=Decimal('1000000'))
+            for i, dias in enumerate([0, 100, 200, 400, 900, 1500, 1900, 3000])
+        ]
+        manual = self.create_device(
+            'DEP-MAN',
+            fecha_ingreso=hoy - timedelta(days=900),
+            valor_inicial=Decimal('1000000'),
+            valor_depreciado=Decimal('123'),
+            es_valor_manual=True
+        )
+
+        result = depreciation.recalcular_flota(hoy=hoy)
+        self.assertEqual(result['procesados'], len(devices) + 1)
+
+        for device in devices:
+            device.refresh_from_db()
+            dias = (hoy - device.fecha_ingreso).days
+            self.assertEqual(device.valor_depreciado, device.calcular_depreciacion(hoy=hoy))
+            self.assertEqual(device.edad_dispositivo, depreciation.edad_almacenada(dias))
+            self.assertGreater(device.fecha_proximo_recalculo, hoy)
+
+        manual.refresh_from_db()
+        self.assertEqual(manual.valor_depreciado, Decimal('123'))
+        self.assertEqual(manual.edad_dispositivo, 2)
+
+        # Sin cambios de período: la siguiente ejecución no procesa nada
+        self.assertEqual(depreciation.recalcular_flota(hoy=hoy)['procesados'], 0)
+
+        # Al cruzar el próximo límite solo se procesan los dispositivos afectados
+        proxima = min(d.fecha_proximo_recalculo for d in devices)
+        result = depreciation.recalcular_flota(hoy=proxima)
+        self.assertGreaterEqual(result['procesados'], 1)
+        self.assertLess(result['procesados'], len(devices))
+
+
+class DepreciationAnnotationTestCase(DeviceTestMixin, TestCase):
+    """Tests de las anotaciones SQL de depreciación y edad."""
+
+    def setUp(self):
+        super().setUp()
+        hoy = date.today()
+        self.devices = [
+            self.create_device(f'ANN-{i:03d}', fecha_ingreso=hoy - timedelta(days=dias), valor_inicial=Decimal('850000'))
+            for i, dias in enumerate([0, 182, 183, 366, 730, 1095, 1826, 1827, 2600])
+        ]
+        self.devices.append(self.create_device(
+            'ANN-MAN',
+            fecha_ingreso=hoy - timedelta(days=400),
+            valor_inicial=Decimal('850000'),
+            valor_depreciado=Decimal('1000'),
+            es_valor_manual=True
+        ))
+        self.devices.append(self.create_device('ANN-SIN-VALOR', valor_inicial=None))
+        self.devices.append(self.create_device('ANN-TV', tipo_equipo='TV', valor_inicial=Decimal('300000')))
+
+    def test_anotaciones_equivalen_al_calculo_python(self):
+        for device in Device.objects.con_depreciacion():
+            esperado = device.get_valor_depreciado() if device.debe_calcular_valor() else None
+            self.assertEqual(device.valor_depreciado_calculado, esperado, device.numero_serie)
+
+            edad = device.edad_calculada
+            self.assertEqual(device.edad_anios, 6 if edad == '5+' else edad, device.numero_serie)
+
+    def test_filtros_y_ordenamiento(self):
+        response = self.client.get('/api/devices/', {'tipo_equipo': 'LAPTOP', 'valor_max': 0, 'page_size': 50})
+        ids = {item['id'] for item in response.data['results']}
+        self.assertEqual(ids, {self.devices[7].id, self.devices[8].id})
+
+        response = self.client.get('/api/devices/', {'edad_bucket': '5+'})
+        self.assertEqual([item['id'] for item in response.data['results']], [self.devices[8].id])
+
+        response = self.client.get('/api/devices/', {'ordering': 'valor_depreciado_calculado', 'valor_min': 1})
+        self.assertEqual(response.data['results'][0]['id'], self.devices[-3].id)
+
+    def test_histograma_de_edad(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/devices/age-histogram/')
+
+        totales = {item['edad']: item['total'] for item in response.data}
+        self.assertEqual(sum(totales.values()), len(self.devices))
+        self.assertEqual(totales['5+'], 1)
+        self.assertEqual(totales['5'], 2)
+
+    def test_listado_de_asignaciones_usa_anotacion(self):
+        for device in self.devices[:6]:
+            self.assign(device)
+        sin_dispositivo = self.assign(self.devices[6])
+        Assignment.objects.filter(pk=sin_dispositivo.pk).update(dispositivo=None, estado_asignacion='FINALIZADA')
+
+        with self.assertNumQueries(2):  # COUNT + SELECT
+            response = self.client.get('/api/assignments/assignments/', {'page_size': 50})
+
+        self.assertEqual(response.data['count'], 7)
+        detalle = {
+            item['id']: item['dispositivo_detail'] for item in response.data['results']
+        }
+        self.assertIsNone(detalle[sin_dispositivo.id])
+
+
+class InventoryCacheTestCase(DeviceTestMixin, TestCase):
+    """Tests del caché de inventory-stats y dashboard."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        inventory_cache._pendientes.clear()
+        self.device = self.create_device('CACHE-001')
+
+    def test_segunda_lectura_sale_de_cache(self):
+        response = self.client.get('/api/devices/inventory-stats/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['laptops']['total'], 1)
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/devices/inventory-stats/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['laptops']['total'], 1)
+
+    def test_cambios_invalidan_el_cache(self):
+        self.client.get('/api/devices/inventory-stats/')
+        self.client.get('/api/stats/dashboard/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_device('CACHE-002')
+
+        response = self.client.get('/api/devices/inventory-stats/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['laptops']['total'], 2)
+
+        response = self.client.get('/api/stats/dashboard/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['summary']['total_devices'], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assign(self.device)
+
+        response = self.client.get('/api/stats/dashboard/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['summary']['active_assignments'], 1)
+        self.assertEqual(len(response.data['recent_assignments']), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employee.estado = 'INACTIVO'
+            self.employee.save()
+
+        response = self.client.get('/api/stats/dashboard/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['summary']['active_employees'], 0)
+
+    def test_cambio_sin_commit_no_invalida(self):
+        self.client.get('/api/devices/inventory-stats/')
+        self.create_device('CACHE-003')
+
+        response = self.client.get('/api/devices/inventory-stats/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    @mock.patch.object(inventory_cache, 'CONTADOR_FLUSH_SEGUNDOS', 3600)
+    def test_contadores_compartidos_por_lotes(self):
+        inventory_cache._flush_contadores()
+        self.client.get('/api/devices/inventory-stats/')
+        self.client.get('/api/devices/inventory-stats/')
+
+        # Los aciertos se acumulan en el proceso sin escribir en el caché compartido
+        clave = inventory_cache._contador_key('inventory_stats', 'hits')
+        self.assertIsNone(cache.get(clave))
+
+        inventory_cache._flush_contadores()
+        self.assertEqual(cache.get(clave), 1)
+
+    def test_contadores(self):
+        self.client.get('/api/devices/inventory-stats/')
+        self.client.get('/api/devices/inventory-stats/')
+        self.client.get('/api/devices/inventory-stats/')
+
+        response = self.client.get('/api/stats/cache/')
+        self.assertEqual(response.status_code, 200)
+        contadores = response.data['entradas']['inventory_stats']['compartido']
+        self.assertEqual(contadores, {'hits': 2, 'misses': 1})
+
+        operador = User.objects.create_user(username='operador_cache', password='test123', role='OPERADOR')
+        self.client.force_authenticate(operador)
+        response = self.client.get('/api/stats/cache/')
+        self.assertEqual(response.status_code, 403)
+
+
+class InventorySummaryTestCase(DeviceTestMixin, TestCase):
+    """Tests del resumen de inventario mantenido por deltas."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.other_branch = Branch.objects.create(nombre='Sucursal Dos', codigo='DEV-02')
+        self.laptop = self.create_device('SUM-001')
+        self.phone = self.create_device('SUM-002', tipo_equipo='TELEFONO')
+
+    def total(self, **filtros):
+        return sum(InventorySummary.objects.filter(**filtros).values_list('total', flat=True))
+
+    def test_deltas_mantienen_el_resumen_consistente(self):
+        self.assertEqual(self.total(sucursal=self.branch, activo=True), 2)
+
+        self.assign(self.laptop)
+        self.laptop.refresh_from_db()
+        self.assertEqual(self.total(tipo_equipo='LAPTOP', estado='ASIGNADO'), 1)
+        self.assertEqual(self.total(tipo_equipo='LAPTOP', estado='DISPONIBLE'), 0)
+
+        self.phone.sucursal = self.other_branch
+        self.phone.save(update_fields=['sucursal'])
+        self.assertEqual(self.total(sucursal=self.other_branch), 1)
+
+        self.phone.change_status('BAJA')
+        self.assertEqual(self.total(estado='BAJA', activo=False), 1)
+
+        # Instancia no cargada desde la base de datos
+        Device(pk=self.laptop.pk, **{
+            campo: getattr(self.laptop, campo)
+            for campo in ['tipo_equipo', 'marca', 'numero_serie', 'sucursal_id', 'fecha_ingreso', 'created_by_id', 'created_at']
+        }, estado='MANTENIMIENTO').save()
+        self.assertEqual(self.total(tipo_equipo='LAPTOP', estado='MANTENIMIENTO'), 1)
+
+        self.assertEqual(summary.diferencias_resumen(), [])
+
+        Device.objects.filter(pk=self.phone.pk).delete()
+        self.assertEqual(self.total(tipo_equipo='TELEFONO'), 0)
+        self.assertEqual(summary.diferencias_resumen(), [])
+
+    def test_endpoints_leen_el_resumen(self):
+        self.assign(self.laptop)
+
+        response = self.client.get('/api/devices/inventory-stats/')
+        self.assertEqual(response.data['laptops'], {'total': 1, 'asignados': 1, 'disponibles': 0, 'mantenimiento': 0})
+        self.assertEqual(response.data['telefonos']['disponibles'], 1)
+
+        response = self.client.get('/api/stats/dashboard/')
+        self.assertEqual(response.data['summary']['total_devices'], 2)
+        self.assertEqual(response.data['summary']['available_devices'], 1)
+        self.assertEqual(response.data['devices_by_type'], {'LAPTOP': 1, 'TELEFONO': 1})
+        self.assertEqual(response.data['devices_by_branch'], [
+            {'sucursal__nombre': 'Sucursal Test', 'sucursal__codigo': 'DEV-01', 'total': 2}
+        ])
+
+        response = self.client.get('/api/branches/')
+        por_codigo = {item['codigo']: item for item in response.data['results']}
+        self.assertEqual(por_codigo['DEV-01']['total_dispositivos'], 2)
+        self.assertEqual(por_codigo['DEV-01']['dispositivos_por_tipo']['TELEFONO'], 1)
+        self.assertEqual(por_codigo['DEV-02']['total_dispositivos'], 0)
+
+    def test_comando_detecta_y_repara_diferencias(self):
+        Device.objects.filter(pk=self.laptop.pk).update(estado='MANTENIMIENTO')
+
+        out = StringIO()
+        call_command('rebuild_inventory_summary', '--check', stdout=out)
+        self.assertIn('Combinaciones con diferencias: 2', out.getvalue())
+        self.assertEqual(len(summary.diferencias_resumen()), 2)
+
+        call_command('rebuild_inventory_summary', stdout=StringIO())
+        self.assertEqual(summary.diferencias_resumen(), [])
+        self.assertEqual(self.total(estado='MANTENIMIENTO'), 1)
+
+
+class FullTextSearchTestCase(DeviceTestMixin, TestCase):
+    """Tests de la búsqueda de texto completo (FTS5 en SQLite)."""
+
+    def setUp(self):
+        super().setUp()
+        self.employee.nombre_completo = 'José Pérez González'
+        self.employee.save()
+        self.thinkpad = self.create_device('PF-3XK9', marca='Lenovo', modelo='ThinkPad T14')
+        self.thinkpad_x1 = self.create_device('PF-4ZZ1', marca='Lenovo', modelo='ThinkPad X1 ThinkPad')
+        self.elitebook = self.create_device('CND-123', marca='HP', modelo='EliteBook 840')
+
+    def search_ids(self, url, term, **params):
+        response = self.client.get(url, {'search': term, **params})
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.data['results']]
+
+    def test_busqueda_por_prefijo_y_relevancia(self):
+        ids = self.search_ids('/api/devices/', 'thinkpad')
+        self.assertEqual(ids, [self.thinkpad_x1.id, self.thinkpad.id])
+
+        ids = self.search_ids('/api/devices/', 'thinkpad', ordering='fecha_ingreso')
+        self.assertEqual(set(ids), {self.thinkpad.id, self.thinkpad_x1.id})
+
+        self.assertEqual(self.search_ids('/api/devices/', 'lenovo t14'), [self.thinkpad.id])
+        self.assertEqual(self.search_ids('/api/devices/', 'pf-3x'), [self.thinkpad.id])
+        self.assertEqual(self.search_ids('/api/devices/', 'PF3X'), [self.thinkpad.id])
+        self.assertEqual(self.search_ids('/api/devices/', 'macbook'), [])
+
+    def test_busqueda_por_subcadena(self):
+        probook = self.create_device('ABC123456', marca='HP', modelo='ProBook 450')
+
+        self.assertEqual(self.search_ids('/api/devices/', '3456'), [probook.id])
+        self.assertEqual(self.search_ids('/api/devices/', '123456'), [probook.id])
+        self.assertEqual(set(self.search_ids('/api/devices/', 'book')), {probook.id, self.elitebook.id})
+        self.assertEqual(self.search_ids('/api/devices/', 'robo'), [probook.id])
+        self.assertEqual(self.search_ids('/api/devices/', '56'), [probook.id])
+        self.assertEqual(self.search_ids('/api/employees/', 'onzá'), [self.employee.id])
+
+        # Las subcadenas también se buscan desde los modelos relacionados
+        assignment = self.assign(probook)
+        url = '/api/assignments/assignments/'
+        self.assertEqual(self.search_ids(url, 'c12345'), [assignment.id])
+
+    def test_sin_acentos_y_rut_compacto(self):
+        ids = self.search_ids('/api/employees/', 'jose perez')
+        self.assertEqual(ids, [self.employee.id])
+        self.assertEqual(self.search_ids('/api/employees/', 'PÉREZ'), [self.employee.id])
+        self.assertEqual(self.search_ids('/api/employees/', '1234567'), [self.employee.id])
+        self.assertEqual(self.search_ids('/api/employees/', '12.345.678-5'), [self.employee.id])
+
+    def test_busqueda_en_modelos_relacionados(self):
+        assignment = self.assign(self.elitebook)
+        url = '/api/assignments/assignments/'
+
+        self.assertEqual(self.search_ids(url, 'perez'), [assignment.id])
+        self.assertEqual(self.search_ids(url, 'cnd-123'), [assignment.id])
+        self.assertEqual(self.search_ids(url, 'perez elitebook'), [assignment.id])
+        self.assertEqual(self.search_ids(url, 'perez thinkpad'), [])
+
+        # Los triggers mantienen el índice al actualizar
+        self.elitebook.numero_serie = 'NUEVA-SERIE-9'
+        self.elitebook.save()
+        self.assertEqual(self.search_ids(url, 'cnd-123'), [])
+        self.assertEqual(self.search_ids(url, 'nueva serie'), [assignment.id])
+
+
+class CursorPaginationTestCase(DeviceTestMixin, TestCase):
+    """Tests de la paginación por cursor (keyset) y los modos de conteo."""
+
+    def setUp(self):
+        super().setUp()
+        hoy = date.today()
+        self.assignments = []
+        for i in range(7):
+            device = self.create_device(f'CUR-{i:03d}', fecha_ingreso=hoy - timedelta(days=i // 3))
+            self.assignments.append(self.assign(device, fecha_entrega=hoy - timedelta(days=i // 3)))
+
+    def ids(self, response):
+        return [item['id'] for item in response.data['results']]
+
+    def test_recorrido_con_empates(self):
+        url = '/api/assignments/assignments/'
+        esperado = [
+            a.id for a in sorted(self.assignments, key=lambda a: (a.fecha_entrega, a.id), reverse=True)
+        ]
+
+        response = self.client.get(url, {'cursor': '', 'page_size': 3})
+        self.assertIsNone(response.data['count'])
+        self.assertIsNone(response.data['previous'])
+        vistos = self.ids(response)
+        paginas = [self.ids(response)]
+
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            paginas.append(self.ids(response))
+            vistos += self.ids(response)
+
+        self.assertEqual(vistos, esperado)
+        self.assertEqual([len(p) for p in paginas], [3, 3, 1])
+
+        # Hacia atrás desde la última página
+        response = self.client.get(response.data['previous'])
+        self.assertEqual(self.ids(response), paginas[1])
+        response = self.client.get(response.data['previous'])
+        self.assertEqual(self.ids(response), paginas[0])
+        self.assertIsNone(response.data['previous'])
+
+    def test_costo_constante_por_pagina(self):
+        response = self.client.get('/api/devices/', {'cursor': '', 'page_size': 2})
+        with self.assertNumQueries(1):
+            response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_modos_de_conteo(self):
+        url = '/api/assignments/assignments/'
+
+        response = self.client.get(url, {'cursor': '', 'count': 'exact'})
+        self.assertEqual(response.data['count'], 7)
+
+        response = self.client.get(url, {'count': 'estimate', 'page_size': 5})
+        self.assertEqual(response.data['count'], 7)  # Exacto fuera de PostgreSQL
+
+        response = self.client.get(url, {'count': 'none', 'page_size': 5})
+        self.assertIsNone(response.data['count'])
+        self.assertEqual(len(response.data['results']), 5)
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNone(response.data['next'])
+        self.assertIsNotNone(response.data['previous'])
+
+    def test_cursor_invalido(self):
+        response = self.client.get('/api/employees/', {'cursor': 'no-es-un-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+class StreamingExportTestCase(DeviceTestMixin, TestCase):
+    """Tests de la exportación CSV/NDJSON en streaming de los reportes."""
+
+    def setUp(self):
+        super().setUp()
+        from django.utils import timezone
+        otra = Branch.objects.create(nombre='Otra Sucursal', codigo='DEV-02')
+        for i in range(5):
+            self.create_device(
+                f'BAJA-{i:03d}', estado='BAJA', activo=False,
+                sucursal=self.branch if i < 3 else otra, fecha_inactivacion=timezone.now()
+            )
+        self.create_device('ACTIVO-001')
+
+    def leer(self, response):
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_csv_con_filtros(self):
+        url = '/api/devices/retired-devices-report/'
+        response = self.client.get(url, {'format': 'csv', 'sucursal': self.branch.id})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('text/csv', response['Content-Type'])
+        self.assertIn('attachment;', response['Content-Disposition'])
+        self.assertEqual(response['X-Accel-Buffering'], 'yes')
+
+        lineas = self.leer(response).lstrip('\ufeff').splitlines()
+        self.assertEqual(lineas[0].split(',')[:4], ['Tipo Dispositivo', 'Marca', 'Modelo', 'Número de Serie'])
+        self.assertEqual(len(lineas), 4)
+        self.assertTrue(all(linea.startswith('Laptop,HP,ProBook,BAJA-') for linea in lineas[1:]))
+
+    def test_ndjson_consultas_constantes(self):
+        import json
+        url = '/api/devices/retired-devices-report/'
+
+        with self.assertNumQueries(1):
+            filas = [json.loads(linea) for linea in self.leer(self.client.get(url, {'format': 'ndjson'})).splitlines()]
+        self.assertEqual(len(filas), 5)
+        sucursales = {fila['numero_serie']: fila['sucursal'] for fila in filas}
+        self.assertEqual(sucursales['BAJA-000'], 'Sucursal Test')
+        self.assertEqual(sucursales['BAJA-004'], 'Otra Sucursal')
+
+        for i in range(5, 25):
+            self.create_device(f'BAJA-{i:03d}', estado='BAJA', activo=False)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.leer(self.client.get(url, {'format': 'ndjson'})).splitlines()), 25)
+
+    def test_reporte_asignaciones_exige_fechas(self):
+        device = self.create_device('ASIG-001')
+        self.assign(device)
+        url = '/api/assignments/assignments/active-assignments-report/'
+
+        response = self.client.get(url, {'format': 'csv'})
+        self.assertEqual(response.status_code, 400)
+
+        hoy = date.today().isoformat()
+        response = self.client.get(url, {'format': 'csv', 'fecha_inicio': hoy, 'fecha_fin': hoy})
+        lineas = self.leer(response).splitlines()
+        self.assertEqual(len(lineas), 2)
+        self.assertIn('Empleado Test,12345678-5,Analista,Sucursal Test,Laptop,HP,ProBook,ASIG-001', lineas[1])
+
+    def test_reporte_descuentos_con_snapshot(self):
+        import json
+        robado = self.create_device('ROBO-001')
+        self.assign(robado, estado_asignacion='FINALIZADA', discount_data={'monto_total': 150000, 'numero_cuotas': 3})
+        Device.objects.filter(pk=robado.pk).update(estado='ROBO')
+        self.assign(None, estado_asignacion='FINALIZADA', discount_data={
+            'monto_total': 90000,
+            'dispositivo_snapshot': {'tipo_equipo': 'TELEFONO', 'marca': 'Samsung', 'modelo': 'A54', 'imei': '356000'},
+        })
+
+        response = self.client.get('/api/assignments/assignments/discount-reports/', {'format': 'ndjson'})
+        filas = {fila['marca']: fila for fila in map(json.loads, self.leer(response).splitlines())}
+
+        self.assertEqual(filas['HP']['numero_serie'], 'ROBO-001')
+        self.assertEqual(filas['HP']['numero_cuotas'], 3)
+        self.assertEqual(filas['Samsung']['tipo_dispositivo'], 'Teléfono Móvil')
+        self.assertEqual(filas['Samsung']['numero_serie'], '356000')
+        self.assertEqual(filas['Samsung']['monto_total'], 90000)
+
+
+class BulkDeviceTestCase(DeviceTestMixin, TestCase):
+    """Tests del alta y edición masiva de dispositivos (/api/devices/bulk/)."""
+
+    url = '/api/devices/bulk/'
+
+    def fila(self, numero_serie, **kwargs):
+        data = {
+            'tipo_equipo': 'LAPTOP',
+            'marca': 'Lenovo',
+            'modelo': 'ThinkPad T14',
+            'numero_serie': numero_serie,
+            'sucursal': self.branch.id,
+            'fecha_ingreso': date.today().isoformat(),
+            'valor_inicial': '1000000.00',
+        }
+        data.update(kwargs)
+        return data
+
+    def test_alta_masiva_con_consultas_constantes(self):
+        from apps.users.audit import AuditLog
+        otra = Branch.objects.create(nombre='Otra', codigo='DEV-02')
+        filas = [self.fila(f'LOTE-{i:04d}', sucursal=self.branch.id if i % 2 else otra.id) for i in range(200)]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, filas, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['count'], 200)
+        device = Device.objects.get(numero_serie='LOTE-0001')
+        self.assertEqual(device.created_by, self.admin_user)
+        self.assertEqual(device.valor_depreciado, Decimal('1000000.00'))
+        self.assertEqual(device.edad_dispositivo, 0)
+        self.assertEqual(summary.diferencias_resumen(), [])
+        # Una sola entrada de auditoría para todo el lote
+        registro = AuditLog.objects.get(entity_type='DeviceBatch')
+        self.assertEqual(registro.action, 'BULK_CREATE')
+        self.assertEqual(registro.user, self.admin_user)
+        self.assertEqual(len(registro.changes['ids'][1]), 200)
+        self.assertIn(device.pk, registro.changes['ids'][1])
+        self.assertIn('numero_serie', registro.changes['campos'][1])
+        self.assertFalse(AuditLog.objects.filter(entity_type='Device').exists())
+
+        # Una query por sucursales y por campo único; el resto son INSERT por lote y el resumen
+        lecturas = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('SELECT')]
+        self.assertEqual(len([sql for sql in lecturas if 'FROM "devices_device"' in sql]), 1)  # Sin IMEI en el lote
+        self.assertLess(len(queries.captured_queries), 25)
+
+    def test_errores_por_fila_sin_guardar(self):
+        self.create_device('EXISTENTE')
+        filas = [
+            self.fila('NUEVO-1'),
+            self.fila('EXISTENTE'),
+            self.fila('REPETIDO'),
+            self.fila('REPETIDO', imei='35600000000'),
+            self.fila('NUEVO-2', modelo=''),
+            self.fila('NUEVO-3', sucursal=999),
+        ]
+
+        response = self.client.post(self.url, filas, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        errors = response.data['errors']
+        self.assertEqual(sorted(errors), [1, 2, 3, 4, 5])
+        self.assertIn('Ya existe', str(errors[1]['numero_serie']))
+        self.assertIn('repetido', str(errors[2]['numero_serie']))
+        self.assertIn('modelo', errors[4])
+        self.assertIn('sucursal', errors[5])
+        self.assertFalse(Device.objects.filter(numero_serie='NUEVO-1').exists())
+
+    def test_edicion_masiva(self):
+        otra = Branch.objects.create(nombre='Otra', codigo='DEV-02')
+        devices = [self.create_device(f'EDIT-{i}') for i in range(3)]
+        self.create_device('OCUPADO')
+
+        response = self.client.patch(self.url, [
+            {'id': devices[0].id, 'sucursal': otra.id},
+            {'id': devices[1].id, 'numero_serie': 'EDIT-1', 'marca': 'Dell'},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        devices[0].refresh_from_db()
+        devices[1].refresh_from_db()
+        self.assertEqual(devices[0].sucursal, otra)
+        self.assertEqual(devices[1].marca, 'Dell')
+        self.assertEqual(summary.diferencias_resumen(), [])
+
+        # Una sola entrada con los dispositivos y campos modificados
+        from apps.users.audit import AuditLog
+        registro = AuditLog.objects.get(action='BULK_UPDATE')
+        self.assertEqual(registro.entity_type, 'DeviceBatch')
+        self.assertEqual(registro.changes['ids'], [None, [devices[0].id, devices[1].id]])
+        self.assertIn('sucursal', registro.changes['campos'][1])
+        self.assertIn('marca', registro.changes['campos'][1])
+        self.assertNotIn('numero_serie', registro.changes['campos'][1])
+
+        response = self.client.patch(self.url, [
+            {'id': devices[2].id, 'numero_serie': 'OCUPADO'},
+            {'id': 99999, 'marca': 'HP'},
+        ], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(sorted(response.data['errors']), [0, 1])
+
+
+class BulkTransitionTestCase(DeviceTestMixin, TestCase):
+    """Tests de las transiciones de estado masivas (/api/devices/bulk-transition/)."""
+
+    url = '/api/devices/bulk-transition/'
+
+    def setUp(self):
+        super().setUp()
+        self.disponibles = [self.create_device(f'TR-{i}', modelo='Línea Vieja') for i in range(4)]
+        self.asignado = self.create_device('TR-ASIG', modelo='Línea Vieja')
+        self.asignacion = self.assign(self.asignado, observaciones='Entrega inicial')
+        self.baja = self.create_device('TR-BAJA', modelo='Línea Vieja', estado='BAJA', activo=False)
+        self.otro = self.create_device('TR-OTRO', modelo='Otra Línea')
+
+    def test_dry_run_no_modifica(self):
+        from apps.users.audit import AuditLog
+        auditoria = AuditLog.objects.count()
+
+        response = self.client.post(self.url, {
+            'accion': 'retire', 'motivo': 'Obsoleto', 'dry_run': True,
+            'filtros': {'marca': 'HP'}, 'ids': [d.id for d in self.disponibles] + [self.asignado.id, self.baja.id],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['aplicables'], 5)
+        self.assertEqual(response.data['por_estado'], {'DISPONIBLE': 4, 'ASIGNADO': 1})
+        self.assertEqual(response.data['asignaciones_finalizadas'], 1)
+        self.assertEqual(response.data['rechazados_detalle'][0]['id'], self.baja.id)
+        self.assertEqual(Device.objects.filter(estado='BAJA').count(), 1)
+        self.assertEqual(AuditLog.objects.count(), auditoria)
+
+    def test_baja_masiva(self):
+        from apps.users.audit import AuditLog
+        ids = [d.id for d in self.disponibles] + [self.asignado.id, self.baja.id]
+
+        with self.assertNumQueries(12):
+            response = self.client.post(self.url, {'accion': 'retire', 'motivo': 'Obsoleto', 'ids': ids}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['actualizados'], 5)
+        self.assertEqual(response.data['rechazados'], 1)
+
+        self.asignado.refresh_from_db()
+        self.asignacion.refresh_from_db()
+        self.assertEqual(self.asignado.estado, 'BAJA')
+        self.assertFalse(self.asignado.activo)
+        self.assertIsNotNone(self.asignado.fecha_inactivacion)
+        self.assertIsNone(self.asignado.asignacion_actual_id)
+        self.assertEqual(self.asignacion.estado_asignacion, 'FINALIZADA')
+        self.assertTrue(self.asignacion.observaciones.startswith('Entrega inicial\n['))
+        self.assertIn('Motivo: Obsoleto', self.asignacion.observaciones)
+
+        self.assertEqual(AuditLog.objects.filter(changes__bulk=[None, True]).count(), 5)
+        self.assertEqual(summary.diferencias_resumen(), [])
+
+    def test_reglas_por_accion(self):
+        response = self.client.post(self.url, {'accion': 'available', 'ids': [self.disponibles[0].id]}, format='json')
+        self.assertEqual(response.data['aplicables'], 0)
+
+        response = self.client.post(self.url, {
+            'accion': 'maintenance', 'motivo': 'Revisión', 'filtros': {'estado': 'ASIGNADO'}
+        }, format='json')
+        self.assertEqual(response.data['actualizados'], 1)
+
+        response = self.client.post(self.url, {'accion': 'available', 'ids': [self.asignado.id]}, format='json')
+        self.assertEqual(response.data['rechazados_detalle'][0]['motivo'], 'El dispositivo tiene una asignación activa')
+
+        response = self.client.post(self.url, {'accion': 'return_from_maintenance', 'ids': [self.asignado.id]}, format='json')
+        self.assertEqual(response.data['actualizados'], 1)
+        self.asignado.refresh_from_db()
+        self.assertEqual(self.asignado.estado, 'ASIGNADO')
+
+    def test_validaciones(self):
+        self.assertEqual(self.client.post(self.url, {'accion': 'retire', 'ids': [1]}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(self.url, {'accion': 'otra', 'ids': [1]}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(self.url, {'accion': 'available'}, format='json').status_code, 400)
+
+
+class DeviceStateMachineTestCase(DeviceTestMixin, TestCase):
+    """Tests de la máquina de estados (compare-and-set) de apps/devices/transitions.py."""
+
+    def test_conflicto_con_instancia_obsoleta(self):
+        from apps.devices.transitions import ConflictoEstado
+        device = self.create_device('SM-001')
+        obsoleta = Device.objects.get(pk=device.pk)
+
+        self.assertTrue(device.change_status('MANTENIMIENTO', user=self.admin_user))
+        with self.assertRaises(ConflictoEstado):
+            obsoleta.change_status('BAJA', user=self.admin_user)
+
+        obsoleta.refresh_from_db()
+        self.assertEqual(obsoleta.estado, 'MANTENIMIENTO')
+        self.assertTrue(obsoleta.activo)
+        self.assertEqual(summary.diferencias_resumen(), [])
+
+    def test_solo_escribe_columnas_de_estado(self):
+        from apps.users.audit import AuditLog
+        device = self.create_device('SM-002')
+        Device.objects.filter(pk=device.pk).update(marca='Dell')
+        auditoria = AuditLog.objects.count()
+
+        device.change_status('BAJA', user=self.admin_user)
+
+        device.refresh_from_db()
+        self.assertEqual(device.marca, 'Dell')
+        self.assertEqual(device.estado, 'BAJA')
+        self.assertFalse(device.activo)
+        self.assertIsNotNone(device.fecha_inactivacion)
+        self.assertEqual(AuditLog.objects.count(), auditoria + 1)
+        self.assertEqual(summary.diferencias_resumen(), [])
+
+    def test_transiciones_no_permitidas(self):
+        from django.core.exceptions import ValidationError
+        device = self.create_device('SM-003')
+        device.change_status('ROBO')
+
+        with self.assertRaises(ValidationError):
+            device.change_status('DISPONIBLE')
+        self.assertFalse(device.change_status('ROBO'))
+
+
+class DeviceStateConcurrencyTestCase(DeviceTestMixin, TransactionTestCase):
+    """Muchos hilos intentan dar de baja el mismo dispositivo: solo uno debe lograrlo."""
+
+    HILOS = 8
+    REINTENTOS = 50  # Por hilo, mientras SQLite está bloqueado por otro
+    TIMEOUT = 30  # Segundos de espera por hilo
+
+    def test_baja_concurrente(self):
+        import threading
+        import time
+        from django.db import OperationalError, connection as conexion
+        from apps.devices.transitions import ConflictoEstado
+        from apps.users.audit import AuditLog
+
+        device = self.create_device('CONC-001')
+        auditoria = AuditLog.objects.count()
+        barrera = threading.Barrier(self.HILOS, timeout=self.TIMEOUT)
+        resultados = []
+        errores = []
+
+        def dar_de_baja():
+            try:
+                instancia = Device.objects.get(pk=device.pk)
+                barrera.wait()
+                for intento in range(self.REINTENTOS):
+                    try:
+                        instancia.change_status('BAJA', user=self.admin_user)
+                        resultados.append('ok')
+                        break
+                    except ConflictoEstado:
+                        resultados.append('conflicto')
+                        break
+                    except OperationalError:
+                        # SQLite bloqueado por otro hilo: reintentar hasta REINTENTOS veces
+                        if intento == self.REINTENTOS - 1:
+                            raise
+                        time.sleep(0.05)
+            except Exception as exc:
+                errores.append(exc)
+            finally:
+                conexion.close()
+
+        hilos = [threading.Thread(target=dar_de_baja) for _ in range(self.HILOS)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join(self.TIMEOUT)
+        self.assertFalse([hilo for hilo in hilos if hilo.is_alive()], 'Hilos sin terminar')
+        self.assertEqual(errores, [])
+
+        self.assertEqual(resultados.count('ok'), 1)
+        self.assertEqual(resultados.count('conflicto'), self.HILOS - 1)
+        self.assertEqual(AuditLog.objects.count(), auditoria + 1)
+        self.assertEqual(summary.diferencias_resumen(), [])
+
+
+class DeviceSingleWriteTestCase(DeviceTestMixin, TestCase):
+    """El alta y la edición por API escriben el dispositivo una sola vez."""
+
+    def escrituras(self, queries, sentencia):
+        return sum(q['sql'].startswith(sentencia) for q in queries.captured_queries)
+
+    def test_alta_con_una_escritura(self):
+        from apps.users.audit import AuditLog
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/devices/', {
+                'tipo_equipo': 'LAPTOP', 'marca': 'HP', 'modelo': 'ProBook', 'numero_serie': 'SW-001',
+                'sucursal': self.branch.id, 'fecha_ingreso': (date.today() - timedelta(days=800)).isoformat(),
+                'valor_inicial': '1000000.00',
+            }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.escrituras(queries, 'INSERT INTO "devices_device"'), 1)
+        self.assertEqual(self.escrituras(queries, 'UPDATE "devices_device"'), 0)
+        self.assertEqual(AuditLog.objects.filter(entity_type='Device', entity_id=response.data['id']).count(), 1)
+
+        device = Device.objects.get(pk=response.data['id'])
+        self.assertEqual(device.edad_dispositivo, 2)
+        self.assertEqual(device.valor_depreciado, Decimal('600000.00'))
+
+    def test_edicion_con_una_escritura(self):
+        from apps.users.audit import AuditLog
+        device = self.create_device('SW-002', valor_inicial=Decimal('500000'))
+        auditoria = AuditLog.objects.count()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(f'/api/devices/{device.id}/', {
+                'fecha_ingreso': (date.today() - timedelta(days=400)).isoformat()
+            }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.escrituras(queries, 'INSERT INTO "devices_device"'), 0)
+        self.assertEqual(self.escrituras(queries, 'UPDATE "devices_device"'), 1)
+        self.assertEqual(AuditLog.objects.count(), auditoria + 1)
+
+        device.refresh_from_db()
+        self.assertEqual(device.edad_dispositivo, 1)
+        self.assertEqual(device.valor_depreciado, Decimal('400000.00'))
+        self.assertFalse(device.es_valor_manual)
+
+        response = self.client.patch(f'/api/devices/{device.id}/', {'valor_depreciado': '100000.00'}, format='json')
+        device.refresh_from_db()
+        self.assertTrue(device.es_valor_manual)
+        self.assertEqual(device.valor_depreciado, Decimal('100000.00'))
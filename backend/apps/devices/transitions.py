@@ -0,0 +1,298 @@
+"""
+Máquina de estados de dispositivos.
+
+- TRANSICIONES declara qué estados de destino se permiten desde cada estado.
+- aplicar_transicion() es el motor común: cambia el estado con un UPDATE condicional
+  (compare-and-set) WHERE id IN (...) AND estado = <estado leído>, que solo escribe las
+  columnas de estado. Si alguna fila cambió desde que se leyó, lanza ConflictoEstado
+  (HTTP 409) y revierte la transacción, en lugar de sobrescribir el cambio concurrente.
+- cambiar_estado() aplica el motor a un dispositivo (usado por Device.change_status()).
+- transicion_masiva() lo aplica a muchos dispositivos con las mismas reglas que los
+  endpoints send-to-maintenance, mark-available, return-from-maintenance y mark-as-retired,
+  con vista previa (dry_run).
+
+Como los UPDATE no disparan señales, el motor registra la auditoría (por lotes, una
+entrada por dispositivo), actualiza InventorySummary por deltas e invalida el caché.
+"""
+from collections import Counter, defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, F, Q, TextField, Value, When
+from django.db.models.functions import Coalesce, Concat
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+# Estados de destino permitidos desde cada estado. BAJA y ROBO son finales.
+TRANSICIONES = {
+    'DISPONIBLE': ('ASIGNADO', 'MANTENIMIENTO', 'BAJA', 'ROBO'),
+    'ASIGNADO': ('DISPONIBLE', 'MANTENIMIENTO', 'BAJA', 'ROBO'),
+    'MANTENIMIENTO': ('DISPONIBLE', 'ASIGNADO', 'BAJA', 'ROBO'),
+    'BAJA': (),
+    'ROBO': (),
+}
+
+# Acciones de transicion_masiva(): destino, estados de origen y reglas sobre la asignación activa
+ACCIONES = {
+    'maintenance': {
+        'destino': 'MANTENIMIENTO',
+        'origenes': ['DISPONIBLE', 'ASIGNADO'],
+        'requiere_motivo': True,
+    },
+    'available': {
+        'destino': 'DISPONIBLE',
+        'origenes': ['MANTENIMIENTO'],
+        'sin_asignacion': True,
+    },
+    'return_from_maintenance': {
+        'destino': 'ASIGNADO',
+        'origenes': ['MANTENIMIENTO'],
+        'con_asignacion': True,
+    },
+    'retire': {
+        'destino': 'BAJA',
+        'origenes': ['DISPONIBLE', 'ASIGNADO', 'MANTENIMIENTO'],
+        'requiere_motivo': True,
+        'finaliza_asignacion': True,
+    },
+}
+
+# Máximo de rechazados detallados en la respuesta
+MAX_RECHAZADOS_DETALLE = 100
+
+# Campos leídos de cada dispositivo (attname): estado esperado, clave de inventario y auditoría
+CAMPOS_LECTURA = (
+    'id', 'estado', 'asignacion_actual_id', 'sucursal_id', 'tipo_equipo', 'activo',
+    'fecha_inactivacion',
+)
+
+
+class ConflictoEstado(APIException):
+    """El dispositivo cambió de estado entre la lectura y la escritura."""
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'El estado del dispositivo cambió durante la operación. Recargue e intente nuevamente.'
+    default_code = 'conflict'
+
+
+def transicion_permitida(origen, destino):
+    return destino in TRANSICIONES.get(origen, ())
+
+
+def _motivo_rechazo(regla, fila):
+    """Retorna el motivo por el que la acción no aplica a `fila`, o None si aplica."""
+    from .models import Device
+
+    if fila['estado'] in Device.FINAL_STATES:
+        return f'El dispositivo ya está en un estado final: {fila["estado"]}'
+    if fila['estado'] == regla['destino']:
+        return f'El dispositivo ya está en {regla["destino"]}'
+    if fila['estado'] not in regla['origenes'] or not transicion_permitida(fila['estado'], regla['destino']):
+        return f'Transición {fila["estado"]} → {regla["destino"]} no permitida'
+    if regla.get('sin_asignacion') and fila['asignacion_actual_id']:
+        return 'El dispositivo tiene una asignación activa'
+    if regla.get('con_asignacion') and not fila['asignacion_actual_id']:
+        return 'El dispositivo no tiene asignación activa'
+    return None
+
+
+def _id(valor):
+    """ID de una instancia o valor de FK ya expresado como ID."""
+    return getattr(valor, 'pk', valor)
+
+
+def aplicar_transicion(filas, destino, user=None, motivo='', observacion_asignacion=None, auditoria_extra=None,
+                       cambios_extra=None):
+    """
+    Motor de transiciones: pasa los dispositivos de `filas` al estado `destino`.
+
+    Args:
+        filas: Dicts con CAMPOS_LECTURA; 'estado' es el estado esperado en la base de datos
+        destino: Estado de destino
+        user: Usuario para la auditoría (sin usuario no se registra)
+        motivo: Motivo, agregado a la auditoría
+        observacion_asignacion: Si se indica, finaliza las asignaciones activas de los
+            dispositivos agregando esta observación
+        auditoria_extra: Pares adicionales para cada entrada de auditoría (ej: {'bulk': [None, True]})
+        cambios_extra: Columnas adicionales escritas en el mismo UPDATE (ej: asignacion_actual)
+
+    Returns:
+        datetime: Momento de la transición (usado como updated_at y fecha_inactivacion)
+
+    Raises:
+        ValidationError: Si alguna transición no está permitida por TRANSICIONES
+        ConflictoEstado: Si algún dispositivo ya no estaba en el estado esperado
+    """
+    from apps.assignments.models import Assignment
+    from apps.users.audit import AuditLog
+    from apps.users.audit_buffer import registrar_lote
+    from .cache import invalidar_inventario
+    from .models import Device
+    from . import summary
+
+    final = destino in Device.FINAL_STATES
+    ahora = timezone.now()
+
+    for fila in filas:
+        if not transicion_permitida(fila['estado'], destino):
+            if fila['estado'] in Device.FINAL_STATES:
+                raise ValidationError(
+                    f'No se puede cambiar el estado de un dispositivo en {fila["estado"]}. '
+                    f'Este es un estado final y no puede ser modificado.'
+                )
+            raise ValidationError(f'Transición {fila["estado"]} → {destino} no permitida.')
+
+    with transaction.atomic():
+        # 1. Finalizar asignaciones activas
+        asignaciones = [fila['asignacion_actual_id'] for fila in filas if fila['asignacion_actual_id']]
+        if observacion_asignacion is not None and asignaciones:
+            Assignment.objects.filter(pk__in=asignaciones, estado_asignacion='ACTIVA').update(
+                estado_asignacion='FINALIZADA',
+                observaciones=Case(
+                    When(Q(observaciones__isnull=True) | Q(observaciones=''), then=Value(observacion_asignacion)),
+                    default=Concat(F('observaciones'), Value(f'\n{observacion_asignacion}'), output_field=TextField()),
+                    output_field=TextField(),
+                ),
+                updated_at=ahora,
+            )
+
+        # 2. Compare-and-set: un UPDATE condicional por estado de origen
+        cambios = {'estado': destino, 'updated_at': ahora}
+        if final:
+            cambios.update(activo=False, fecha_inactivacion=Coalesce(F('fecha_inactivacion'), Value(ahora)))
+        if observacion_asignacion is not None:
+            cambios['asignacion_actual'] = None
+        cambios.update(cambios_extra or {})
+
+        ids_por_estado = defaultdict(list)
+        for fila in filas:
+            ids_por_estado[fila['estado']].append(fila['id'])
+        for origen, ids in ids_por_estado.items():
+            if Device.objects.filter(pk__in=ids, estado=origen).update(**cambios) != len(ids):
+                raise ConflictoEstado()
+
+        # 3. Resumen de inventario y caché
+        deltas = Counter()
+        for fila in filas:
+            anterior = tuple(fila[campo] for campo in summary.CAMPOS_CLAVE)
+            nueva = (fila['sucursal_id'], fila['tipo_equipo'], destino, fila['activo'] and not final)
+            deltas.update(summary.deltas_cambio(anterior, nueva))
+        summary.aplicar_deltas(deltas)
+        invalidar_inventario()
+
+        # 4. Auditoría: una entrada por dispositivo con los campos modificados
+        if user:
+            registros = []
+            for fila in filas:
+                changes = {'estado': [fila['estado'], destino]}
+                if motivo:
+                    changes['motivo'] = [None, motivo]
+                if final:
+                    if fila['activo']:
+                        changes['activo'] = [True, False]
+                    if not fila['fecha_inactivacion']:
+                        changes['fecha_inactivacion'] = [None, ahora.isoformat()]
+                if 'asignacion_actual' in cambios and fila['asignacion_actual_id'] != _id(cambios['asignacion_actual']):
+                    changes['asignacion_actual'] = [fila['asignacion_actual_id'], _id(cambios['asignacion_actual'])]
+                changes.update(auditoria_extra or {})
+                registros.append(AuditLog(
+                    user=user, action='UPDATE', entity_type='Device', entity_id=fila['id'], changes=changes
+                ))
+            registrar_lote(registros)
+
+    return ahora
+
+
+def cambiar_estado(device, destino, user=None, motivo='', cambios_extra=None):
+    """
+    Cambia el estado de un dispositivo con aplicar_transicion(), usando como estado
+    esperado el de la instancia. Actualiza la instancia en memoria, incluidas las
+    columnas de `cambios_extra`.
+
+    Returns:
+        bool: False si el dispositivo ya estaba en `destino`, True si cambió
+    """
+    from . import summary
+
+    if device.estado == destino:
+        return False
+
+    fila = {campo: getattr(device, campo) for campo in CAMPOS_LECTURA}
+    ahora = aplicar_transicion([fila], destino, user=user, motivo=motivo, cambios_extra=cambios_extra)
+
+    for campo, valor in (cambios_extra or {}).items():
+        setattr(device, campo, valor)
+    device.estado = destino
+    device.updated_at = ahora
+    if destino in device.FINAL_STATES:
+        device.activo = False
+        device.fecha_inactivacion = device.fecha_inactivacion or ahora
+    # La instancia ya refleja la base de datos: un save() posterior no debe volver a aplicar
+    # el delta ni registrar estas columnas en la auditoría
+    device._inventario_original = summary.clave_inventario(device)
+    device.guardar_valores_originales(['estado', 'updated_at', 'activo', 'fecha_inactivacion', *(cambios_extra or {})])
+    return True
+
+
+def transicion_masiva(queryset, accion, user, motivo='', dry_run=False):
+    """
+    Aplica `accion` (ver ACCIONES) a los dispositivos de `queryset`.
+
+    Args:
+        queryset: Dispositivos seleccionados (por IDs o filtros)
+        accion: Clave de ACCIONES
+        user: Usuario que realiza la operación (auditoría)
+        motivo: Motivo de la operación (obligatorio en maintenance y retire)
+        dry_run: Solo calcular la vista previa
+
+    Returns:
+        dict: accion, destino, total, aplicables, por_estado, asignaciones_finalizadas,
+              rechazados (cantidad), rechazados_detalle y, si no es dry_run, actualizados
+    """
+    regla = ACCIONES[accion]
+    destino = regla['destino']
+
+    with transaction.atomic():
+        filas = queryset.order_by('pk')
+        if not dry_run:
+            filas = filas.select_for_update(of=('self',))
+        filas = list(filas.values(*CAMPOS_LECTURA))
+
+        aplicables = []
+        rechazados = []
+        for fila in filas:
+            motivo_rechazo = _motivo_rechazo(regla, fila)
+            if motivo_rechazo:
+                rechazados.append({'id': fila['id'], 'estado': fila['estado'], 'motivo': motivo_rechazo})
+            else:
+                aplicables.append(fila)
+
+        resultado = {
+            'accion': accion,
+            'destino': destino,
+            'total': len(filas),
+            'aplicables': len(aplicables),
+            'por_estado': dict(Counter(fila['estado'] for fila in aplicables)),
+            'asignaciones_finalizadas': sum(
+                1 for fila in aplicables if regla.get('finaliza_asignacion') and fila['asignacion_actual_id']
+            ),
+            'rechazados': len(rechazados),
+            'rechazados_detalle': rechazados[:MAX_RECHAZADOS_DETALLE],
+            'dry_run': dry_run,
+        }
+        if dry_run or not aplicables:
+            return resultado
+
+        # Mismo texto de observación que mark-as-retired
+        observacion = None
+        if regla.get('finaliza_asignacion'):
+            observacion = f"[{timezone.now().strftime('%Y-%m-%d')}] Dispositivo dado de baja. Motivo: {motivo}"
+
+        aplicar_transicion(
+            aplicables, destino, user=user, motivo=motivo,
+            observacion_asignacion=observacion, auditoria_extra={'bulk': [None, True]}
+        )
+
+    resultado['actualizados'] = len(aplicables)
+    return resultado
@@ -2,9 +2,13 @@ from rest_framework import viewsets, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Count, Q
+from config.exports import EXPORT_FORMATS, EXPORT_RENDERERS, stream_export
+from config.search import FullTextSearchFilter
+from django.db.models import Count, Q, Sum
 from .models import Device
 from .serializers import DeviceSerializer, DeviceListSerializer
+from .filters import DeviceFilter
+from apps.users.permissions import IsAdmin
 
 
 class DeviceViewSet(viewsets.ModelViewSet):
@@ -14,11 +18,12 @@ class DeviceViewSet(viewsets.ModelViewSet):
     OPTIMIZADO: Usa DeviceListSerializer para listados y DeviceSerializer para detalle.
     """
     serializer_class = DeviceSerializer  # Por defecto (detail, create, update)
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['tipo_equipo', 'estado', 'sucursal', 'marca']
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
+    filterset_class = DeviceFilter
     search_fields = ['numero_serie', 'imei', 'marca', 'modelo', 'numero_telefono', 'numero_factura']
-    ordering_fields = ['marca', 'modelo', 'fecha_ingreso', 'created_at']
+    ordering_fields = ['marca', 'modelo', 'fecha_ingreso', 'created_at', 'valor_depreciado_calculado', 'edad_anios']
     ordering = ['-fecha_ingreso']
+    cursor_ordering = ('-fecha_ingreso', '-id')  # Paginación ?cursor= (ver config/pagination.py)
 
     # Desactivar método DELETE - los dispositivos se marcan como inactivos, no se eliminan
     http_method_names = ['get', 'post', 'put', 'patch', 'head', 'options']
@@ -27,8 +32,10 @@ class DeviceViewSet(viewsets.ModelViewSet):
         """
         Retorna queryset filtrando dispositivos inactivos por defecto.
         Parámetro ?incluir_inactivos=true para incluirlos.
+        Incluye valor_depreciado_calculado y edad_anios calculados en SQL
+        para permitir ordenar y filtrar por ellos.
         """
-        queryset = Device.objects.select_related('sucursal', 'created_by')
+        queryset = Device.objects.con_depreciacion().select_related('sucursal', 'created_by')
 
         incluir_inactivos = self.request.query_params.get('incluir_inactivos', 'false').lower()
 
@@ -65,6 +72,112 @@ class DeviceViewSet(viewsets.ModelViewSet):
         """
         serializer.save(created_by=self.request.user)
 
+    @action(detail=False, methods=['post', 'patch'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Crea o actualiza dispositivos en lote (ej: registro de una compra).
+
+        POST /api/devices/bulk/
+        Body: [ {tipo_equipo, marca, modelo, numero_serie, sucursal, fecha_ingreso, ...}, ... ]
+
+        PATCH /api/devices/bulk/
+        Body: [ {id, ...campos a modificar}, ... ]
+
+        - Máximo BULK_MAX_DISPOSITIVOS filas por solicitud.
+        - Mismas validaciones que el alta/edición individual; la unicidad de numero_serie
+          e imei se verifica para todo el lote con una query por campo.
+        - Todo o nada: si alguna fila tiene errores responde 400 con
+          {"errors": {"<índice>": {...}}} y no guarda ninguna.
+        - Registra una sola entrada de auditoría (BULK_CREATE/BULK_UPDATE) con los IDs
+          afectados y los campos escritos.
+        """
+        from rest_framework import status
+        from .serializers import DeviceBulkSerializer, BULK_MAX_DISPOSITIVOS
+
+        kwargs = {'many': True, 'max_length': BULK_MAX_DISPOSITIVOS, 'context': self.get_serializer_context()}
+        if request.method == 'POST':
+            serializer = DeviceBulkSerializer(data=request.data, **kwargs)
+        else:
+            serializer = DeviceBulkSerializer(self.get_queryset(), data=request.data, partial=True, **kwargs)
+
+        if not serializer.is_valid():
+            return Response(
+                {
+                    'error': 'El lote tiene errores. No se guardó ningún dispositivo.',
+                    'errors': serializer.errors
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if request.method == 'POST':
+            devices = serializer.save(created_by=request.user)
+            mensaje = f'{len(devices)} dispositivos creados'
+            codigo = status.HTTP_201_CREATED
+        else:
+            devices = serializer.save()
+            mensaje = f'{len(devices)} dispositivos actualizados'
+            codigo = status.HTTP_200_OK
+
+        return Response({
+            'message': mensaje,
+            'count': len(devices),
+            'ids': [device.pk for device in devices]
+        }, status=codigo)
+
+    @action(detail=False, methods=['post'], url_path='bulk-transition', permission_classes=[IsAdmin])
+    def bulk_transition(self, request):
+        """
+        Cambia el estado de muchos dispositivos en una transacción (solo administradores).
+
+        POST /api/devices/bulk-transition/
+        Body: {
+            accion: maintenance | available | return_from_maintenance | retire,
+            ids?: [int],            # Dispositivos por ID
+            filtros?: {...},        # O los mismos filtros del listado (tipo_equipo, marca, sucursal, ...)
+            motivo?: string,        # Obligatorio en maintenance y retire
+            dry_run?: bool          # Solo vista previa, sin modificar
+        }
+
+        Reglas iguales a los endpoints individuales (ver apps/devices/transitions.py).
+        Los dispositivos a los que no aplica la transición se informan en rechazados_detalle
+        y no se modifican; el resto se actualiza.
+        """
+        from rest_framework import status
+        from .transitions import ACCIONES, transicion_masiva
+
+        accion = request.data.get('accion')
+        ids = request.data.get('ids')
+        filtros = request.data.get('filtros')
+        motivo = (request.data.get('motivo') or '').strip()
+        dry_run = str(request.data.get('dry_run', False)).lower() in ['true', '1', 'yes']
+
+        if accion not in ACCIONES:
+            return Response(
+                {'error': f'Acción inválida. Opciones: {", ".join(ACCIONES)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if ACCIONES[accion].get('requiere_motivo') and not motivo:
+            return Response({'error': 'El motivo es obligatorio'}, status=status.HTTP_400_BAD_REQUEST)
+        if not ids and not filtros:
+            return Response(
+                {'error': 'Debe indicar ids o filtros para seleccionar los dispositivos'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = Device.objects.all()
+        if ids:
+            if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+                return Response({'error': 'ids debe ser una lista de enteros'}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(pk__in=ids)
+        if filtros:
+            filterset = DeviceFilter(data=filtros, queryset=Device.objects.con_depreciacion(), request=request)
+            if not filterset.is_valid():
+                return Response({'error': filterset.errors}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(pk__in=filterset.qs.values('pk'))
+
+        resultado = transicion_masiva(queryset, accion, request.user, motivo=motivo, dry_run=dry_run)
+        return Response(resultado, status=status.HTTP_200_OK)
+
     @action(detail=True, methods=['post'], url_path='send-to-maintenance')
     def send_to_maintenance(self, request, pk=None):
         """
@@ -297,28 +410,35 @@ class DeviceViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Si tiene asignación activa, finalizarla automáticamente
-        # (similar al comportamiento de ROBO/carta de descuento)
-        if device.has_active_assignment():
-            active_assignment = device.assignment_set.filter(estado_asignacion='ACTIVA').first()
-            if active_assignment:
-                active_assignment.estado_asignacion = 'FINALIZADA'
-
-                # Agregar observación automática sobre la baja
-                from django.utils import timezone
-                fecha_baja = timezone.now().strftime('%Y-%m-%d')
-                obs_baja = f"[{fecha_baja}] Dispositivo dado de baja. Motivo: {motivo}"
-
-                if active_assignment.observaciones:
-                    active_assignment.observaciones += f"\n{obs_baja}"
-                else:
-                    active_assignment.observaciones = obs_baja
+        # Finalizar la asignación y cambiar el estado en una transacción: si el estado
+        # cambió concurrentemente (ConflictoEstado, HTTP 409) no queda nada a medias
+        from django.db import transaction
 
-                active_assignment.save(update_fields=['estado_asignacion', 'observaciones', 'updated_at'])
-
-        # Cambiar estado con auditoría
         try:
-            device.change_status('BAJA', user=request.user)
+            with transaction.atomic():
+                # Si tiene asignación activa, finalizarla automáticamente
+                # (similar al comportamiento de ROBO/carta de descuento)
+                if device.has_active_assignment():
+                    active_assignment = device.asignacion_actual
+                    if active_assignment:
+                        # Compartir la instancia para que la señal limpie el puntero también en memoria
+                        active_assignment.dispositivo = device
+                        active_assignment.estado_asignacion = 'FINALIZADA'
+
+                        # Agregar observación automática sobre la baja
+                        from django.utils import timezone
+                        fecha_baja = timezone.now().strftime('%Y-%m-%d')
+                        obs_baja = f"[{fecha_baja}] Dispositivo dado de baja. Motivo: {motivo}"
+
+                        if active_assignment.observaciones:
+                            active_assignment.observaciones += f"\n{obs_baja}"
+                        else:
+                            active_assignment.observaciones = obs_baja
+
+                        active_assignment.save(update_fields=['estado_asignacion', 'observaciones', 'updated_at'])
+
+                # Cambiar estado con auditoría
+                device.change_status('BAJA', user=request.user)
 
             serializer = self.get_serializer(device)
             return Response({
@@ -342,49 +462,63 @@ class DeviceViewSet(viewsets.ModelViewSet):
         Retorna estadísticas agregadas calculadas en una sola query.
         Esto reemplaza el cálculo de 28 filtros en el frontend.
         Solo incluye dispositivos activos.
+
+        La respuesta se cachea hasta el próximo cambio de inventario (header X-Cache: HIT/MISS).
         """
-        stats = Device.objects.filter(activo=True).aggregate(
+        from .cache import get_or_build
+
+        data, desde_cache = get_or_build('inventory_stats', self._build_inventory_stats)
+        return Response(data, headers={'X-Cache': 'HIT' if desde_cache else 'MISS'})
+
+    def _build_inventory_stats(self):
+        """
+        Calcula las estadísticas de inventario (sin caché).
+        Lee InventorySummary, cuyo tamaño no depende de la cantidad de dispositivos.
+        """
+        from .models import InventorySummary
+
+        stats = InventorySummary.objects.filter(activo=True).aggregate(
             # Totales por tipo
-            total_laptops=Count('id', filter=Q(tipo_equipo='LAPTOP')),
-            total_desktops=Count('id', filter=Q(tipo_equipo='DESKTOP')),
-            total_telefonos=Count('id', filter=Q(tipo_equipo='TELEFONO')),
-            total_tablets=Count('id', filter=Q(tipo_equipo='TABLET')),
-            total_tvs=Count('id', filter=Q(tipo_equipo='TV')),
-            total_sims=Count('id', filter=Q(tipo_equipo='SIM')),
+            total_laptops=Sum('total', filter=Q(tipo_equipo='LAPTOP'), default=0),
+            total_desktops=Sum('total', filter=Q(tipo_equipo='DESKTOP'), default=0),
+            total_telefonos=Sum('total', filter=Q(tipo_equipo='TELEFONO'), default=0),
+            total_tablets=Sum('total', filter=Q(tipo_equipo='TABLET'), default=0),
+            total_tvs=Sum('total', filter=Q(tipo_equipo='TV'), default=0),
+            total_sims=Sum('total', filter=Q(tipo_equipo='SIM'), default=0),
 
             # Laptops por estado
-            laptops_asignados=Count('id', filter=Q(tipo_equipo='LAPTOP', estado='ASIGNADO')),
-            laptops_disponibles=Count('id', filter=Q(tipo_equipo='LAPTOP', estado='DISPONIBLE')),
-            laptops_mantenimiento=Count('id', filter=Q(tipo_equipo='LAPTOP', estado='MANTENIMIENTO')),
+            laptops_asignados=Sum('total', filter=Q(tipo_equipo='LAPTOP', estado='ASIGNADO'), default=0),
+            laptops_disponibles=Sum('total', filter=Q(tipo_equipo='LAPTOP', estado='DISPONIBLE'), default=0),
+            laptops_mantenimiento=Sum('total', filter=Q(tipo_equipo='LAPTOP', estado='MANTENIMIENTO'), default=0),
 
             # Desktops por estado
-            desktops_asignados=Count('id', filter=Q(tipo_equipo='DESKTOP', estado='ASIGNADO')),
-            desktops_disponibles=Count('id', filter=Q(tipo_equipo='DESKTOP', estado='DISPONIBLE')),
-            desktops_mantenimiento=Count('id', filter=Q(tipo_equipo='DESKTOP', estado='MANTENIMIENTO')),
+            desktops_asignados=Sum('total', filter=Q(tipo_equipo='DESKTOP', estado='ASIGNADO'), default=0),
+            desktops_disponibles=Sum('total', filter=Q(tipo_equipo='DESKTOP', estado='DISPONIBLE'), default=0),
+            desktops_mantenimiento=Sum('total', filter=Q(tipo_equipo='DESKTOP', estado='MANTENIMIENTO'), default=0),
 
             # Teléfonos por estado
-            telefonos_asignados=Count('id', filter=Q(tipo_equipo='TELEFONO', estado='ASIGNADO')),
-            telefonos_disponibles=Count('id', filter=Q(tipo_equipo='TELEFONO', estado='DISPONIBLE')),
-            telefonos_mantenimiento=Count('id', filter=Q(tipo_equipo='TELEFONO', estado='MANTENIMIENTO')),
+            telefonos_asignados=Sum('total', filter=Q(tipo_equipo='TELEFONO', estado='ASIGNADO'), default=0),
+            telefonos_disponibles=Sum('total', filter=Q(tipo_equipo='TELEFONO', estado='DISPONIBLE'), default=0),
+            telefonos_mantenimiento=Sum('total', filter=Q(tipo_equipo='TELEFONO', estado='MANTENIMIENTO'), default=0),
 
             # Tablets por estado
-            tablets_asignados=Count('id', filter=Q(tipo_equipo='TABLET', estado='ASIGNADO')),
-            tablets_disponibles=Count('id', filter=Q(tipo_equipo='TABLET', estado='DISPONIBLE')),
-            tablets_mantenimiento=Count('id', filter=Q(tipo_equipo='TABLET', estado='MANTENIMIENTO')),
+            tablets_asignados=Sum('total', filter=Q(tipo_equipo='TABLET', estado='ASIGNADO'), default=0),
+            tablets_disponibles=Sum('total', filter=Q(tipo_equipo='TABLET', estado='DISPONIBLE'), default=0),
+            tablets_mantenimiento=Sum('total', filter=Q(tipo_equipo='TABLET', estado='MANTENIMIENTO'), default=0),
 
             # TVs por estado
-            tvs_asignados=Count('id', filter=Q(tipo_equipo='TV', estado='ASIGNADO')),
-            tvs_disponibles=Count('id', filter=Q(tipo_equipo='TV', estado='DISPONIBLE')),
-            tvs_mantenimiento=Count('id', filter=Q(tipo_equipo='TV', estado='MANTENIMIENTO')),
+            tvs_asignados=Sum('total', filter=Q(tipo_equipo='TV', estado='ASIGNADO'), default=0),
+            tvs_disponibles=Sum('total', filter=Q(tipo_equipo='TV', estado='DISPONIBLE'), default=0),
+            tvs_mantenimiento=Sum('total', filter=Q(tipo_equipo='TV', estado='MANTENIMIENTO'), default=0),
 
             # SIMs por estado
-            sims_asignados=Count('id', filter=Q(tipo_equipo='SIM', estado='ASIGNADO')),
-            sims_disponibles=Count('id', filter=Q(tipo_equipo='SIM', estado='DISPONIBLE')),
-            sims_mantenimiento=Count('id', filter=Q(tipo_equipo='SIM', estado='MANTENIMIENTO')),
+            sims_asignados=Sum('total', filter=Q(tipo_equipo='SIM', estado='ASIGNADO'), default=0),
+            sims_disponibles=Sum('total', filter=Q(tipo_equipo='SIM', estado='DISPONIBLE'), default=0),
+            sims_mantenimiento=Sum('total', filter=Q(tipo_equipo='SIM', estado='MANTENIMIENTO'), default=0),
         )
 
         # Formatear respuesta de forma estructurada
-        return Response({
+        return {
             'laptops': {
                 'total': stats['total_laptops'],
                 'asignados': stats['laptops_asignados'],
@@ -421,7 +555,42 @@ class DeviceViewSet(viewsets.ModelViewSet):
                 'disponibles': stats['sims_disponibles'],
                 'mantenimiento': stats['sims_mantenimiento'],
             },
-        })
+        }
+
+    @action(detail=False, methods=['get'], url_path='age-histogram')
+    def age_histogram(self, request):
+        """
+        Histograma de dispositivos por edad, calculado en una sola query agrupada.
+
+        URL: /api/devices/age-histogram/
+
+        Acepta los mismos filtros que el listado (tipo_equipo, sucursal, estado, valor_min, ...).
+
+        Retorna por cada bucket de edad (0, 1, 2, 3, 4, 5, 5+):
+        - total de dispositivos
+        - suma de valor_inicial
+        - suma de valor depreciado calculado
+        """
+        from .depreciation import EDAD_BUCKETS
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.order_by().values('edad_anios').annotate(
+            total=Count('id'),
+            valor_inicial_total=Sum('valor_inicial'),
+            valor_depreciado_total=Sum('valor_depreciado_calculado'),
+        ).order_by('edad_anios')
+
+        por_edad = {row['edad_anios']: row for row in rows}
+
+        return Response([
+            {
+                'edad': bucket,
+                'total': por_edad.get(index, {}).get('total', 0),
+                'valor_inicial_total': por_edad.get(index, {}).get('valor_inicial_total') or 0,
+                'valor_depreciado_total': por_edad.get(index, {}).get('valor_depreciado_total') or 0,
+            }
+            for index, bucket in enumerate(EDAD_BUCKETS)
+        ])
 
     @action(detail=True, methods=['get'], url_path='history')
     def history(self, request, pk=None):
@@ -430,20 +599,17 @@ class DeviceViewSet(viewsets.ModelViewSet):
 
         URL: /api/devices/{id}/history/
 
-        Retorna todas las asignaciones (activas e históricas) del dispositivo,
-        ordenadas de más reciente a más antigua.
+        Query params:
+          - cursor: cursor de la página (links next/previous de la respuesta)
+          - page_size: filas por página (default 50)
+          - expand: empleado,dispositivo,solicitud para incluir el detalle anidado
+
+        Retorna las asignaciones (activas e históricas) del dispositivo como filas planas,
+        ordenadas de más reciente a más antigua (ver apps/assignments/history.py).
         """
-        from apps.assignments.serializers import AssignmentSerializer
+        from apps.assignments.history import historial
 
         device = self.get_object()
-        assignments = device.assignment_set.select_related(
-            'empleado',
-            'empleado__sucursal',
-            'solicitud',
-            'created_by'
-        ).prefetch_related('return').order_by('-fecha_entrega')
-
-        serializer = AssignmentSerializer(assignments, many=True)
 
         return Response({
             'device': {
@@ -455,12 +621,10 @@ class DeviceViewSet(viewsets.ModelViewSet):
                 'imei': device.imei,
                 'estado': device.estado,
             },
-            'total_assignments': assignments.count(),
-            'active_assignments': assignments.filter(estado_asignacion='ACTIVA').count(),
-            'assignments': serializer.data
+            **historial(request, self, device.assignment_set.all()),
         })
 
-    @action(detail=False, methods=['get'], url_path='retired-devices-report')
+    @action(detail=False, methods=['get'], url_path='retired-devices-report', renderer_classes=EXPORT_RENDERERS)
     def retired_devices_report(self, request):
         """
         Endpoint especializado para reportes de dispositivos dados de baja.
@@ -474,6 +638,7 @@ class DeviceViewSet(viewsets.ModelViewSet):
           - tipo_dispositivo: LAPTOP, TELEFONO, DESKTOP, TABLET, TV, SIM, ACCESORIO
           - page: número de página (default 1)
           - page_size: tamaño de página (default 20, max 1000 para exportación)
+          - format: csv | ndjson para descargar el reporte completo en streaming (sin paginar)
 
         Returns:
           - Lista paginada de dispositivos dados de baja
@@ -512,6 +677,26 @@ class DeviceViewSet(viewsets.ModelViewSet):
         if tipo_dispositivo:
             queryset = queryset.filter(tipo_equipo=tipo_dispositivo)
 
+        # Exportación completa en streaming
+        if request.accepted_renderer.format in EXPORT_FORMATS:
+            tipos = dict(Device.TIPO_CHOICES)
+            return stream_export(
+                queryset.select_related(None),
+                [
+                    ('tipo_dispositivo', 'Tipo Dispositivo', lambda fila: tipos.get(fila['tipo_equipo'])),
+                    ('marca', 'Marca', 'marca'),
+                    ('modelo', 'Modelo', 'modelo'),
+                    ('numero_serie', 'Número de Serie', 'numero_serie'),
+                    ('imei', 'IMEI', 'imei'),
+                    ('sucursal', 'Sucursal', 'sucursal__nombre'),
+                    ('fecha_ingreso', 'Fecha Ingreso', 'fecha_ingreso'),
+                    ('fecha_baja', 'Fecha Baja', 'fecha_inactivacion'),
+                ],
+                request.accepted_renderer.format,
+                'reporte_dispositivos_dados_baja',
+                campos=['tipo_equipo'],
+            )
+
         # Paginación
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -543,33 +728,44 @@ class StatsViewSet(viewsets.ViewSet):
         - Total de empleados activos
         - Últimas 5 asignaciones
         - Asignaciones activas
+
+        La respuesta se cachea hasta el próximo cambio de inventario (header X-Cache: HIT/MISS).
         """
+        from .cache import get_or_build
+
+        data, desde_cache = get_or_build('dashboard', self._build_dashboard)
+        return Response(data, headers={'X-Cache': 'HIT' if desde_cache else 'MISS'})
+
+    def _build_dashboard(self):
+        """Calcula las estadísticas del dashboard (sin caché)."""
         from apps.employees.models import Employee
         from apps.assignments.models import Assignment
         from apps.assignments.serializers import AssignmentSerializer
 
-        # 1. Dispositivos por estado (solo activos)
-        devices_by_status = Device.objects.filter(activo=True).values('estado').annotate(
-            total=Count('id')
-        ).order_by('estado')
+        from .models import InventorySummary
 
-        devices_by_status_dict = {item['estado']: item['total'] for item in devices_by_status}
+        # 1 y 2. Dispositivos por estado y por tipo (solo activos), desde el resumen de inventario
+        inventario = InventorySummary.objects.filter(activo=True, total__gt=0).values(
+            'estado', 'tipo_equipo', 'total'
+        )
 
-        # 2. Dispositivos por tipo (solo activos)
-        devices_by_type = Device.objects.filter(activo=True).values('tipo_equipo').annotate(
-            total=Count('id')
-        ).order_by('tipo_equipo')
+        devices_by_status_dict = {}
+        devices_by_type_dict = {}
+        for item in inventario:
+            devices_by_status_dict[item['estado']] = devices_by_status_dict.get(item['estado'], 0) + item['total']
+            devices_by_type_dict[item['tipo_equipo']] = devices_by_type_dict.get(item['tipo_equipo'], 0) + item['total']
 
-        devices_by_type_dict = {item['tipo_equipo']: item['total'] for item in devices_by_type}
+        devices_by_status_dict = dict(sorted(devices_by_status_dict.items()))
+        devices_by_type_dict = dict(sorted(devices_by_type_dict.items()))
 
         # 3. Total de empleados activos
         active_employees = Employee.objects.filter(estado='ACTIVO').count()
 
         # 4. Total de dispositivos (solo activos)
-        total_devices = Device.objects.filter(activo=True).count()
+        total_devices = sum(devices_by_status_dict.values())
 
         # 5. Dispositivos disponibles (solo activos)
-        available_devices = Device.objects.filter(activo=True, estado='DISPONIBLE').count()
+        available_devices = devices_by_status_dict.get('DISPONIBLE', 0)
 
         # 6. Asignaciones activas
         active_assignments_count = Assignment.objects.filter(estado_asignacion='ACTIVA').count()
@@ -584,11 +780,10 @@ class StatsViewSet(viewsets.ViewSet):
         recent_assignments_serializer = AssignmentSerializer(recent_assignments, many=True)
 
         # 8. Dispositivos por sucursal (solo activos)
-        from apps.branches.models import Branch
-        devices_by_branch = Device.objects.filter(activo=True).values(
+        devices_by_branch = InventorySummary.objects.filter(activo=True).values(
             'sucursal__nombre',
             'sucursal__codigo'
-        ).annotate(total=Count('id')).order_by('-total')
+        ).annotate(total=Sum('total')).filter(total__gt=0).order_by('-total')
 
         # 9. Últimas 5 devoluciones (incluyendo robos/pérdidas)
         from apps.assignments.models import Return
@@ -657,7 +852,7 @@ class StatsViewSet(viewsets.ViewSet):
         combined_returns.sort(key=lambda x: x['timestamp'], reverse=True)
         recent_returns_data = [item['data'] for item in combined_returns[:5]]
 
-        return Response({
+        return {
             'summary': {
                 'total_devices': total_devices,
                 'available_devices': available_devices,
@@ -669,4 +864,19 @@ class StatsViewSet(viewsets.ViewSet):
             'devices_by_branch': list(devices_by_branch),
             'recent_assignments': recent_assignments_serializer.data,
             'recent_returns': recent_returns_data,
-        })
+        }
+
+    @action(detail=False, methods=['get'], url_path='cache', permission_classes=[IsAdmin])
+    def cache_stats(self, request):
+        """
+        Estado del caché de estadísticas (solo administradores).
+
+        URL: /api/stats/cache/
+
+        Retorna el backend configurado, la versión actual del inventario y los
+        contadores de aciertos/fallos de inventory-stats y dashboard, tanto del
+        proceso que responde como compartidos en el caché.
+        """
+        from .cache import get_cache_stats
+
+        return Response(get_cache_stats())
@@ -0,0 +1,123 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:40
+
+from django.db import migrations
+
+from config.operations import VendorRunSQL
+
+# Índices de búsqueda de config/search.py: en SQLite, una tabla FTS5 espejo mantenida
+# por triggers; en PostgreSQL, índices GIN de trigramas y tsvector sobre el documento.
+
+SQLITE = [
+    '''
+        CREATE VIRTUAL TABLE "employees_employee_busqueda" USING fts5(
+            "nombre_completo", "rut", "cargo", "correo_corporativo", "rut_compacto",
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    ''',
+    '''
+        INSERT INTO "employees_employee_busqueda" (
+            rowid, "nombre_completo", "rut", "cargo", "correo_corporativo",
+            "rut_compacto"
+        )
+        SELECT
+            "id",
+            "nombre_completo",
+            "rut",
+            "cargo",
+            "correo_corporativo",
+            replace(replace(replace(replace("rut", '.', ''), '-', ''), ' ', ''), '/', '')
+        FROM "employees_employee"
+    ''',
+    '''
+        CREATE TRIGGER "employees_employee_busqueda_ai" AFTER INSERT ON "employees_employee" BEGIN
+            INSERT INTO "employees_employee_busqueda" (
+                rowid, "nombre_completo", "rut", "cargo", "correo_corporativo",
+                "rut_compacto"
+            ) VALUES (
+                NEW."id",
+                NEW."nombre_completo",
+                NEW."rut",
+                NEW."cargo",
+                NEW."correo_corporativo",
+                replace(replace(replace(replace(NEW."rut", '.', ''), '-', ''), ' ', ''), '/', '')
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "employees_employee_busqueda_au" AFTER UPDATE ON "employees_employee" BEGIN
+            DELETE FROM "employees_employee_busqueda" WHERE rowid = OLD."id";
+            INSERT INTO "employees_employee_busqueda" (
+                rowid, "nombre_completo", "rut", "cargo", "correo_corporativo",
+                "rut_compacto"
+            ) VALUES (
+                NEW."id",
+                NEW."nombre_completo",
+                NEW."rut",
+                NEW."cargo",
+                NEW."correo_corporativo",
+                replace(replace(replace(replace(NEW."rut", '.', ''), '-', ''), ' ', ''), '/', '')
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "employees_employee_busqueda_ad" AFTER DELETE ON "employees_employee" BEGIN
+            DELETE FROM "employees_employee_busqueda" WHERE rowid = OLD."id";
+        END
+    ''',
+]
+
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS "employees_employee_busqueda_ai"',
+    'DROP TRIGGER IF EXISTS "employees_employee_busqueda_au"',
+    'DROP TRIGGER IF EXISTS "employees_employee_busqueda_ad"',
+    'DROP TABLE IF EXISTS "employees_employee_busqueda"',
+]
+
+POSTGRESQL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE EXTENSION IF NOT EXISTS unaccent',
+    '''
+        CREATE OR REPLACE FUNCTION techtrace_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+    ''',
+    '''
+        CREATE INDEX IF NOT EXISTS "employees_employee_busqueda_trgm" ON "employees_employee" USING gin (
+            (techtrace_unaccent(lower(
+                coalesce("nombre_completo", '') || ' ' ||
+                coalesce("rut", '') || ' ' ||
+                coalesce("cargo", '') || ' ' ||
+                coalesce("correo_corporativo", '') || ' ' ||
+                regexp_replace(coalesce("rut", ''), '[^[:alnum:]]', '', 'g')
+            ))) gin_trgm_ops
+        )
+    ''',
+    '''
+        CREATE INDEX IF NOT EXISTS "employees_employee_busqueda_tsv" ON "employees_employee" USING gin (
+            to_tsvector('simple'::regconfig, techtrace_unaccent(lower(
+                coalesce("nombre_completo", '') || ' ' ||
+                coalesce("rut", '') || ' ' ||
+                coalesce("cargo", '') || ' ' ||
+                coalesce("correo_corporativo", '') || ' ' ||
+                regexp_replace(coalesce("rut", ''), '[^[:alnum:]]', '', 'g')
+            )))
+        )
+    ''',
+]
+
+POSTGRESQL_REVERSE = [
+    'DROP INDEX IF EXISTS "employees_employee_busqueda_trgm"',
+    'DROP INDEX IF EXISTS "employees_employee_busqueda_tsv"',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0010_employee_activo_employee_fecha_inactivacion'),
+    ]
+
+    operations = [
+        VendorRunSQL('sqlite', SQLITE, SQLITE_REVERSE),
+        VendorRunSQL('postgresql', POSTGRESQL, POSTGRESQL_REVERSE),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('branches', '0002_remove_branch_ciudad_remove_branch_direccion'),
+        ('employees', '0011_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['nombre_completo', 'id'], name='employee_nombre_id_idx'),
+        ),
+    ]
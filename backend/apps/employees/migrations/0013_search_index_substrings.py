@@ -0,0 +1,193 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:10
+
+from django.db import migrations
+
+from config.operations import VendorRunSQL
+
+# Recrea los índices de búsqueda de SQLite: agrega la tabla FTS5 de trigramas (subcadenas)
+# y limita el trigger de actualización a las columnas indexadas. Los índices de
+# PostgreSQL no cambian.
+
+SQLITE = [
+    'DROP TRIGGER IF EXISTS "employees_employee_busqueda_ai"',
+    'DROP TRIGGER IF EXISTS "employees_employee_busqueda_au"',
+    'DROP TRIGGER IF EXISTS "employees_employee_busqueda_ad"',
+    'DROP TABLE IF EXISTS "employees_employee_busqueda"',
+    '''
+        CREATE VIRTUAL TABLE "employees_employee_busqueda" USING fts5(
+            "nombre_completo", "rut", "cargo", "correo_corporativo", "rut_compacto",
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    ''',
+    '''
+        INSERT INTO "employees_employee_busqueda" (
+            rowid, "nombre_completo", "rut", "cargo", "correo_corporativo",
+            "rut_compacto"
+        )
+        SELECT
+            "id",
+            "nombre_completo",
+            "rut",
+            "cargo",
+            "correo_corporativo",
+            replace(replace(replace(replace("rut", '.', ''), '-', ''), ' ', ''), '/', '')
+        FROM "employees_employee"
+    ''',
+    '''
+        CREATE VIRTUAL TABLE "employees_employee_busqueda_trgm" USING fts5(
+            "nombre_completo", "rut", "cargo", "correo_corporativo", "rut_compacto",
+            tokenize = 'trigram'
+        )
+    ''',
+    '''
+        INSERT INTO "employees_employee_busqueda_trgm" (
+            rowid, "nombre_completo", "rut", "cargo", "correo_corporativo",
+            "rut_compacto"
+        )
+        SELECT
+            "id",
+            "nombre_completo",
+            "rut",
+            "cargo",
+            "correo_corporativo",
+            replace(replace(replace(replace("rut", '.', ''), '-', ''), ' ', ''), '/', '')
+        FROM "employees_employee"
+    ''',
+    '''
+        CREATE TRIGGER "employees_employee_busqueda_ai" AFTER INSERT ON "employees_employee" BEGIN
+            INSERT INTO "employees_employee_busqueda" (
+                rowid, "nombre_completo", "rut", "cargo", "correo_corporativo",
+                "rut_compacto"
+            ) VALUES (
+                NEW."id",
+                NEW."nombre_completo",
+                NEW."rut",
+                NEW."cargo",
+                NEW."correo_corporativo",
+                replace(replace(replace(replace(NEW."rut", '.', ''), '-', ''), ' ', ''), '/', '')
+            );
+            INSERT INTO "employees_employee_busqueda_trgm" (
+                rowid, "nombre_completo", "rut", "cargo", "correo_corporativo",
+                "rut_compacto"
+            ) VALUES (
+                NEW."id",
+                NEW."nombre_completo",
+                NEW."rut",
+                NEW."cargo",
+                NEW."correo_corporativo",
+                replace(replace(replace(replace(NEW."rut", '.', ''), '-', ''), ' ', ''), '/', '')
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "employees_employee_busqueda_au"
+        AFTER UPDATE OF "nombre_completo", "rut", "cargo", "correo_corporativo"
+        ON "employees_employee" BEGIN
+            DELETE FROM "employees_employee_busqueda" WHERE rowid = OLD."id";
+            DELETE FROM "employees_employee_busqueda_trgm" WHERE rowid = OLD."id";
+            INSERT INTO "employees_employee_busqueda" (
+                rowid, "nombre_completo", "rut", "cargo", "correo_corporativo",
+                "rut_compacto"
+            ) VALUES (
+                NEW."id",
+                NEW."nombre_completo",
+                NEW."rut",
+                NEW."cargo",
+                NEW."correo_corporativo",
+                replace(replace(replace(replace(NEW."rut", '.', ''), '-', ''), ' ', ''), '/', '')
+            );
+            INSERT INTO "employees_employee_busqueda_trgm" (
+                rowid, "nombre_completo", "rut", "cargo", "correo_corporativo",
+                "rut_compacto"
+            ) VALUES (
+                NEW."id",
+                NEW."nombre_completo",
+                NEW."rut",
+                NEW."cargo",
+                NEW."correo_corporativo",
+                replace(replace(replace(replace(NEW."rut", '.', ''), '-', ''), ' ', ''), '/', '')
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "employees_employee_busqueda_ad" AFTER DELETE ON "employees_employee" BEGIN
+            DELETE FROM "employees_employee_busqueda" WHERE rowid = OLD."id";
+            DELETE FROM "employees_employee_busqueda_trgm" WHERE rowid = OLD."id";
+        END
+    ''',
+]
+
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS "employees_employee_busqueda_ai"',
+    'DROP TRIGGER IF EXISTS "employees_employee_busqueda_au"',
+    'DROP TRIGGER IF EXISTS "employees_employee_busqueda_ad"',
+    'DROP TABLE IF EXISTS "employees_employee_busqueda"',
+    'DROP TABLE IF EXISTS "employees_employee_busqueda_trgm"',
+    '''
+        CREATE VIRTUAL TABLE "employees_employee_busqueda" USING fts5(
+            "nombre_completo", "rut", "cargo", "correo_corporativo", "rut_compacto",
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    ''',
+    '''
+        INSERT INTO "employees_employee_busqueda" (
+            rowid, "nombre_completo", "rut", "cargo", "correo_corporativo",
+            "rut_compacto"
+        )
+        SELECT
+            "id",
+            "nombre_completo",
+            "rut",
+            "cargo",
+            "correo_corporativo",
+            replace(replace(replace(replace("rut", '.', ''), '-', ''), ' ', ''), '/', '')
+        FROM "employees_employee"
+    ''',
+    '''
+        CREATE TRIGGER "employees_employee_busqueda_ai" AFTER INSERT ON "employees_employee" BEGIN
+            INSERT INTO "employees_employee_busqueda" (
+                rowid, "nombre_completo", "rut", "cargo", "correo_corporativo",
+                "rut_compacto"
+            ) VALUES (
+                NEW."id",
+                NEW."nombre_completo",
+                NEW."rut",
+                NEW."cargo",
+                NEW."correo_corporativo",
+                replace(replace(replace(replace(NEW."rut", '.', ''), '-', ''), ' ', ''), '/', '')
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "employees_employee_busqueda_au" AFTER UPDATE ON "employees_employee" BEGIN
+            DELETE FROM "employees_employee_busqueda" WHERE rowid = OLD."id";
+            INSERT INTO "employees_employee_busqueda" (
+                rowid, "nombre_completo", "rut", "cargo", "correo_corporativo",
+                "rut_compacto"
+            ) VALUES (
+                NEW."id",
+                NEW."nombre_completo",
+                NEW."rut",
+                NEW."cargo",
+                NEW."correo_corporativo",
+                replace(replace(replace(replace(NEW."rut", '.', ''), '-', ''), ' ', ''), '/', '')
+            );
+        END
+    ''',
+    '''
+        CREATE TRIGGER "employees_employee_busqueda_ad" AFTER DELETE ON "employees_employee" BEGIN
+            DELETE FROM "employees_employee_busqueda" WHERE rowid = OLD."id";
+        END
+    ''',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0012_cursor_indexes'),
+    ]
+
+    operations = [
+        VendorRunSQL('sqlite', SQLITE, SQLITE_REVERSE),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from apps.users.audit import AuditTrackedMixin
 from .validators import validate_rut
 
 
@@ -24,7 +25,7 @@ class BusinessUnit(models.Model):
         return f"{self.codigo} - {self.nombre}"
 
 
-class Employee(models.Model):
+class Employee(AuditTrackedMixin, models.Model):
     """
     Modelo para gestionar los empleados de la empresa.
     """
@@ -75,6 +76,10 @@ class Employee(models.Model):
         verbose_name = 'Empleado'
         verbose_name_plural = 'Empleados'
         ordering = ['nombre_completo']
+        indexes = [
+            # Orden estable para paginación por cursor
+            models.Index(fields=['nombre_completo', 'id'], name='employee_nombre_id_idx'),
+        ]
 
     def __str__(self):
         prefix = "[INACTIVO] " if not self.activo else ""
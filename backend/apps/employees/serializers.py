@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from .models import Employee, BusinessUnit
-from apps.branches.serializers import BranchSerializer
+from apps.branches.serializers import BranchListSerializer
 
 
 class BusinessUnitSerializer(serializers.ModelSerializer):
@@ -17,7 +17,7 @@ class EmployeeSerializer(serializers.ModelSerializer):
     Serializer para el modelo Employee (Empleado).
     """
     # Campos de solo lectura con información anidada
-    sucursal_detail = BranchSerializer(source='sucursal', read_only=True)
+    sucursal_detail = BranchListSerializer(source='sucursal', read_only=True)
     unidad_negocio_detail = BusinessUnitSerializer(source='unidad_negocio', read_only=True)
     created_by_username = serializers.CharField(source='created_by.username', read_only=True)
     dispositivos_asignados = serializers.IntegerField(read_only=True)
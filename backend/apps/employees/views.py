@@ -2,6 +2,7 @@ from rest_framework import viewsets, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from config.search import FullTextSearchFilter
 from django.db.models import Count, Q
 from .models import Employee, BusinessUnit
 from .serializers import EmployeeSerializer, BusinessUnitSerializer
@@ -22,11 +23,12 @@ class EmployeeViewSet(viewsets.ModelViewSet):
     Proporciona operaciones CRUD completas con filtros y búsqueda.
     """
     serializer_class = EmployeeSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['estado', 'sucursal', 'unidad_negocio']
     search_fields = ['nombre_completo', 'rut', 'cargo', 'correo_corporativo']
     ordering_fields = ['nombre_completo', 'rut', 'cargo', 'created_at']
     ordering = ['nombre_completo']
+    cursor_ordering = ('nombre_completo', 'id')  # Paginación ?cursor= (ver config/pagination.py)
 
     def get_queryset(self):
         """
@@ -72,20 +74,17 @@ class EmployeeViewSet(viewsets.ModelViewSet):
 
         URL: /api/employees/{id}/history/
 
-        Retorna todas las asignaciones (activas e históricas) del empleado,
-        ordenadas de más reciente a más antigua.
+        Query params:
+          - cursor: cursor de la página (links next/previous de la respuesta)
+          - page_size: filas por página (default 50)
+          - expand: empleado,dispositivo,solicitud para incluir el detalle anidado
+
+        Retorna las asignaciones (activas e históricas) del empleado como filas planas,
+        ordenadas de más reciente a más antigua (ver apps/assignments/history.py).
         """
-        from apps.assignments.serializers import AssignmentSerializer
+        from apps.assignments.history import historial
 
         employee = self.get_object()
-        assignments = employee.assignment_set.select_related(
-            'dispositivo',
-            'dispositivo__sucursal',
-            'solicitud',
-            'created_by'
-        ).order_by('-fecha_entrega')
-
-        serializer = AssignmentSerializer(assignments, many=True)
 
         return Response({
             'employee': {
@@ -94,7 +93,5 @@ class EmployeeViewSet(viewsets.ModelViewSet):
                 'nombre_completo': employee.nombre_completo,
                 'cargo': employee.cargo,
             },
-            'total_assignments': assignments.count(),
-            'active_assignments': assignments.filter(estado_asignacion='ACTIVA').count(),
-            'assignments': serializer.data
+            **historial(request, self, employee.assignment_set.all()),
         })
@@ -1,7 +1,95 @@
+import datetime
+import decimal
+import uuid
+
 from django.db import models
 from django.conf import settings
 
 
+def valor_auditable(valor):
+    """Convierte un valor de columna a un valor serializable en JSON."""
+    if isinstance(valor, (datetime.date, datetime.time)):
+        return valor.isoformat()
+    if isinstance(valor, (decimal.Decimal, uuid.UUID)):
+        return str(valor)
+    return valor
+
+
+class AuditTrackedMixin:
+    """
+    Mixin para modelos auditados.
+
+    Guarda los valores de columna con que la instancia fue leída o guardada por última
+    vez, para que la auditoría registre solo los campos modificados como
+    {campo: [anterior, nuevo]} (las FK con su ID) sin consultar la base de datos.
+
+    Formato de AuditLog.changes: todos los valores son pares [anterior, nuevo]. Los datos
+    que no son columnas del modelo también se registran como pares [None, valor]:
+    'bulk' y 'transfer' en las operaciones masivas, 'motivo' en los cambios de estado e
+    'ids'/'campos' en los lotes DeviceBatch (BULK_CREATE/BULK_UPDATE).
+    """
+    # Campos que no se registran en la auditoría
+    AUDIT_EXCLUDE = ('created_at', 'updated_at')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.guardar_valores_originales()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.guardar_valores_originales()
+
+    def save(self, *args, **kwargs):
+        # Las señales post_save (auditoría) se ejecutan dentro de super().save()
+        super().save(*args, **kwargs)
+        self.guardar_valores_originales(kwargs.get('update_fields'))
+
+    def _campos_auditados(self):
+        diferidos = self.get_deferred_fields()
+        return [
+            campo for campo in self._meta.concrete_fields
+            if campo.attname not in diferidos and not campo.primary_key and campo.name not in self.AUDIT_EXCLUDE
+        ]
+
+    def guardar_valores_originales(self, campos=None):
+        """
+        Registra los valores actuales como los de la base de datos.
+
+        Args:
+            campos: Nombres de los campos escritos (ej: update_fields); None para todos
+        """
+        auditados = self._campos_auditados()
+        if campos is None:
+            originales = {}
+        else:
+            originales = self.__dict__.get('_valores_originales', {})
+            auditados = [campo for campo in auditados if campo.name in campos or campo.attname in campos]
+        for campo in auditados:
+            originales[campo.attname] = valor_auditable(getattr(self, campo.attname))
+        self._valores_originales = originales
+
+    def cambios_auditoria(self, eliminado=False):
+        """
+        Retorna {campo: [anterior, nuevo]} con los campos modificados desde la lectura o
+        el último guardado. En una instancia nueva, los campos con valor ([None, valor]);
+        con eliminado=True, los valores que tenía ([valor, None]).
+        Los valores anteriores de los campos no leídos (only()/defer()) se registran como None.
+        """
+        nueva = '_valores_originales' not in self.__dict__
+        originales = self.__dict__.get('_valores_originales', {})
+        cambios = {}
+        for campo in self._campos_auditados():
+            actual = valor_auditable(getattr(self, campo.attname))
+            if eliminado or nueva:
+                if actual not in (None, ''):
+                    cambios[campo.name] = [actual, None] if eliminado else [None, actual]
+            elif actual != originales.get(campo.attname):
+                cambios[campo.name] = [originales.get(campo.attname), actual]
+        return cambios
+
+
 class AuditLog(models.Model):
     """
     Modelo para registrar todas las operaciones realizadas en el sistema.
@@ -11,10 +99,13 @@ class AuditLog(models.Model):
         ('CREATE', 'Creación'),
         ('UPDATE', 'Actualización'),
         ('DELETE', 'Eliminación'),
+        ('BULK_CREATE', 'Creación masiva'),
+        ('BULK_UPDATE', 'Actualización masiva'),
     ]
 
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT, verbose_name='Usuario')
-    action = models.CharField(max_length=10, choices=ACTION_CHOICES, verbose_name='Acción')
+    # Sin índice propio: lo cubre auditlog_user_ts_idx
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT, db_index=False, verbose_name='Usuario')
+    action = models.CharField(max_length=20, choices=ACTION_CHOICES, verbose_name='Acción')
     entity_type = models.CharField(max_length=50, verbose_name='Tipo de entidad')
     entity_id = models.IntegerField(verbose_name='ID de entidad')
     changes = models.JSONField(blank=True, null=True, verbose_name='Cambios realizados')
@@ -25,8 +116,10 @@ class AuditLog(models.Model):
         verbose_name_plural = 'Registros de auditoría'
         ordering = ['-timestamp']
         indexes = [
-            models.Index(fields=['-timestamp']),
-            models.Index(fields=['entity_type', 'entity_id']),
+            # Índices de /api/audit/: cada filtro seguido del orden de paginación (timestamp, id)
+            models.Index(fields=['-timestamp', '-id'], name='auditlog_timestamp_id_idx'),
+            models.Index(fields=['entity_type', 'entity_id', '-timestamp', '-id'], name='auditlog_entity_ts_idx'),
+            models.Index(fields=['user', '-timestamp', '-id'], name='auditlog_user_ts_idx'),
         ]
 
     def __str__(self):
@@ -0,0 +1,243 @@
+"""
+Archivo mensual de AuditLog.
+
+archivar() mueve los registros de auditoría anteriores a una fecha a archivos JSONL
+comprimidos, uno por mes (AUDIT_ARCHIVE_DIR/auditlog-AAAA-MM.jsonl.gz, meses en UTC), y
+los elimina de la tabla en lotes acotados. Así la tabla AuditLog (y sus índices) solo
+contiene los meses recientes, y cada archivo funciona como una partición mensual de
+solo lectura, en cualquier motor de base de datos.
+
+Cada lote se escribe y se cierra en su archivo antes de eliminarse de la base de datos.
+Si el proceso se interrumpe entre ambos pasos, al reintentar ese lote queda repetido en
+el archivo; buscar() descarta los IDs repetidos.
+
+buscar() consulta la tabla y, si se pide, también los meses archivados del rango, con
+los mismos filtros y el mismo formato de fila. Cada lote es un miembro gzip independiente,
+por lo que un mes se recorre del más reciente al más antiguo leyendo un lote a la vez
+(ver leer_mes_inverso()), sin cargar el mes completo en memoria.
+"""
+import gzip
+import json
+import os
+import re
+import zlib
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+
+# Columnas de cada fila archivada
+CAMPOS = ('id', 'user_id', 'action', 'entity_type', 'entity_id', 'changes', 'timestamp')
+
+PATRON_ARCHIVO = re.compile(r'^auditlog-(\d{4})-(\d{2})\.jsonl\.gz$')
+
+
+def directorio_archivo():
+    return settings.AUDIT_ARCHIVE_DIR
+
+
+def ruta_mes(anio, mes):
+    return os.path.join(directorio_archivo(), f'auditlog-{anio:04d}-{mes:02d}.jsonl.gz')
+
+
+def meses_archivados():
+    """Retorna los meses archivados como tuplas (año, mes), del más reciente al más antiguo."""
+    if not os.path.isdir(directorio_archivo()):
+        return []
+    meses = []
+    for nombre in os.listdir(directorio_archivo()):
+        coincidencia = PATRON_ARCHIVO.match(nombre)
+        if coincidencia:
+            meses.append((int(coincidencia.group(1)), int(coincidencia.group(2))))
+    return sorted(meses, reverse=True)
+
+
+def _mes(timestamp):
+    timestamp = timestamp.astimezone(dt_timezone.utc)
+    return timestamp.year, timestamp.month
+
+
+def archivar(antes_de, batch_size=5000, dry_run=False):
+    """
+    Archiva y elimina los registros con timestamp anterior a `antes_de`.
+
+    Args:
+        antes_de: datetime límite (exclusivo)
+        batch_size: Registros leídos, escritos y eliminados por lote
+        dry_run: Solo contar los registros por mes
+
+    Returns:
+        dict: archivados (total), por_mes ({'AAAA-MM': n}), lotes y dry_run
+    """
+    from django.db.models import Count
+    from django.db.models.functions import TruncMonth
+    from .audit import AuditLog
+
+    pendientes = AuditLog.objects.filter(timestamp__lt=antes_de)
+    resultado = {'archivados': 0, 'por_mes': defaultdict(int), 'lotes': 0, 'dry_run': dry_run}
+
+    if dry_run:
+        por_mes = (
+            pendientes.annotate(mes=TruncMonth('timestamp', tzinfo=dt_timezone.utc))
+            .values('mes').annotate(n=Count('id')).order_by('mes')
+        )
+        for fila in por_mes:
+            resultado['por_mes'][f'{fila["mes"]:%Y-%m}'] += fila['n']
+            resultado['archivados'] += fila['n']
+        resultado['por_mes'] = dict(resultado['por_mes'])
+        return resultado
+
+    os.makedirs(directorio_archivo(), exist_ok=True)
+    while True:
+        # Los lotes anteriores ya se eliminaron: siempre se leen los más antiguos
+        filas = list(pendientes.order_by('timestamp', 'id').values(*CAMPOS)[:batch_size])
+        if not filas:
+            break
+
+        por_mes = defaultdict(list)
+        for fila in filas:
+            por_mes[_mes(fila['timestamp'])].append(fila)
+        for (anio, mes), filas_mes in por_mes.items():
+            # Cada lote se agrega como un miembro gzip nuevo al final del archivo del mes
+            with gzip.open(ruta_mes(anio, mes), 'at', encoding='utf-8') as archivo:
+                for fila in filas_mes:
+                    archivo.write(json.dumps({**fila, 'timestamp': fila['timestamp'].isoformat()}) + '\n')
+            resultado['por_mes'][f'{anio:04d}-{mes:02d}'] += len(filas_mes)
+
+        with transaction.atomic():
+            AuditLog.objects.filter(pk__in=[fila['id'] for fila in filas]).delete()
+        resultado['archivados'] += len(filas)
+        resultado['lotes'] += 1
+
+    resultado['por_mes'] = dict(resultado['por_mes'])
+    return resultado
+
+
+def leer_mes(anio, mes):
+    """Itera las filas archivadas de un mes (orden ascendente por timestamp e id)."""
+    ruta = ruta_mes(anio, mes)
+    if not os.path.exists(ruta):
+        return
+    with gzip.open(ruta, 'rt', encoding='utf-8') as archivo:
+        for linea in archivo:
+            yield _fila(linea)
+
+
+def _fila(linea):
+    fila = json.loads(linea)
+    fila['timestamp'] = parse_datetime(fila['timestamp'])
+    return fila
+
+
+def _miembros(archivo):
+    """
+    Offsets (comprimidos) de inicio de cada miembro gzip del archivo abierto en modo
+    binario. Descomprime el archivo una vez descartando el contenido.
+    """
+    offsets = []
+    inicio = 0
+    while True:
+        archivo.seek(inicio)
+        if not archivo.read(1):
+            return offsets
+        offsets.append(inicio)
+        archivo.seek(inicio)
+        descompresor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        while not descompresor.eof:
+            bloque = descompresor.unconsumed_tail or archivo.read(64 * 1024)
+            if not descompresor.decompress(bloque, 1024 * 1024) and not bloque:
+                # Miembro truncado (escritura interrumpida): se ignora
+                return offsets[:-1]
+        inicio = archivo.tell() - len(descompresor.unused_data)
+
+
+def _leer_miembro(archivo, inicio):
+    """Líneas descomprimidas del miembro gzip que comienza en `inicio`."""
+    archivo.seek(inicio)
+    descompresor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+    partes = []
+    while not descompresor.eof:
+        bloque = archivo.read(64 * 1024)
+        if not bloque:
+            break
+        partes.append(descompresor.decompress(bloque))
+    return b''.join(partes).decode('utf-8').splitlines()
+
+
+def leer_mes_inverso(anio, mes):
+    """
+    Itera las filas archivadas de un mes en orden descendente. Mantiene en memoria un
+    solo lote (miembro gzip) a la vez.
+    """
+    ruta = ruta_mes(anio, mes)
+    if not os.path.exists(ruta):
+        return
+    with open(ruta, 'rb') as archivo:
+        for inicio in reversed(_miembros(archivo)):
+            for linea in reversed(_leer_miembro(archivo, inicio)):
+                yield _fila(linea)
+
+
+def _validar_filtros(filtros):
+    no_soportados = sorted(set(filtros) - set(CAMPOS))
+    if no_soportados:
+        raise ValueError(
+            f'Filtros no soportados: {", ".join(no_soportados)}. '
+            f'Solo se admiten igualdades sobre: {", ".join(CAMPOS)}'
+        )
+
+
+def _coincide(fila, filtros):
+    return all(fila[campo] == valor for campo, valor in filtros.items())
+
+
+def buscar(desde=None, hasta=None, incluir_archivo=False, **filtros):
+    """
+    Registros de auditoría del rango [desde, hasta), del más reciente al más antiguo.
+
+    Args:
+        desde: datetime inicial (inclusive) o None
+        hasta: datetime final (exclusivo) o None
+        incluir_archivo: Incluir también los meses archivados que se cruzan con el rango
+        **filtros: Igualdades sobre CAMPOS (ej: entity_type='Device', entity_id=5, user_id=1)
+
+    Returns:
+        Iterador de dicts con CAMPOS. Primero las filas de la tabla y después las
+        archivadas, que siempre son anteriores a las de la tabla.
+
+    Raises:
+        ValueError: Si algún filtro no es un campo de CAMPOS (ej: user o entity_id__in)
+    """
+    from .audit import AuditLog
+
+    _validar_filtros(filtros)
+
+    queryset = AuditLog.objects.filter(**filtros)
+    if desde is not None:
+        queryset = queryset.filter(timestamp__gte=desde)
+    if hasta is not None:
+        queryset = queryset.filter(timestamp__lt=hasta)
+    yield from queryset.order_by('-timestamp', '-id').values(*CAMPOS).iterator()
+
+    if not incluir_archivo:
+        return
+
+    vistos = set()
+    for anio, mes in meses_archivados():
+        inicio_mes = datetime(anio, mes, 1, tzinfo=dt_timezone.utc)
+        if desde is not None and (anio, mes) < _mes(desde):
+            break
+        if hasta is not None and inicio_mes >= hasta:
+            continue
+
+        for fila in leer_mes_inverso(anio, mes):
+            if hasta is not None and fila['timestamp'] >= hasta:
+                continue
+            if desde is not None and fila['timestamp'] < desde:
+                continue
+            if fila['id'] not in vistos and _coincide(fila, filtros):
+                vistos.add(fila['id'])
+                yield fila
@@ -0,0 +1,209 @@
+"""
+Escritura diferida y por lotes de AuditLog.
+
+create_audit_log() (apps/users/signals.py) ya no inserta una fila por llamada, sino que
+entrega la entrada a registrar(), que la acumula y la escribe con bulk_create:
+
+- Dentro de una transacción: las entradas se acumulan en un lote por transacción (o
+  savepoint) que se escribe en transaction.on_commit. Si la transacción o el savepoint
+  hacen rollback, Django descarta el callback y las entradas no se escriben.
+- Fuera de una transacción, dentro de buffer_auditoria(): las entradas se acumulan y se
+  escriben al salir del bloque. AuditBufferMiddleware (apps/users/middleware.py) abre un
+  bloque por request, de modo que los varios save() de una acción se registran con un
+  solo INSERT.
+- Fuera de ambos (shell, scripts): se escriben de inmediato, como antes.
+
+Las entradas de una misma entidad (entity_type, entity_id) se combinan en una sola
+(ver combinar()), por lo que una acción que guarda la misma instancia varias veces deja
+un único registro con el diff combinado. Al confirmar una transacción dentro de
+buffer_auditoria() su lote pasa al bloque, de modo que la combinación abarca todo el
+request aunque haya varias transacciones.
+
+Un lote se escribe antes de tiempo al alcanzar MAX_BATCH entradas y, en comandos de
+larga duración que usan buffer_auditoria(intervalo=...), cuando pasan más de `intervalo`
+segundos desde la última escritura.
+
+Configuración en settings.AUDIT_LOG_BUFFER:
+    SYNC: Escribir cada entrada de inmediato (por defecto False; los tests lo activan
+          con apps.users.testing.AuditoriaSincronaMixin, ya que TestCase nunca hace
+          commit y on_commit no se ejecutaría)
+    MAX_BATCH: Máximo de entradas por lote
+    FLUSH_INTERVAL: Segundos entre escrituras por defecto de buffer_auditoria()
+"""
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+
+
+# Estado por hilo (un request a la vez por hilo en WSGI)
+_estado = threading.local()
+
+
+def _config(nombre, defecto):
+    return getattr(settings, 'AUDIT_LOG_BUFFER', {}).get(nombre, defecto)
+
+
+def _clave(entrada):
+    return (entrada.entity_type, entrada.entity_id)
+
+
+def _es_par(valor):
+    return isinstance(valor, list) and len(valor) == 2
+
+
+def combinar(anterior, nueva):
+    """
+    Combina en `anterior` una entrada posterior de la misma entidad.
+
+    - Acción: DELETE prevalece; si no, se conserva la primera (CREATE seguido de UPDATE
+      queda como CREATE).
+    - Cambios: los pares [anterior, nuevo] conservan el valor anterior de la primera
+      entrada y el nuevo de la última; otros valores (registros anteriores al formato de
+      pares) toman el más reciente.
+    """
+    if nueva.action == 'DELETE':
+        anterior.action = 'DELETE'
+
+    cambios = dict(anterior.changes or {})
+    for campo, valor in (nueva.changes or {}).items():
+        if _es_par(valor) and _es_par(cambios.get(campo)):
+            valor = [cambios[campo][0], valor[1]]
+        cambios[campo] = valor
+    anterior.changes = cambios
+
+
+def _agregar(entradas, entrada):
+    """Agrega la entrada al lote, combinándola con la de su misma entidad si existe."""
+    clave = _clave(entrada)
+    if clave in entradas:
+        combinar(entradas[clave], entrada)
+    else:
+        entradas[clave] = entrada
+
+
+def _escribir(entradas):
+    """Inserta las entradas acumuladas con un bulk_create y vacía el lote."""
+    from .audit import AuditLog
+
+    if entradas:
+        AuditLog.objects.bulk_create(list(entradas.values()), batch_size=_config('MAX_BATCH', 500))
+        entradas.clear()
+
+
+def _vigente(lote):
+    """
+    Indica si el callback on_commit del lote sigue pendiente. Al ejecutarse marca el lote
+    como escrito; si la transacción o el savepoint hacen rollback, Django lo descarta y,
+    como el lote solo guarda una referencia débil a él, la referencia queda vacía.
+    """
+    return not lote['escrito'] and lote['callback']() is not None
+
+
+def _lote_transaccion(conexion):
+    """Lote de la transacción o savepoint actual; lo crea y registra su on_commit si no existe."""
+    clave = tuple(conexion.savepoint_ids)
+    lote = getattr(_estado, 'lote', None)
+    if lote is not None and lote['clave'] == clave and _vigente(lote):
+        return lote
+
+    lote = {'entradas': {}, 'clave': clave, 'escrito': False}
+
+    def escribir():
+        lote['escrito'] = True
+        if getattr(_estado, 'lote', None) is lote:
+            _estado.lote = None
+        bloque = getattr(_estado, 'bloque', None)
+        if bloque is None:
+            _escribir(lote['entradas'])
+            return
+        # Dentro de un request o comando: se combina con el resto de sus entradas
+        for entrada in lote['entradas'].values():
+            _agregar(bloque['entradas'], entrada)
+        _escribir_si_corresponde(bloque['entradas'], bloque)
+
+    transaction.on_commit(escribir)
+    # Solo Django mantiene vivo el callback (ver _vigente)
+    lote['callback'] = weakref.ref(escribir)
+    _estado.lote = lote
+    return lote
+
+
+def _escribir_si_corresponde(entradas, bloque):
+    """Escribe antes de tiempo al llenar el lote o al vencer el intervalo del bloque."""
+    max_lote = bloque['max_lote'] if bloque else _config('MAX_BATCH', 500)
+    vencido = bloque and bloque['intervalo'] and time.monotonic() - bloque['ultima'] >= bloque['intervalo']
+    if len(entradas) >= max_lote or vencido:
+        _escribir(entradas)
+        if bloque:
+            bloque['ultima'] = time.monotonic()
+
+
+def registrar(entrada):
+    """
+    Registra una entrada de AuditLog (sin guardar) según el contexto actual.
+
+    Args:
+        entrada: Instancia de AuditLog aún no guardada
+    """
+    registrar_lote([entrada])
+
+
+def registrar_lote(entradas):
+    """
+    Registra varias entradas de AuditLog (sin guardar), como registrar(). Usado por las
+    operaciones masivas en lugar de AuditLog.objects.bulk_create.
+
+    Args:
+        entradas: Instancias de AuditLog aún no guardadas
+    """
+    from .audit import AuditLog
+
+    bloque = getattr(_estado, 'bloque', None)
+    conexion = transaction.get_connection()
+    if _config('SYNC', False) or not (conexion.in_atomic_block or bloque is not None):
+        AuditLog.objects.bulk_create(entradas, batch_size=_config('MAX_BATCH', 500))
+        return
+
+    for entrada in entradas:
+        # El lote puede haberse escrito al llenarse: se obtiene en cada entrada
+        if conexion.in_atomic_block:
+            lote = _lote_transaccion(conexion)['entradas']
+        else:
+            lote = bloque['entradas']
+        _agregar(lote, entrada)
+        _escribir_si_corresponde(lote, bloque)
+
+
+@contextmanager
+def buffer_auditoria(max_lote=None, intervalo=None):
+    """
+    Acumula las entradas registradas fuera de transacciones y las de las transacciones
+    confirmadas dentro del bloque, y las escribe al salir (también si hubo una excepción:
+    las filas auditadas ya se confirmaron).
+
+    Args:
+        max_lote: Máximo de entradas por lote (por defecto MAX_BATCH)
+        intervalo: Segundos máximos entre escrituras, para comandos de larga duración
+            (por defecto FLUSH_INTERVAL; 0 desactiva la escritura por tiempo)
+
+    Los bloques anidados reutilizan el bloque exterior.
+    """
+    if getattr(_estado, 'bloque', None) is not None:
+        yield
+        return
+
+    _estado.bloque = {
+        'entradas': {},
+        'max_lote': max_lote or _config('MAX_BATCH', 500),
+        'intervalo': intervalo if intervalo is not None else _config('FLUSH_INTERVAL', 5),
+        'ultima': time.monotonic(),
+    }
+    try:
+        yield
+    finally:
+        bloque, _estado.bloque = _estado.bloque, None
+        _escribir(bloque['entradas'])
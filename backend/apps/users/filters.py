@@ -0,0 +1,24 @@
+"""
+Filtros para el registro de auditoría.
+"""
+import django_filters
+from .audit import AuditLog
+
+
+class AuditLogFilter(django_filters.FilterSet):
+    """
+    FilterSet de /api/audit/.
+
+    - entity_type + entity_id: historial de una entidad (índice auditlog_entity_ts_idx)
+    - user: ID del usuario (índice auditlog_user_ts_idx); sin validar que exista, para no
+      agregar una consulta
+    - action: CREATE, UPDATE o DELETE
+    - desde / hasta: rango de timestamp (ISO 8601), desde inclusive y hasta exclusive
+    """
+    user = django_filters.NumberFilter(field_name='user')
+    desde = django_filters.IsoDateTimeFilter(field_name='timestamp', lookup_expr='gte')
+    hasta = django_filters.IsoDateTimeFilter(field_name='timestamp', lookup_expr='lt')
+
+    class Meta:
+        model = AuditLog
+        fields = ['entity_type', 'entity_id', 'user', 'action', 'desde', 'hasta']
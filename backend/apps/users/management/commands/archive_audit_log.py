@@ -0,0 +1,68 @@
+"""
+Comando Django para archivar registros de auditoría antiguos.
+
+Mueve los registros de AuditLog anteriores a N días a archivos JSONL comprimidos por mes
+en AUDIT_ARCHIVE_DIR y los elimina de la tabla en lotes (ver apps/users/audit_archive.py).
+Pensado para ejecutarse periódicamente (cron).
+
+Uso:
+    python manage.py archive_audit_log --older-than 365              # Archivar
+    python manage.py archive_audit_log --older-than 365 --dry-run    # Solo contar
+    python manage.py archive_audit_log --older-than 365 --batch-size 10000
+"""
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.users.audit_archive import archivar, directorio_archivo
+
+
+class Command(BaseCommand):
+    help = 'Archiva en JSONL comprimido y elimina los registros de auditoría antiguos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than',
+            type=int,
+            required=True,
+            help='Archivar registros con más de N días de antigüedad'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Registros escritos y eliminados por lote'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Solo contar los registros a archivar, sin modificar datos'
+        )
+
+    def handle(self, *args, **options):
+        if options['older_than'] < 1:
+            raise CommandError('--older-than debe ser al menos 1 día')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size debe ser al menos 1')
+
+        start_time = time.time()
+        antes_de = timezone.now() - timedelta(days=options['older_than'])
+
+        resultado = archivar(antes_de, batch_size=options['batch_size'], dry_run=options['dry_run'])
+
+        for mes, cantidad in sorted(resultado['por_mes'].items()):
+            self.stdout.write(f'   • {mes}: {cantidad} registros')
+
+        elapsed_time = time.time() - start_time
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(
+                f'🔍 DRY-RUN: {resultado["archivados"]} registros anteriores a {antes_de:%Y-%m-%d} por archivar'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ {resultado["archivados"]} registros archivados en {directorio_archivo()} '
+                f'({resultado["lotes"]} lotes) en {elapsed_time:.2f}s'
+            ))
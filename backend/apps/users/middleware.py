@@ -0,0 +1,18 @@
+"""
+Middleware de auditoría.
+"""
+from .audit_buffer import buffer_auditoria
+
+
+class AuditBufferMiddleware:
+    """
+    Acumula las entradas de AuditLog de cada request y las escribe con un solo INSERT
+    al terminar (ver apps/users/audit_buffer.py).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with buffer_auditoria(intervalo=0):
+            return self.get_response(request)
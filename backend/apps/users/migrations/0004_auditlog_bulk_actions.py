@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_auditlog_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='auditlog',
+            name='action',
+            field=models.CharField(choices=[('CREATE', 'Creación'), ('UPDATE', 'Actualización'), ('DELETE', 'Eliminación'), ('BULK_CREATE', 'Creación masiva'), ('BULK_UPDATE', 'Actualización masiva')], max_length=20, verbose_name='Acción'),
+        ),
+    ]
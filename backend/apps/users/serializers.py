@@ -4,6 +4,7 @@ Serializers para el módulo de usuarios.
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from .models import User
+from .audit import AuditLog
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -132,3 +133,27 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         data['user'] = user_serializer.data
 
         return data
+
+
+class AuditLogSerializer(serializers.ModelSerializer):
+    """
+    Serializer de solo lectura para /api/audit/.
+    changes contiene los campos modificados como {campo: [anterior, nuevo]}.
+    """
+    user_username = serializers.CharField(source='user.username', read_only=True)
+    action_display = serializers.CharField(source='get_action_display', read_only=True)
+
+    class Meta:
+        model = AuditLog
+        fields = [
+            'id',
+            'user',
+            'user_username',
+            'action',
+            'action_display',
+            'entity_type',
+            'entity_id',
+            'changes',
+            'timestamp',
+        ]
+        read_only_fields = fields
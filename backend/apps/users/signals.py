@@ -2,66 +2,86 @@
 Señales para el sistema de auditoría automático.
 
 Registra automáticamente en AuditLog todas las operaciones CREATE, UPDATE y DELETE
-sobre los modelos principales del sistema.
+sobre los modelos principales del sistema. Cada registro guarda solo los campos
+modificados como {campo: [anterior, nuevo]}, calculados por AuditTrackedMixin sin
+consultar la base de datos (ver apps/users/audit.py).
 """
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from .audit import AuditLog
-import json
+from .audit_buffer import registrar
 
 
 def create_audit_log(user, action, entity_type, entity_id, changes=None):
     """
     Función auxiliar para crear registros de auditoría.
+    La entrada se escribe por lotes al confirmar la transacción o al terminar el request
+    (ver apps/users/audit_buffer.py).
 
     Args:
-        user: Usuario que realiza la acción
+        user: Usuario que realiza la acción (o su ID)
         action: Tipo de acción (CREATE, UPDATE, DELETE)
         entity_type: Tipo de entidad afectada
         entity_id: ID de la entidad
         changes: Diccionario con los cambios realizados
     """
-    if user and user.is_authenticated:
-        AuditLog.objects.create(
-            user=user,
-            action=action,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            changes=changes or {}
-        )
+    if isinstance(user, int):
+        user_id = user
+    elif user and user.is_authenticated:
+        user_id = user.pk
+    else:
+        return
+
+    registrar(AuditLog(
+        user_id=user_id,
+        action=action,
+        entity_type=entity_type,
+        entity_id=entity_id,
+        changes=changes or {}
+    ))
 
 
-def get_model_changes(instance, created=False):
+def get_model_changes(instance, deleted=False):
     """
-    Obtiene un diccionario con los cambios realizados en un modelo.
+    Obtiene los cambios de una instancia auditada.
 
     Args:
-        instance: Instancia del modelo
-        created: Indica si la instancia fue recién creada
+        instance: Instancia de un modelo con AuditTrackedMixin
+        deleted: Indica si la instancia fue eliminada
 
     Returns:
-        dict: Diccionario con la información relevante del modelo
+        dict: {campo: [anterior, nuevo]} con los campos modificados (al crear, los campos
+              con valor; al eliminar, los valores que tenía). Las FK se registran con su ID.
     """
-    changes = {
-        'action_type': 'CREATE' if created else 'UPDATE',
-        'model': instance.__class__.__name__,
-        'str_representation': str(instance),
-    }
+    return instance.cambios_auditoria(eliminado=deleted)
+
 
-    # Para modelos específicos, agregar información adicional
-    if hasattr(instance, 'estado'):
-        changes['estado'] = instance.estado
+def _autor(instance):
+    """
+    Usuario al que se atribuye la acción: _deleting_user si la vista lo indicó; si no,
+    created_by, o solo su ID si la relación no está cargada (evita una query).
+    """
+    user = getattr(instance, '_deleting_user', None)
+    if user is not None:
+        return user
+    if type(instance).created_by.is_cached(instance):
+        return instance.created_by
+    return instance.created_by_id
 
-    if hasattr(instance, 'nombre_completo'):
-        changes['nombre_completo'] = instance.nombre_completo
 
-    if hasattr(instance, 'rut'):
-        changes['rut'] = instance.rut
+def _registrar_guardado(instance, created, entity_type):
+    """Registra un CREATE, o un UPDATE si algún campo cambió."""
+    # Evitar recursión infinita
+    if hasattr(instance, '_skip_audit'):
+        return
+
+    changes = get_model_changes(instance)
+    if created or changes:
+        create_audit_log(_autor(instance), 'CREATE' if created else 'UPDATE', entity_type, instance.id, changes)
 
-    if hasattr(instance, 'serie_imei'):
-        changes['serie_imei'] = instance.serie_imei
 
-    return changes
+def _registrar_eliminacion(instance, entity_type):
+    create_audit_log(_autor(instance), 'DELETE', entity_type, instance.id, get_model_changes(instance, deleted=True))
 
 
 # ==================== SEÑALES PARA EMPLOYEE ====================
@@ -69,33 +89,13 @@ def get_model_changes(instance, created=False):
 @receiver(post_save, sender='employees.Employee')
 def employee_post_save(sender, instance, created, **kwargs):
     """Registra la creación o actualización de un empleado."""
-    # Evitar recursión infinita
-    if hasattr(instance, '_skip_audit'):
-        return
-
-    user = getattr(instance, 'created_by', None)
-    action = 'CREATE' if created else 'UPDATE'
-    changes = get_model_changes(instance, created)
-
-    create_audit_log(user, action, 'Employee', instance.id, changes)
+    _registrar_guardado(instance, created, 'Employee')
 
 
 @receiver(post_delete, sender='employees.Employee')
 def employee_post_delete(sender, instance, **kwargs):
     """Registra la eliminación de un empleado."""
-    # Para delete, intentamos obtener el usuario del contexto si está disponible
-    user = getattr(instance, '_deleting_user', None) or getattr(instance, 'created_by', None)
-
-    changes = {
-        'action_type': 'DELETE',
-        'model': 'Employee',
-        'str_representation': str(instance),
-        'rut': instance.rut,
-        'nombre_completo': instance.nombre_completo,
-    }
-
-    if user:
-        create_audit_log(user, 'DELETE', 'Employee', instance.id, changes)
+    _registrar_eliminacion(instance, 'Employee')
 
 
 # ==================== SEÑALES PARA DEVICE ====================
@@ -103,35 +103,13 @@ def employee_post_delete(sender, instance, **kwargs):
 @receiver(post_save, sender='devices.Device')
 def device_post_save(sender, instance, created, **kwargs):
     """Registra la creación o actualización de un dispositivo."""
-    # Evitar recursión infinita
-    if hasattr(instance, '_skip_audit'):
-        return
-
-    user = getattr(instance, 'created_by', None)
-    action = 'CREATE' if created else 'UPDATE'
-    changes = get_model_changes(instance, created)
-
-    create_audit_log(user, action, 'Device', instance.id, changes)
+    _registrar_guardado(instance, created, 'Device')
 
 
 @receiver(post_delete, sender='devices.Device')
 def device_post_delete(sender, instance, **kwargs):
     """Registra la eliminación de un dispositivo."""
-    user = getattr(instance, '_deleting_user', None) or getattr(instance, 'created_by', None)
-
-    changes = {
-        'action_type': 'DELETE',
-        'model': 'Device',
-        'str_representation': str(instance),
-        'numero_serie': instance.numero_serie,
-        'imei': instance.imei,
-        'tipo_equipo': instance.tipo_equipo,
-        'marca': instance.marca,
-        'modelo': instance.modelo,
-    }
-
-    if user:
-        create_audit_log(user, 'DELETE', 'Device', instance.id, changes)
+    _registrar_eliminacion(instance, 'Device')
 
 
 # ==================== SEÑALES PARA ASSIGNMENT ====================
@@ -139,40 +117,13 @@ def device_post_delete(sender, instance, **kwargs):
 @receiver(post_save, sender='assignments.Assignment')
 def assignment_post_save(sender, instance, created, **kwargs):
     """Registra la creación o actualización de una asignación."""
-    # Evitar recursión infinita
-    if hasattr(instance, '_skip_audit'):
-        return
-
-    user = getattr(instance, 'created_by', None)
-    action = 'CREATE' if created else 'UPDATE'
-    changes = get_model_changes(instance, created)
-
-    # Agregar información adicional específica de Assignment
-    changes.update({
-        'empleado': str(instance.empleado),
-        'dispositivo': str(instance.dispositivo),
-        'estado_asignacion': instance.estado_asignacion,
-        'fecha_entrega': str(instance.fecha_entrega),
-    })
-
-    create_audit_log(user, action, 'Assignment', instance.id, changes)
+    _registrar_guardado(instance, created, 'Assignment')
 
 
 @receiver(post_delete, sender='assignments.Assignment')
 def assignment_post_delete(sender, instance, **kwargs):
     """Registra la eliminación de una asignación."""
-    user = getattr(instance, '_deleting_user', None) or getattr(instance, 'created_by', None)
-
-    changes = {
-        'action_type': 'DELETE',
-        'model': 'Assignment',
-        'str_representation': str(instance),
-        'empleado': str(instance.empleado),
-        'dispositivo': str(instance.dispositivo),
-    }
-
-    if user:
-        create_audit_log(user, 'DELETE', 'Assignment', instance.id, changes)
+    _registrar_eliminacion(instance, 'Assignment')
 
 
 # ==================== SEÑALES PARA RETURN ====================
@@ -180,20 +131,6 @@ def assignment_post_delete(sender, instance, **kwargs):
 @receiver(post_save, sender='assignments.Return')
 def return_post_save(sender, instance, created, **kwargs):
     """Registra la creación de una devolución."""
-    # Evitar recursión infinita
-    if hasattr(instance, '_skip_audit'):
-        return
-
     # Solo registrar en creación (las devoluciones no se actualizan típicamente)
     if created:
-        user = getattr(instance, 'created_by', None)
-        changes = {
-            'action_type': 'CREATE',
-            'model': 'Return',
-            'str_representation': str(instance),
-            'asignacion': str(instance.asignacion),
-            'estado_dispositivo': instance.estado_dispositivo,
-            'fecha_devolucion': str(instance.fecha_devolucion),
-        }
-
-        create_audit_log(user, 'CREATE', 'Return', instance.id, changes)
+        _registrar_guardado(instance, created, 'Return')
@@ -0,0 +1,84 @@
+"""
+Utilidades compartidas por los tests de las apps.
+"""
+from django.conf import settings
+from django.test import override_settings
+
+
+class AuditoriaSincronaMixin:
+    """
+    Escribe cada registro de auditoría de inmediato (AUDIT_LOG_BUFFER['SYNC']).
+
+    TestCase envuelve cada test en una transacción que nunca hace commit, por lo que los
+    lotes que audit_buffer escribe en on_commit no llegarían a la base de datos. Los tests
+    del modo diferido sobrescriben AUDIT_LOG_BUFFER dentro del test.
+    """
+
+    def setUp(self):
+        ajustes = override_settings(AUDIT_LOG_BUFFER={**settings.AUDIT_LOG_BUFFER, 'SYNC': True})
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        super().setUp()
+
+
+class InventarioTestMixin(AuditoriaSincronaMixin):
+    """
+    Datos base de los tests de inventario: un administrador autenticado en self.client,
+    una sucursal y un empleado, con fábricas de dispositivos y asignaciones.
+
+    Cada app ajusta los datos base con los atributos de clase.
+    """
+    username = 'admin_test'
+    codigo_sucursal = 'TST-01'
+    datos_empleado = {'rut': '12345678-5', 'nombre_completo': 'Empleado Test', 'cargo': 'Analista'}
+
+    def setUp(self):
+        from django.contrib.auth import get_user_model
+        from rest_framework.test import APIClient
+        from apps.branches.models import Branch
+        from apps.employees.models import Employee
+
+        super().setUp()
+        self.admin_user = get_user_model().objects.create_user(
+            username=self.username,
+            password='test123',
+            role='ADMIN'
+        )
+        self.branch = Branch.objects.create(nombre='Sucursal Test', codigo=self.codigo_sucursal)
+        self.employee = Employee.objects.create(
+            sucursal=self.branch,
+            created_by=self.admin_user,
+            **self.datos_empleado
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin_user)
+
+    def create_device(self, numero_serie, **kwargs):
+        from datetime import date
+        from apps.devices.models import Device
+
+        data = {
+            'tipo_equipo': 'LAPTOP',
+            'marca': 'HP',
+            'modelo': 'ProBook',
+            'numero_serie': numero_serie,
+            'sucursal': self.branch,
+            'fecha_ingreso': date.today(),
+            'created_by': self.admin_user,
+        }
+        data.update(kwargs)
+        return Device.objects.create(**data)
+
+    def assign(self, device, **kwargs):
+        from datetime import date
+        from apps.assignments.models import Assignment
+
+        data = {
+            'empleado': self.employee,
+            'dispositivo': device,
+            'tipo_entrega': 'PERMANENTE',
+            'fecha_entrega': date.today(),
+            'created_by': self.admin_user,
+        }
+        data.update(kwargs)
+        return Assignment.objects.create(**data)
@@ -1,3 +1,386 @@
-from django.test import TestCase
+"""
+Tests de auditoría: escritura por lotes, diffs, archivo mensual y API de AuditLog.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.devices.models import Device
+from apps.assignments.models import Assignment
+from apps.users.testing import InventarioTestMixin
+
+User = get_user_model()
+
+
+class AuditTestMixin(InventarioTestMixin):
+    """Datos base de los tests de auditoría."""
+
+    codigo_sucursal = 'AUD-01'
+
+
+BUFFER_DIFERIDO = {'SYNC': False, 'MAX_BATCH': 3, 'FLUSH_INTERVAL': 0}
+
+
+class AuditBufferTestCase(AuditTestMixin, TestCase):
+    """Escritura de AuditLog por lotes al confirmar la transacción."""
+
+    def registrar(self, n, entity_id=1):
+        from apps.users.signals import create_audit_log
+        for i in range(n):
+            create_audit_log(self.admin_user, 'UPDATE', 'Device', entity_id + i, {'n': [0, 1]})
+
+    def test_escribe_al_confirmar_con_un_insert(self):
+        from django.db import transaction
+        from django.test import override_settings
+        from apps.users.audit import AuditLog
+
+        auditoria = AuditLog.objects.count()
+        with override_settings(AUDIT_LOG_BUFFER=BUFFER_DIFERIDO):
+            with self.captureOnCommitCallbacks() as callbacks:
+                with transaction.atomic():
+                    self.registrar(2)
+                self.assertEqual(AuditLog.objects.count(), auditoria)
+            with self.assertNumQueries(1):
+                for callback in callbacks:
+                    callback()
+        self.assertEqual(AuditLog.objects.count(), auditoria + 2)
+
+    def test_rollback_de_savepoint_descarta_entradas(self):
+        from django.db import transaction
+        from django.test import override_settings
+        from apps.users.audit import AuditLog
+
+        auditoria = AuditLog.objects.count()
+        with override_settings(AUDIT_LOG_BUFFER=BUFFER_DIFERIDO):
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    self.registrar(1, entity_id=1)
+                    try:
+                        with transaction.atomic():
+                            self.registrar(1, entity_id=2)
+                            raise RuntimeError
+                    except RuntimeError:
+                        pass
+        self.assertEqual(list(AuditLog.objects.filter(entity_type='Device', entity_id__in=[1, 2])
+                              .values_list('entity_id', flat=True)), [1])
+        self.assertEqual(AuditLog.objects.count(), auditoria + 1)
+
+    def test_escribe_antes_de_tiempo_al_llenar_el_lote(self):
+        from django.test import override_settings
+        from apps.users.audit import AuditLog
+
+        auditoria = AuditLog.objects.count()
+        with override_settings(AUDIT_LOG_BUFFER=BUFFER_DIFERIDO):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.registrar(4)
+                self.assertEqual(AuditLog.objects.count(), auditoria + 3)
+        self.assertEqual(AuditLog.objects.count(), auditoria + 4)
+
+    def test_combina_entradas_de_la_misma_entidad(self):
+        from django.db import transaction
+        from django.test import override_settings
+        from apps.users.audit import AuditLog
+        from apps.users.signals import create_audit_log
+
+        auditoria = AuditLog.objects.count()
+        with override_settings(AUDIT_LOG_BUFFER={**BUFFER_DIFERIDO, 'MAX_BATCH': 500}):
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    create_audit_log(self.admin_user, 'CREATE', 'Device', 7, {'estado': [None, 'DISPONIBLE']})
+                    create_audit_log(self.admin_user, 'UPDATE', 'Device', 7, {
+                        'estado': ['DISPONIBLE', 'ASIGNADO'], 'marca': ['HP', 'Dell']
+                    })
+                    create_audit_log(self.admin_user, 'UPDATE', 'Device', 7, {
+                        'estado': ['ASIGNADO', 'MANTENIMIENTO'], 'motivo': [None, 'Falla']
+                    })
+                    create_audit_log(self.admin_user, 'UPDATE', 'Device', 8, {})
+
+        self.assertEqual(AuditLog.objects.count(), auditoria + 2)
+        registro = AuditLog.objects.get(entity_type='Device', entity_id=7)
+        self.assertEqual(registro.action, 'CREATE')
+        self.assertEqual(registro.changes, {
+            'estado': [None, 'MANTENIMIENTO'], 'marca': ['HP', 'Dell'], 'motivo': [None, 'Falla'],
+        })
+
+
+class AuditBufferRequestTestCase(AuditTestMixin, TransactionTestCase):
+    """Fuera de transacciones, las entradas de un request se escriben al terminar."""
+
+    def test_request_escribe_auditoria_con_un_insert(self):
+        from django.test import override_settings
+        from apps.users.audit import AuditLog
+
+        auditoria = AuditLog.objects.count()
+        with override_settings(AUDIT_LOG_BUFFER={**BUFFER_DIFERIDO, 'MAX_BATCH': 500}):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post('/api/employees/', {
+                    'rut': '11111111-1', 'nombre_completo': 'Empleado Nuevo',
+                    'cargo': 'Analista', 'sucursal': self.branch.id,
+                }, format='json')
+        self.assertEqual(response.status_code, 201)
+        inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "users_auditlog"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(AuditLog.objects.count(), auditoria + 1)
+
+    def test_buffer_de_comando_escribe_por_tamano_y_al_salir(self):
+        from django.test import override_settings
+        from apps.users.audit import AuditLog
+        from apps.users.audit_buffer import buffer_auditoria
+        from apps.users.signals import create_audit_log
+
+        auditoria = AuditLog.objects.count()
+        with override_settings(AUDIT_LOG_BUFFER=BUFFER_DIFERIDO):
+            with buffer_auditoria(max_lote=2, intervalo=0):
+                for i in range(3):
+                    create_audit_log(self.admin_user, 'UPDATE', 'Device', i, {})
+                self.assertEqual(AuditLog.objects.count(), auditoria + 2)
+        self.assertEqual(AuditLog.objects.count(), auditoria + 3)
+
+    def test_combina_entradas_de_varias_transacciones_del_bloque(self):
+        from django.db import transaction
+        from django.test import override_settings
+        from apps.users.audit import AuditLog
+        from apps.users.audit_buffer import buffer_auditoria
+        from apps.users.signals import create_audit_log
+
+        auditoria = AuditLog.objects.count()
+        with override_settings(AUDIT_LOG_BUFFER={**BUFFER_DIFERIDO, 'MAX_BATCH': 500}):
+            with buffer_auditoria(intervalo=0):
+                with transaction.atomic():
+                    create_audit_log(self.admin_user, 'UPDATE', 'Device', 7, {'estado': ['A', 'B']})
+                create_audit_log(self.admin_user, 'UPDATE', 'Device', 7, {'estado': ['B', 'C']})
+                with transaction.atomic():
+                    create_audit_log(self.admin_user, 'DELETE', 'Device', 7, {})
+                self.assertEqual(AuditLog.objects.count(), auditoria)
+
+        registro = AuditLog.objects.get(entity_type='Device', entity_id=7)
+        self.assertEqual(AuditLog.objects.count(), auditoria + 1)
+        self.assertEqual(registro.action, 'DELETE')
+        self.assertEqual(registro.changes, {'estado': ['A', 'C']})
+
+    def test_rollback_no_reutiliza_el_lote_descartado(self):
+        from django.db import transaction
+        from django.test import override_settings
+        from apps.users.audit import AuditLog
+        from apps.users.signals import create_audit_log
+
+        auditoria = AuditLog.objects.count()
+        with override_settings(AUDIT_LOG_BUFFER={**BUFFER_DIFERIDO, 'MAX_BATCH': 500}):
+            try:
+                with transaction.atomic():
+                    create_audit_log(self.admin_user, 'UPDATE', 'Device', 1, {})
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            # Misma clave de savepoints que la transacción anterior
+            with transaction.atomic():
+                create_audit_log(self.admin_user, 'UPDATE', 'Device', 2, {})
+
+        self.assertEqual(list(AuditLog.objects.filter(entity_type='Device').values_list('entity_id', flat=True)), [2])
+        self.assertEqual(AuditLog.objects.count(), auditoria + 1)
+
+
+class AuditDiffTestCase(AuditTestMixin, TestCase):
+    """La auditoría guarda solo los campos modificados y no ejecuta queries de lectura."""
+
+    def lecturas(self, queries):
+        return [q['sql'] for q in queries.captured_queries if q['sql'].startswith('SELECT')]
+
+    def test_edicion_registra_solo_el_diff(self):
+        from apps.users.audit import AuditLog
+        device = Device.objects.get(pk=self.create_device('DIFF-001').pk)
+
+        device.marca = 'Dell'
+        device.valor_inicial = Decimal('1000')
+        with CaptureQueriesContext(connection) as queries:
+            device.save()
+
+        self.assertEqual(self.lecturas(queries), [])
+        registro = AuditLog.objects.filter(entity_type='Device', entity_id=device.id).latest('id')
+        self.assertEqual(registro.action, 'UPDATE')
+        self.assertEqual(registro.changes, {'marca': ['HP', 'Dell'], 'valor_inicial': [None, '1000']})
+
+        # Un save() sin cambios no registra nada
+        auditoria = AuditLog.objects.count()
+        device.save()
+        self.assertEqual(AuditLog.objects.count(), auditoria)
+
+    def test_asignacion_sin_lazy_loads(self):
+        from apps.users.audit import AuditLog
+        asignacion = self.assign(self.create_device('DIFF-002'))
+        asignacion = Assignment.objects.get(pk=asignacion.pk)
+
+        asignacion.observaciones = 'Entrega con cargador'
+        with CaptureQueriesContext(connection) as queries:
+            asignacion.save()
+
+        # La única lectura es la del dispositivo (señal de sincronización de estado, no auditoría)
+        self.assertEqual([sql for sql in self.lecturas(queries) if 'FROM "devices_device"' not in sql], [])
+        registro = AuditLog.objects.filter(entity_type='Assignment', entity_id=asignacion.id).latest('id')
+        self.assertEqual(registro.user_id, self.admin_user.id)
+        self.assertEqual(registro.changes, {'observaciones': [None, 'Entrega con cargador']})
+
+    def test_alta_y_eliminacion_con_ids_de_fk(self):
+        from apps.users.audit import AuditLog
+        device = self.create_device('DIFF-003')
+
+        alta = AuditLog.objects.get(entity_type='Device', entity_id=device.id, action='CREATE')
+        self.assertEqual(alta.changes['sucursal'], [None, self.branch.id])
+        self.assertEqual(alta.changes['numero_serie'], [None, 'DIFF-003'])
+        self.assertNotIn('id', alta.changes)
+
+        pk = device.pk
+        Device.objects.get(pk=pk).delete()
+        baja = AuditLog.objects.get(entity_type='Device', entity_id=pk, action='DELETE')
+        self.assertEqual(baja.changes['sucursal'], [self.branch.id, None])
+        self.assertEqual(baja.changes['fecha_ingreso'], [date.today().isoformat(), None])
+
+
+class AuditArchiveTestCase(AuditTestMixin, TestCase):
+    """Archivo mensual de AuditLog en JSONL comprimido y lectura transparente."""
+
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+        from django.utils import timezone
+        from apps.users.audit import AuditLog
+
+        super().setUp()
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        ajustes = override_settings(AUDIT_ARCHIVE_DIR=directorio.name)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        AuditLog.objects.all().delete()
+        self.ahora = timezone.now()
+        for dias, entity_id in ((400, 1), (380, 2), (370, 1), (10, 1)):
+            registro = AuditLog.objects.create(
+                user=self.admin_user, action='UPDATE', entity_type='Device', entity_id=entity_id,
+                changes={'estado': ['DISPONIBLE', 'ASIGNADO']}
+            )
+            AuditLog.objects.filter(pk=registro.pk).update(timestamp=self.ahora - timedelta(days=dias))
+
+    def test_archiva_por_mes_en_lotes(self):
+        from apps.users.audit import AuditLog
+        from apps.users.audit_archive import leer_mes, meses_archivados
+
+        salida = StringIO()
+        call_command('archive_audit_log', '--older-than', '365', '--dry-run', stdout=salida)
+        self.assertIn('3 registros', salida.getvalue())
+        self.assertEqual(AuditLog.objects.count(), 4)
+        self.assertEqual(meses_archivados(), [])
+
+        call_command('archive_audit_log', '--older-than', '365', '--batch-size', '2', stdout=StringIO())
+
+        self.assertEqual(AuditLog.objects.count(), 1)
+        archivadas = [fila for anio, mes in meses_archivados() for fila in leer_mes(anio, mes)]
+        self.assertEqual(len(archivadas), 3)
+        self.assertEqual(archivadas[0]['changes'], {'estado': ['DISPONIBLE', 'ASIGNADO']})
+        self.assertEqual(archivadas[0]['user_id'], self.admin_user.id)
+
+    def test_buscar_incluye_meses_archivados(self):
+        from apps.users.audit_archive import archivar, buscar
+
+        archivar(self.ahora - timedelta(days=365))
+
+        self.assertEqual(len(list(buscar(entity_type='Device', entity_id=1))), 1)
+        filas = list(buscar(entity_type='Device', entity_id=1, incluir_archivo=True))
+        self.assertEqual(len(filas), 3)
+        self.assertEqual([fila['timestamp'] for fila in filas], sorted((fila['timestamp'] for fila in filas), reverse=True))
+
+        filas = list(buscar(desde=self.ahora - timedelta(days=390), hasta=self.ahora - timedelta(days=100),
+                            incluir_archivo=True))
+        self.assertEqual(sorted(fila['entity_id'] for fila in filas), [1, 2])
+
+        with self.assertRaises(ValueError):
+            list(buscar(user=self.admin_user.id, incluir_archivo=True))
+        with self.assertRaises(ValueError):
+            list(buscar(entity_id__in=[1, 2]))
+
+    def test_lectura_inversa_por_lotes(self):
+        from apps.users.audit import AuditLog
+        from apps.users.audit_archive import archivar, leer_mes, leer_mes_inverso, meses_archivados
+
+        for i in range(7):
+            registro = AuditLog.objects.create(
+                user=self.admin_user, action='UPDATE', entity_type='Employee', entity_id=i, changes={}
+            )
+            AuditLog.objects.filter(pk=registro.pk).update(timestamp=self.ahora - timedelta(days=400, minutes=i))
+        archivar(self.ahora - timedelta(days=365), batch_size=3)
+
+        for anio, mes in meses_archivados():
+            ascendente = [fila['id'] for fila in leer_mes(anio, mes)]
+            self.assertEqual([fila['id'] for fila in leer_mes_inverso(anio, mes)], ascendente[::-1])
+
+
+class AuditLogAPITestCase(AuditTestMixin, TestCase):
+    """/api/audit/: solo ADMIN, filtros por entidad/usuario/acción/fecha, cursor y NDJSON."""
+
+    def setUp(self):
+        from apps.users.audit import AuditLog
+
+        super().setUp()
+        AuditLog.objects.all().delete()
+        self.operador = User.objects.create_user(username='operador_audit', password='test123', role='OPERADOR')
+        for i in range(5):
+            AuditLog.objects.create(user=self.admin_user, action='UPDATE', entity_type='Device', entity_id=1,
+                                    changes={'estado': ['DISPONIBLE', f'E{i}']})
+        AuditLog.objects.create(user=self.operador, action='CREATE', entity_type='Employee', entity_id=1, changes={})
+        AuditLog.objects.create(user=self.admin_user, action='DELETE', entity_type='Device', entity_id=2, changes={})
+
+    def test_solo_admin(self):
+        client = APIClient()
+        client.force_authenticate(self.operador)
+        self.assertEqual(client.get('/api/audit/').status_code, 403)
+
+    def test_historial_de_entidad_por_cursor(self):
+        vistos = []
+        url = '/api/audit/?entity_type=Device&entity_id=1&page_size=2'
+        while url:
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertIsNone(response.data['count'])
+            vistos += [fila['id'] for fila in response.data['results']]
+            url = response.data['next']
+
+        self.assertEqual(len(vistos), 5)
+        self.assertEqual(vistos, sorted(vistos, reverse=True))
+
+    def test_filtros_de_usuario_accion_y_fecha(self):
+        from django.utils import timezone
+
+        response = self.client.get(f'/api/audit/?user={self.operador.id}')
+        self.assertEqual([fila['entity_type'] for fila in response.data['results']], ['Employee'])
+        self.assertEqual(response.data['results'][0]['user_username'], 'operador_audit')
+
+        response = self.client.get('/api/audit/?action=DELETE')
+        self.assertEqual([fila['entity_id'] for fila in response.data['results']], [2])
+
+        futuro = (timezone.now() + timedelta(days=1)).isoformat()
+        response = self.client.get('/api/audit/', {'desde': futuro})
+        self.assertEqual(response.data['results'], [])
+
+    def test_exportacion_ndjson(self):
+        import json
+
+        response = self.client.get('/api/audit/?entity_type=Device&format=ndjson')
+        self.assertEqual(response.status_code, 200)
+        filas = [json.loads(linea) for linea in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(filas), 6)
+        self.assertEqual(filas[0]['action'], 'DELETE')
+        self.assertEqual(filas[-1]['changes'], {'estado': ['DISPONIBLE', 'E0']})
+
+        # El detalle no negocia los formatos de exportación
+        registro = self.client.get('/api/audit/?entity_type=Device').data['results'][0]
+        self.assertEqual(self.client.get(f"/api/audit/{registro['id']}/?format=ndjson").status_code, 404)
+        response = self.client.get(f"/api/audit/{registro['id']}/", HTTP_ACCEPT='text/csv')
+        self.assertEqual(response.status_code, 406)
@@ -0,0 +1,11 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import AuditLogViewSet
+
+# Crear router y registrar viewset
+router = DefaultRouter()
+router.register(r'', AuditLogViewSet, basename='auditlog')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -11,12 +11,17 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
 from django_filters.rest_framework import DjangoFilterBackend
 
+from config.exports import EXPORT_FORMATS, EXPORT_RENDERERS, stream_export
+from config.pagination import StandardResultsSetPagination
 from .models import User
+from .audit import AuditLog
+from .filters import AuditLogFilter
 from .serializers import (
     CustomTokenObtainPairSerializer,
     UserSerializer,
     CreateUserSerializer,
     ChangePasswordSerializer,
+    AuditLogSerializer,
 )
 from .permissions import IsAdmin
 
@@ -210,3 +215,72 @@ class UserViewSet(viewsets.ModelViewSet):
             )
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+# Orden de /api/audit/: más reciente primero, id como desempate único
+AUDIT_ORDERING = ('-timestamp', '-id')
+
+
+class AuditPagination(StandardResultsSetPagination):
+    """
+    Paginación de la auditoría: siempre por cursor (keyset) y sin COUNT(*), de modo que
+    cada página es una lectura acotada del índice sin importar el tamaño de la tabla.
+    """
+    page_size = 50
+
+    def get_cursor_ordering(self, view):
+        return AUDIT_ORDERING
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.cursor_mode = True
+        self.count_mode = 'none'
+        return self.paginate_keyset(queryset, request, view)
+
+
+class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet de solo lectura del registro de auditoría (solo ADMIN).
+
+    GET /api/audit/                       Listado paginado por cursor (?cursor=, ?page_size=)
+    GET /api/audit/{id}/                  Detalle
+    GET /api/audit/?format=ndjson|csv     Exportación completa en streaming (sin paginar)
+
+    Filtros: entity_type, entity_id, user, action, desde, hasta (ver AuditLogFilter).
+    Ej: historial de un dispositivo: ?entity_type=Device&entity_id=15
+    """
+    serializer_class = AuditLogSerializer
+    permission_classes = [IsAdmin]
+    pagination_class = AuditPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = AuditLogFilter
+
+    def get_queryset(self):
+        return AuditLog.objects.select_related('user').only(
+            'id', 'user', 'action', 'entity_type', 'entity_id', 'changes', 'timestamp', 'user__username'
+        ).order_by(*AUDIT_ORDERING)
+
+    def get_renderers(self):
+        """Los formatos de exportación solo se aceptan en el listado, el único que los transmite."""
+        if self.action == 'list':
+            return [renderer() for renderer in EXPORT_RENDERERS]
+        return super().get_renderers()
+
+    def list(self, request, *args, **kwargs):
+        if request.accepted_renderer.format in EXPORT_FORMATS:
+            return stream_export(
+                self.filter_queryset(AuditLog.objects.order_by(*AUDIT_ORDERING)),
+                [
+                    ('id', 'ID', 'id'),
+                    ('timestamp', 'Fecha y hora', 'timestamp'),
+                    ('user', 'Usuario ID', 'user'),
+                    ('user_username', 'Usuario', 'user__username'),
+                    ('action', 'Acción', 'action'),
+                    ('entity_type', 'Tipo de entidad', 'entity_type'),
+                    ('entity_id', 'ID de entidad', 'entity_id'),
+                    ('changes', 'Cambios', 'changes'),
+                ],
+                request.accepted_renderer.format,
+                'auditoria',
+            )
+        return super().list(request, *args, **kwargs)
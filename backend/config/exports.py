@@ -0,0 +1,115 @@
+"""
+Exportación en streaming (CSV / NDJSON) para endpoints de reportes.
+
+Las acciones de reporte agregan CSVRenderer y NDJSONRenderer a sus renderer_classes
+(ver EXPORT_RENDERERS) para aceptar ?format=csv|ndjson, y cuando el formato pedido es
+de exportación responden con stream_export() en lugar de paginar y serializar:
+
+- Lee el queryset con values() + iterator(chunk_size), que en PostgreSQL usa cursores
+  del lado del servidor, por lo que la memoria es constante sin importar el tamaño.
+- Las columnas son planas (lookups de values(), ej: 'empleado__sucursal__nombre'),
+  sin serializers anidados.
+- Envía X-Accel-Buffering: yes para que nginx almacene la respuesta en su buffer y
+  libere el worker de gunicorn a la velocidad de la base de datos, no a la del cliente.
+"""
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+EXPORT_CHUNK_SIZE = 2000
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Renderer para ?format=csv. Las exportaciones responden con StreamingHttpResponse;
+    este renderer solo se usa para respuestas de error (dict) de la misma acción.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        buffer = _Echo()
+        writer = csv.writer(buffer)
+        items = data.items() if isinstance(data, dict) else enumerate(data or [])
+        return ''.join(writer.writerow([key, value]) for key, value in items).encode(self.charset)
+
+
+class NDJSONRenderer(JSONRenderer):
+    """Renderer para ?format=ndjson (JSON por línea). Igual que CSVRenderer, solo para errores."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+# renderer_classes de las acciones exportables: JSON/navegable + formatos de exportación
+EXPORT_RENDERERS = [*api_settings.DEFAULT_RENDERER_CLASSES, CSVRenderer, NDJSONRenderer]
+
+
+class _Echo:
+    """Objeto tipo archivo que retorna lo escrito, para usar csv.writer en streaming."""
+
+    def write(self, value):
+        return value
+
+
+def _valor_plano(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, (dict, list)):
+        return json.dumps(valor, ensure_ascii=False, default=str)
+    if hasattr(valor, 'isoformat'):
+        return valor.isoformat()
+    return valor
+
+
+def stream_export(queryset, columnas, formato, nombre_archivo, campos=(), chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Retorna un StreamingHttpResponse con el queryset exportado.
+
+    Args:
+        queryset: Queryset ya filtrado y ordenado
+        columnas: Lista de (clave, titulo, origen). origen es un lookup de values()
+            (ej: 'empleado__rut') o una función que recibe la fila (dict) y retorna el valor
+        formato: 'csv' o 'ndjson'
+        nombre_archivo: Nombre base del archivo descargado (sin extensión)
+        campos: Lookups adicionales que necesitan las columnas calculadas
+        chunk_size: Filas leídas por vuelta del cursor
+    """
+    lookups = list(dict.fromkeys(
+        [origen for _, _, origen in columnas if isinstance(origen, str)] + list(campos)
+    ))
+    filas = queryset.values(*lookups).iterator(chunk_size=chunk_size)
+
+    def valores(fila):
+        return [
+            (clave, fila[origen] if isinstance(origen, str) else origen(fila))
+            for clave, _, origen in columnas
+        ]
+
+    if formato == 'csv':
+        def contenido():
+            writer = csv.writer(_Echo())
+            # BOM para que Excel reconozca UTF-8 (tildes y ñ)
+            yield '\ufeff' + writer.writerow([titulo for _, titulo, _ in columnas])
+            for fila in filas:
+                yield writer.writerow([_valor_plano(valor) for _, valor in valores(fila)])
+
+        content_type = 'text/csv; charset=utf-8'
+    else:
+        def contenido():
+            for fila in filas:
+                yield json.dumps(dict(valores(fila)), ensure_ascii=False, default=str) + '\n'
+
+        content_type = 'application/x-ndjson; charset=utf-8'
+
+    fecha = timezone.localdate().isoformat()
+    response = StreamingHttpResponse(contenido(), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{nombre_archivo}_{fecha}.{formato}"'
+    response['X-Accel-Buffering'] = 'yes'
+    return response
@@ -0,0 +1,31 @@
+"""
+Operaciones de migración propias del proyecto.
+"""
+from django.db import migrations
+
+
+class VendorRunSQL(migrations.RunSQL):
+    """
+    RunSQL que solo se ejecuta en un motor de base de datos (ej: 'sqlite', 'postgresql').
+    Permite que una migración incluya el SQL literal de cada motor, como los índices de
+    búsqueda de config/search.py.
+    """
+
+    def __init__(self, vendor, sql, reverse_sql=None, **kwargs):
+        self.vendor = vendor
+        super().__init__(sql, reverse_sql, **kwargs)
+
+    def deconstruct(self):
+        nombre, args, kwargs = super().deconstruct()
+        return nombre, args, {'vendor': self.vendor, **kwargs}
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == self.vendor:
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == self.vendor:
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+    def describe(self):
+        return f'{super().describe()} ({self.vendor})'
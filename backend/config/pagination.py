@@ -1,7 +1,48 @@
 """
 Configuración personalizada de paginación para Django REST Framework.
 """
+import base64
+import json
+
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+COUNT_MODES = ('exact', 'estimate', 'none')
+
+
+def estimar_total(queryset):
+    """
+    Retorna la cantidad estimada de filas de un queryset.
+    En PostgreSQL usa la estimación del planificador (EXPLAIN, sin ejecutar la consulta);
+    en otros motores ejecuta el COUNT(*) exacto.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(DjangoPaginator):
+    """Paginator de Django cuyo total proviene de estimar_total()."""
+
+    @cached_property
+    def count(self):
+        return estimar_total(self.object_list)
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -11,7 +52,170 @@ class StandardResultsSetPagination(PageNumberPagination):
     - Tamaño por defecto: 20 registros
     - Tamaño máximo: 1000 registros (para exportaciones)
     - Query param: page_size
+
+    Modo cursor (keyset), activado con ?cursor= (vacío para la primera página):
+    - Filtra por la posición del último registro en lugar de usar OFFSET, por lo que
+      el costo por página es constante sin importar la profundidad.
+    - Usa el orden compuesto view.cursor_ordering (ej: ('-fecha_entrega', '-id')), que
+      debe terminar en un campo único y no contener nulos. Ignora ?ordering=.
+    - Retorna next/previous con el cursor ya codificado.
+
+    Conteo, con ?count=exact|estimate|none:
+    - exact: COUNT(*) (por defecto en modo página)
+    - estimate: estimación del planificador en PostgreSQL (exacto en otros motores)
+    - none: no cuenta; count es null (por defecto en modo cursor)
     """
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 1000
+
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    default_cursor_ordering = ('-pk',)
+
+    def get_count_mode(self, request, cursor_mode):
+        mode = request.query_params.get(self.count_query_param)
+        if mode in COUNT_MODES:
+            return mode
+        return 'none' if cursor_mode else 'exact'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        self.count_mode = self.get_count_mode(request, self.cursor_mode)
+
+        if self.cursor_mode:
+            return self.paginate_keyset(queryset, request, view)
+        if self.count_mode == 'none':
+            return self.paginate_without_count(queryset, request)
+
+        self.django_paginator_class = EstimatedCountPaginator if self.count_mode == 'estimate' else DjangoPaginator
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_mode or self.count_mode == 'none':
+            return Response({
+                'count': self.total,
+                'next': self.next_link,
+                'previous': self.previous_link,
+                'results': data,
+            })
+        return super().get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count']['nullable'] = True
+        return response_schema
+
+    # ------------------------------------------------------------------
+    # Modo página sin conteo
+    # ------------------------------------------------------------------
+
+    def paginate_without_count(self, queryset, request):
+        """Paginación por número de página sin COUNT(*): lee una fila extra para saber si hay más."""
+        page_size = self.get_page_size(request)
+        try:
+            page_number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            page_number = 0
+        if page_number < 1:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=''))
+
+        offset = (page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        if not rows and page_number > 1:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=''))
+
+        url = request.build_absolute_uri()
+        self.total = None
+        self.next_link = (
+            replace_query_param(url, self.page_query_param, page_number + 1)
+            if len(rows) > page_size else None
+        )
+        if page_number == 1:
+            self.previous_link = None
+        elif page_number == 2:
+            self.previous_link = remove_query_param(url, self.page_query_param)
+        else:
+            self.previous_link = replace_query_param(url, self.page_query_param, page_number - 1)
+
+        return rows[:page_size]
+
+    # ------------------------------------------------------------------
+    # Modo cursor (keyset)
+    # ------------------------------------------------------------------
+
+    def get_cursor_ordering(self, view):
+        return tuple(getattr(view, 'cursor_ordering', None) or self.default_cursor_ordering)
+
+    def encode_cursor(self, values, reverse):
+        # isoformat() completo: DjangoJSONEncoder trunca los microsegundos
+        payload = json.dumps(
+            {'v': values, 'r': reverse},
+            default=lambda value: value.isoformat() if hasattr(value, 'isoformat') else str(value)
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, cursor, fields):
+        """Retorna (valores, reverse) o lanza NotFound si el cursor no es válido."""
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            values = payload['v']
+            if len(values) != len(fields):
+                raise ValueError
+            return [field.to_python(value) for field, value in zip(fields, values)], bool(payload['r'])
+        except Exception:
+            raise NotFound('Cursor inválido.')
+
+    def paginate_keyset(self, queryset, request, view):
+        model = queryset.model
+        ordering = self.get_cursor_ordering(view)
+        names = [name.lstrip('-') for name in ordering]
+        fields = [model._meta.pk if name == 'pk' else model._meta.get_field(name) for name in names]
+        page_size = self.get_page_size(request)
+
+        if self.count_mode == 'none':
+            self.total = None
+        elif self.count_mode == 'estimate':
+            self.total = estimar_total(queryset)
+        else:
+            self.total = queryset.count()
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        values, reverse = self.decode_cursor(cursor, fields) if cursor else (None, False)
+
+        # En páginas hacia atrás se recorre el orden inverso y luego se invierten los resultados
+        descending = [name.startswith('-') != reverse for name in ordering]
+        queryset = queryset.order_by(*[
+            f'-{name}' if desc else name for name, desc in zip(names, descending)
+        ])
+
+        if values is not None:
+            # (a, b) > (va, vb)  ≡  a > va OR (a = va AND b > vb), según la dirección de cada campo
+            position = Q()
+            for index, (name, desc) in enumerate(zip(names, descending)):
+                condition = Q(**{f'{name}__{"lt" if desc else "gt"}': values[index]})
+                for previous_name, previous_value in zip(names[:index], values[:index]):
+                    condition &= Q(**{previous_name: previous_value})
+                position |= condition
+            queryset = queryset.filter(position)
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        url = request.build_absolute_uri()
+
+        def link(row, to_reverse):
+            # Las filas pueden ser instancias o dicts de values()
+            cursor_values = [row[name] if isinstance(row, dict) else getattr(row, name) for name in names]
+            return replace_query_param(url, self.cursor_query_param, self.encode_cursor(cursor_values, to_reverse))
+
+        has_next = (not reverse and has_more) or (reverse and values is not None)
+        has_previous = (reverse and has_more) or (not reverse and values is not None)
+        self.next_link = link(rows[-1], False) if rows and has_next else None
+        self.previous_link = link(rows[0], True) if rows and has_previous else None
+
+        return rows
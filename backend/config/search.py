@@ -0,0 +1,323 @@
+"""
+Búsqueda de texto completo para los ViewSets.
+
+FullTextSearchFilter reemplaza a rest_framework.filters.SearchFilter: usa los mismos
+search_fields y el mismo parámetro ?search=, pero en lugar de un OR de icontains sobre
+columnas unidas por JOIN, resuelve cada modelo involucrado contra un índice de búsqueda:
+
+- PostgreSQL: índices GIN de trigramas (pg_trgm) y tsvector sobre un documento sin
+  acentos (unaccent) que concatena las columnas del modelo.
+- SQLite: dos tablas virtuales FTS5 espejo de cada modelo, mantenidas por triggers: una
+  de palabras (tokenizer unicode61 sin diacríticos) y otra de trigramas para subcadenas.
+
+Características (iguales en ambos motores):
+- Sin acentos ni mayúsculas: "perez" encuentra "Pérez".
+- Cada término coincide si todas sus palabras son prefijo de alguna palabra indexada o si
+  el término completo aparece dentro de alguna columna, como el icontains de SearchFilter:
+  "3456" encuentra el número de serie "ABC123456" y "book" el modelo "ProBook 450".
+- Las columnas "compactas" (número de serie, IMEI, RUT, teléfono) se indexan también sin
+  puntos, guiones ni espacios, por lo que "12345678" encuentra el RUT "12.345.678-5".
+- Relevancia: si todos los search_fields son del modelo de la vista y no se indicó
+  ?ordering=, los resultados se ordenan por relevancia (anotación search_rank).
+  Para que el orden por relevancia prevalezca, el filtro debe ir después de
+  OrderingFilter en filter_backends.
+
+Los índices se crean con el SQL literal de las migraciones de cada app (ej:
+devices/migrations/0015_search_index_substrings.py); un cambio en INDICES_BUSQUEDA
+requiere una migración nueva que los recree. Los search_fields de modelos sin índice
+(o con prefijos '^', '=', '@', '$') y otros motores de base de datos usan la búsqueda
+estándar.
+"""
+import re
+import unicodedata
+
+from django.apps import apps
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+
+# Columnas indexadas por modelo. 'compactos' se indexan además sin separadores.
+INDICES_BUSQUEDA = {
+    'devices.Device': {
+        'campos': ['numero_serie', 'imei', 'marca', 'modelo', 'numero_telefono', 'numero_factura'],
+        'compactos': ['numero_serie', 'imei', 'numero_telefono'],
+    },
+    'employees.Employee': {
+        'campos': ['nombre_completo', 'rut', 'cargo', 'correo_corporativo'],
+        'compactos': ['rut'],
+    },
+    'assignments.Assignment': {
+        'campos': ['observaciones'],
+        'compactos': [],
+    },
+    'assignments.Request': {
+        'campos': ['jefatura_solicitante', 'justificacion'],
+        'compactos': [],
+    },
+    'assignments.Return': {
+        'campos': ['observaciones'],
+        'compactos': [],
+    },
+}
+
+
+def normalizar(texto):
+    """Retorna el texto en minúsculas y sin acentos."""
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def tokens_busqueda(termino):
+    """Retorna las palabras (letras y dígitos) de un término de búsqueda normalizado."""
+    return re.findall(r'[^\W_]+', normalizar(termino))
+
+
+# ---------------------------------------------------------------------------
+# SQLite (FTS5)
+# ---------------------------------------------------------------------------
+
+def _tabla_fts(tabla):
+    return f'{tabla}_busqueda'
+
+
+def _tabla_trigramas(tabla):
+    return f'{tabla}_busqueda_trgm'
+
+
+def _columnas_fts(campos, compactos):
+    return list(campos) + [f'{campo}_compacto' for campo in compactos]
+
+
+def _consulta_fts5(tokens, campos, compactos):
+    """Expresión MATCH de FTS5: todas las palabras como prefijo, o el término compacto."""
+    palabras = ' AND '.join(f'"{token}"*' for token in tokens)
+    consulta = f'({{{" ".join(campos)}}} : ({palabras}))'
+    if compactos:
+        columnas = ' '.join(f'{campo}_compacto' for campo in compactos)
+        consulta += f' OR ({{{columnas}}} : "{"".join(tokens)}"*)'
+    return consulta
+
+
+def _subcadenas(termino, tokens):
+    """
+    Variantes del término buscadas como subcadena: normalizado, en minúsculas con sus
+    acentos (el índice de trigramas conserva los acentos) y compacto.
+    """
+    variantes = [normalizar(termino).strip(), termino.lower().strip(), ''.join(tokens)]
+    return list(dict.fromkeys(variante for variante in variantes if variante))
+
+
+def _condicion_subcadena_sqlite(tabla, columnas, termino, tokens):
+    """
+    Filas de la tabla de trigramas que contienen el término en alguna columna. Las
+    subcadenas de 3 o más caracteres usan MATCH; las más cortas no tienen trigramas y se
+    comparan con LIKE sobre la tabla FTS5.
+    """
+    trigramas = _tabla_trigramas(tabla)
+    variantes = _subcadenas(termino, tokens)
+    largas = [variante for variante in variantes if len(variante) >= 3]
+    cortas = [variante for variante in variantes if len(variante) < 3]
+
+    condiciones, params = [], []
+    if largas:
+        condiciones.append(f'"{trigramas}" MATCH %s')
+        params.append(' OR '.join('"' + variante.replace('"', '""') + '"' for variante in largas))
+    for variante in cortas:
+        for columna in columnas:
+            condiciones.append(f'"{columna}" LIKE %s ESCAPE \'\\\'')
+            params.append(f'%{_escapar_like(variante)}%')
+
+    sql = f'SELECT rowid FROM "{trigramas}" WHERE ' + ' OR '.join(condiciones)
+    return sql, params
+
+
+# ---------------------------------------------------------------------------
+# PostgreSQL (pg_trgm + tsvector)
+# ---------------------------------------------------------------------------
+
+def _documento_pg(campos, compactos, tabla=None):
+    """
+    Documento de búsqueda de un modelo: columnas concatenadas, sin acentos y en minúsculas.
+    Debe coincidir con la expresión de los índices de las migraciones para que se usen.
+    """
+    prefijo = f'"{tabla}".' if tabla else ''
+    partes = [f"coalesce({prefijo}\"{campo}\", '')" for campo in campos]
+    partes += [
+        f"regexp_replace(coalesce({prefijo}\"{campo}\", ''), '[^[:alnum:]]', '', 'g')"
+        for campo in compactos
+    ]
+    documento = " || ' ' || ".join(partes)
+    return f'techtrace_unaccent(lower({documento}))'
+
+
+def _escapar_like(texto):
+    return texto.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _consulta_tsquery(tokens):
+    return ' & '.join(f'{token}:*' for token in tokens)
+
+
+def condicion_busqueda(model, termino, vendor, calificada=False):
+    """
+    Retorna una expresión booleana para filtrar `model` por un término usando su índice
+    de búsqueda. Por defecto las columnas no se califican con la tabla, para usar la
+    expresión dentro de una subconsulta, donde Django renombra los alias; con
+    calificada=True se usa directamente sobre un queryset de `model`.
+    """
+    indice = INDICES_BUSQUEDA[model._meta.label]
+    tabla = model._meta.db_table
+    pk = model._meta.pk.column
+    tokens = tokens_busqueda(termino)
+    columna_pk = f'"{tabla}"."{pk}"' if calificada else f'"{pk}"'
+
+    if vendor == 'sqlite':
+        fts = _tabla_fts(tabla)
+        subcadena, params_subcadena = _condicion_subcadena_sqlite(
+            tabla, _columnas_fts(indice['campos'], indice['compactos']), termino, tokens
+        )
+        sql = f'{columna_pk} IN (SELECT rowid FROM "{fts}" WHERE "{fts}" MATCH %s UNION {subcadena})'
+        params = [_consulta_fts5(tokens, indice['campos'], indice['compactos']), *params_subcadena]
+    else:
+        documento = _documento_pg(indice['campos'], indice['compactos'], tabla=tabla if calificada else None)
+        sql = (
+            f"({documento} LIKE %s "
+            f"OR to_tsvector('simple'::regconfig, {documento}) @@ to_tsquery('simple'::regconfig, %s))"
+        )
+        params = [f'%{_escapar_like(normalizar(termino))}%', _consulta_tsquery(tokens)]
+
+    return RawSQL(sql, params, output_field=BooleanField())
+
+
+def relevancia_busqueda(model, terminos, vendor):
+    """
+    Retorna una expresión con la relevancia (mayor es mejor) de cada fila de `model`
+    para una lista de términos ya separados en palabras.
+
+    En SQLite es una subconsulta sobre la tabla FTS5 de palabras (-bm25). La búsqueda va
+    en un CTE MATERIALIZED (SQLite 3.35+), que se evalúa una sola vez por consulta y se
+    lee por rowid; una subconsulta correlacionada repetiría el MATCH por cada fila. En
+    ambos motores las filas que solo coinciden como subcadena tienen relevancia 0.
+    """
+    indice = INDICES_BUSQUEDA[model._meta.label]
+    tabla = model._meta.db_table
+    pk = model._meta.pk.column
+
+    if vendor == 'sqlite':
+        fts = _tabla_fts(tabla)
+        sql = (
+            f'COALESCE((WITH relevancia AS MATERIALIZED ('
+            f'SELECT rowid AS fila, -bm25("{fts}") AS valor FROM "{fts}" WHERE "{fts}" MATCH %s'
+            f') SELECT valor FROM relevancia WHERE fila = "{tabla}"."{pk}"), 0)'
+        )
+        params = [' AND '.join(
+            f'({_consulta_fts5(tokens, indice["campos"], indice["compactos"])})' for tokens in terminos
+        )]
+    else:
+        documento = _documento_pg(indice['campos'], indice['compactos'], tabla=tabla)
+        sql = f"ts_rank(to_tsvector('simple'::regconfig, {documento}), to_tsquery('simple'::regconfig, %s))"
+        params = [' & '.join(_consulta_tsquery(tokens) for tokens in terminos)]
+
+    return RawSQL(sql, params, output_field=FloatField())
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    Reemplazo de SearchFilter que usa los índices de búsqueda de INDICES_BUSQUEDA.
+
+    Cada término debe coincidir (AND) en alguno de los modelos de search_fields (OR).
+    Los search_fields se agrupan por modelo (ej: 'empleado__rut' y 'empleado__nombre_completo'
+    → Employee) y cada grupo se resuelve con una subconsulta pk IN (...) sobre el índice,
+    por lo que no se generan JOINs ni DISTINCT. Dentro de un modelo se buscan todas sus
+    columnas indexadas.
+    """
+
+    def agrupar_campos(self, model, search_fields):
+        """
+        Retorna ({prefijo_relacion: modelo}, [campos_sin_indice]).
+        Ej: 'empleado__rut' → {'empleado__': Employee}.
+        """
+        grupos = {}
+        sin_indice = []
+
+        for search_field in search_fields:
+            if search_field[0] in self.lookup_prefixes:
+                sin_indice.append(search_field)
+                continue
+
+            *relaciones, campo = search_field.split(LOOKUP_SEP)
+            destino = model
+            for relacion in relaciones:
+                destino = destino._meta.get_field(relacion).related_model
+
+            indice = INDICES_BUSQUEDA.get(destino._meta.label)
+            if indice is None or campo not in indice['campos']:
+                sin_indice.append(search_field)
+                continue
+
+            prefijo = ''.join(f'{relacion}{LOOKUP_SEP}' for relacion in relaciones)
+            grupos[prefijo] = destino
+
+        return grupos, sin_indice
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+
+        if not search_fields or not search_terms:
+            return queryset
+
+        vendor = connections[queryset.db].vendor
+        if vendor not in ('sqlite', 'postgresql'):
+            return super().filter_queryset(request, queryset, view)
+
+        grupos, sin_indice = self.agrupar_campos(queryset.model, search_fields)
+        lookups_sin_indice = [self.construct_search(str(campo), queryset) for campo in sin_indice]
+
+        terminos = [
+            (search_term, tokens_busqueda(search_term)) for search_term in search_terms
+        ]
+        terminos = [(search_term, tokens) for search_term, tokens in terminos if tokens]
+        if not terminos:
+            return queryset
+
+        # Relevancia: solo cuando todos los campos son del propio modelo
+        por_relevancia = list(grupos) == [''] and not sin_indice
+
+        for search_term, tokens in terminos:
+            condicion = Q()
+            for prefijo, destino in grupos.items():
+                if not prefijo:
+                    condicion |= Q(condicion_busqueda(destino, search_term, vendor, calificada=True))
+                    continue
+                ids = destino._base_manager.filter(
+                    condicion_busqueda(destino, search_term, vendor)
+                ).values('pk')
+                condicion |= Q(**{f'{prefijo}pk__in': ids})
+            for lookup in lookups_sin_indice:
+                condicion |= Q(**{lookup: search_term})
+
+            queryset = queryset.filter(condicion)
+
+        if sin_indice and self.must_call_distinct(queryset, sin_indice):
+            queryset = queryset.distinct()
+
+        if por_relevancia:
+            queryset = queryset.annotate(
+                search_rank=relevancia_busqueda(queryset.model, [tokens for _, tokens in terminos], vendor)
+            )
+
+        if por_relevancia and api_settings.ORDERING_PARAM not in request.query_params:
+            ordering = queryset.query.order_by or queryset.model._meta.ordering
+            queryset = queryset.order_by('-search_rank', *ordering)
+
+        return queryset
+
+
+def modelos_indexados():
+    """Retorna los modelos con índice de búsqueda."""
+    return [apps.get_model(label) for label in INDICES_BUSQUEDA]
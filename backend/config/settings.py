@@ -61,6 +61,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.users.middleware.AuditBufferMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -124,6 +125,36 @@ else:
         }
 
 
+# Cache
+# Por defecto memoria local (un caché por worker de gunicorn). Para compartir el caché
+# entre workers usar CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache con
+# CACHE_LOCATION=techtrace_cache (requiere `python manage.py createcachetable`) o
+# django.core.cache.backends.redis.RedisCache con CACHE_LOCATION=redis://host:6379/1
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'techtrace'),
+    }
+}
+
+# Segundos que se mantienen en caché las estadísticas de inventario y dashboard.
+# Con memoria local cada worker invalida solo sus propias entradas, por lo que este
+# valor acota cuánto puede tardar otro worker en ver un cambio.
+INVENTORY_CACHE_TIMEOUT = int(os.getenv('INVENTORY_CACHE_TIMEOUT', '60'))
+
+# Escritura por lotes de AuditLog (ver apps/users/audit_buffer.py).
+# Los tests activan SYNC con AuditoriaSincronaMixin (apps/users/testing.py).
+AUDIT_LOG_BUFFER = {
+    'SYNC': os.getenv('AUDIT_LOG_SYNC', 'False') == 'True',
+    'MAX_BATCH': int(os.getenv('AUDIT_LOG_MAX_BATCH', '500')),
+    'FLUSH_INTERVAL': float(os.getenv('AUDIT_LOG_FLUSH_INTERVAL', '5')),
+}
+
+# Directorio de los archivos mensuales de auditoría (manage.py archive_audit_log)
+AUDIT_ARCHIVE_DIR = os.getenv('AUDIT_ARCHIVE_DIR', str(BASE_DIR / 'audit_archive'))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -27,4 +27,5 @@ urlpatterns = [
     path('api/devices/', include('apps.devices.urls')),
     path('api/assignments/', include('apps.assignments.urls')),
     path('api/stats/', include('apps.devices.urls_stats')),
+    path('api/audit/', include('apps.users.urls_audit')),
 ]
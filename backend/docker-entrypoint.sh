@@ -37,6 +37,9 @@ else
     exit 1
 fi
 
+# Crear tabla de caché (solo tiene efecto con CACHE_BACKEND=DatabaseCache)
+python manage.py createcachetable
+
 # Recolectar archivos estáticos
 echo -e "${YELLOW}Recolectando archivos estáticos...${NC}"
 python manage.py collectstatic --noinput --clear
@@ -25,6 +25,7 @@ export default function DeviceDetailPage() {
   const [device, setDevice] = useState<Device | null>(null)
   const [history, setHistory] = useState<DeviceHistory | null>(null)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [refreshTrigger, setRefreshTrigger] = useState(0)
   const [editModalOpen, setEditModalOpen] = useState(false)
   const [assignModalOpen, setAssignModalOpen] = useState(false)
@@ -54,6 +55,24 @@ export default function DeviceDetailPage() {
     loadDeviceData()
   }, [deviceId, router, toast, refreshTrigger])
 
+  const handleLoadMoreHistory = async () => {
+    if (!history?.next) return
+    try {
+      setLoadingMore(true)
+      const cursor = new URL(history.next).searchParams.get("cursor") ?? undefined
+      const page = await deviceService.getDeviceHistory(deviceId, cursor)
+      setHistory({ ...page, assignments: [...history.assignments, ...page.assignments] })
+    } catch (error) {
+      toast({
+        title: "Error",
+        description: error instanceof Error ? error.message : "Error al cargar el historial",
+        variant: "destructive",
+      })
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   const handleDeviceUpdated = () => {
     setRefreshTrigger(prev => prev + 1)
     setEditModalOpen(false)
@@ -365,9 +384,7 @@ export default function DeviceDetailPage() {
                   {history.assignments.map((assignment) => (
                     <TableRow key={assignment.id}>
                       <TableCell className="font-medium">
-                        {assignment.empleado_detail
-                          ? assignment.empleado_detail.nombre_completo
-                          : `Empleado #${assignment.empleado}`}
+                        {assignment.empleado_nombre || `Empleado #${assignment.empleado}`}
                       </TableCell>
                       <TableCell>
                         {formatDateLocal(assignment.fecha_entrega)}
@@ -402,6 +419,13 @@ export default function DeviceDetailPage() {
               </Table>
             </div>
           )}
+          {history.next && (
+            <div className="flex justify-center pt-4">
+              <Button variant="outline" size="sm" onClick={handleLoadMoreHistory} disabled={loadingMore}>
+                {loadingMore ? "Cargando..." : "Cargar más"}
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
 
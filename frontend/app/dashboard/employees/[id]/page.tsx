@@ -25,6 +25,7 @@ export default function EmployeeDetailPage() {
   const [employee, setEmployee] = useState<Employee | null>(null)
   const [history, setHistory] = useState<EmployeeHistory | null>(null)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [refreshTrigger, setRefreshTrigger] = useState(0)
 
   useEffect(() => {
@@ -52,6 +53,24 @@ export default function EmployeeDetailPage() {
     loadEmployeeData()
   }, [employeeId, router, toast, refreshTrigger])
 
+  const handleLoadMoreHistory = async () => {
+    if (!history?.next) return
+    try {
+      setLoadingMore(true)
+      const cursor = new URL(history.next).searchParams.get("cursor") ?? undefined
+      const page = await employeeService.getEmployeeHistory(employeeId, cursor)
+      setHistory({ ...page, assignments: [...history.assignments, ...page.assignments] })
+    } catch (error) {
+      toast({
+        title: "Error",
+        description: error instanceof Error ? error.message : "Error al cargar el historial",
+        variant: "destructive",
+      })
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   const handleEmployeeUpdated = () => {
     setRefreshTrigger(prev => prev + 1)
   }
@@ -284,34 +303,30 @@ export default function EmployeeDetailPage() {
                   {history.assignments.map((assignment) => (
                     <TableRow key={assignment.id}>
                       <TableCell className="font-medium">
-                        {assignment.dispositivo_detail ? (
+                        {assignment.dispositivo ? (
                           <div className="space-y-1">
                             <div className="font-medium">
-                              {assignment.dispositivo_detail.marca} {assignment.dispositivo_detail.modelo || ""}
+                              {assignment.dispositivo_marca} {assignment.dispositivo_modelo || ""}
                             </div>
-                            {assignment.dispositivo_detail.numero_serie && (
+                            {assignment.dispositivo_numero_serie && (
                               <div className="text-xs text-muted-foreground">
-                                S/N: {assignment.dispositivo_detail.numero_serie}
+                                S/N: {assignment.dispositivo_numero_serie}
                               </div>
                             )}
-                            {assignment.dispositivo_detail.imei && (
+                            {assignment.dispositivo_imei && (
                               <div className="text-xs text-muted-foreground">
-                                IMEI: {assignment.dispositivo_detail.imei}
+                                IMEI: {assignment.dispositivo_imei}
                               </div>
                             )}
                           </div>
                         ) : (
-                          <span className="text-muted-foreground">Dispositivo #{assignment.dispositivo}</span>
+                          <span className="text-muted-foreground">Dispositivo eliminado</span>
                         )}
                       </TableCell>
                       <TableCell>
-                        {assignment.dispositivo_detail ? (
-                          <Badge variant="outline">
-                            {assignment.dispositivo_detail.tipo_equipo}
-                          </Badge>
-                        ) : (
-                          <Badge variant="outline">-</Badge>
-                        )}
+                        <Badge variant="outline">
+                          {assignment.dispositivo_tipo ?? "-"}
+                        </Badge>
                       </TableCell>
                       <TableCell>
                         {formatDateLocal(assignment.fecha_entrega)}
@@ -341,6 +356,13 @@ export default function EmployeeDetailPage() {
               </Table>
             </div>
           )}
+          {history.next && (
+            <div className="flex justify-center pt-4">
+              <Button variant="outline" size="sm" onClick={handleLoadMoreHistory} disabled={loadingMore}>
+                {loadingMore ? "Cargando..." : "Cargar más"}
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
     </div>
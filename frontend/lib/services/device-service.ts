@@ -93,8 +93,9 @@ export const deviceService = {
     return apiClient.get<Device>(`/devices/${id}/`)
   },
 
-  async getDeviceHistory(id: number): Promise<DeviceHistory> {
-    return apiClient.get<DeviceHistory>(`/devices/${id}/history/`)
+  async getDeviceHistory(id: number, cursor?: string): Promise<DeviceHistory> {
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : ""
+    return apiClient.get<DeviceHistory>(`/devices/${id}/history/${query}`)
   },
 
   async createDevice(data: CreateDeviceData): Promise<Device> {
@@ -51,8 +51,9 @@ export const employeeService = {
     return apiClient.get<Employee>(`/employees/${id}/`)
   },
 
-  async getEmployeeHistory(id: number): Promise<EmployeeHistory> {
-    return apiClient.get<EmployeeHistory>(`/employees/${id}/history/`)
+  async getEmployeeHistory(id: number, cursor?: string): Promise<EmployeeHistory> {
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : ""
+    return apiClient.get<EmployeeHistory>(`/employees/${id}/history/${query}`)
   },
 
   async createEmployee(data: CreateEmployeeData): Promise<Employee> {
@@ -53,6 +53,28 @@ export interface Employee {
   created_by_username?: string
 }
 
+// Fila plana del historial de asignaciones (GET /devices|employees/{id}/history/)
+export interface AssignmentHistoryItem {
+  id: number
+  empleado: number
+  empleado_nombre: string
+  empleado_rut: string
+  dispositivo: number | null
+  dispositivo_tipo: TipoEquipo | null
+  dispositivo_marca: string | null
+  dispositivo_modelo: string | null
+  dispositivo_numero_serie: string | null
+  dispositivo_imei: string | null
+  solicitud: number | null
+  tipo_entrega: "PERMANENTE" | "TEMPORAL"
+  fecha_entrega: string
+  fecha_devolucion: string | null
+  estado_carta: string
+  estado_asignacion: "ACTIVA" | "FINALIZADA"
+  devolucion_fecha: string | null
+  devolucion_estado_dispositivo: string | null
+}
+
 export interface EmployeeHistory {
   employee: {
     id: number
@@ -62,7 +84,9 @@ export interface EmployeeHistory {
   }
   total_assignments: number
   active_assignments: number
-  assignments: Assignment[]
+  assignments: AssignmentHistoryItem[]
+  next: string | null
+  previous: string | null
 }
 
 export type TipoEquipo = "LAPTOP" | "DESKTOP" | "TELEFONO" | "TABLET" | "TV" | "SIM" | "ACCESORIO"
@@ -118,7 +142,9 @@ export interface DeviceHistory {
   }
   total_assignments: number
   active_assignments: number
-  assignments: Assignment[]
+  assignments: AssignmentHistoryItem[]
+  next: string | null
+  previous: string | null
 }
 
 // Request (Solicitud) types